@@ -0,0 +1,110 @@
+{#
+  Bronze layer helpers
+
+  The Bronze layer is written by dlt as
+  s3://<raw bucket>/sources/<source>/<table>/year=YYYY/month=MM/day=DD/<load_id>.<file_id>.parquet
+  where <load_id> (_dlt_load_id) is the Unix timestamp of the load.
+#}
+
+{% macro bronze_path(table, source='api_jsonplaceholder') -%}
+  s3://{{ env_var("R2_BUCKET_NAME", "data-lake-raw") }}/sources/{{ source }}/{{ table }}/**/*.parquet
+{%- endmacro %}
+
+
+{% macro bronze_manifest_uri(table, source='api_jsonplaceholder') -%}
+  s3://{{ env_var("R2_BUCKET_NAME", "data-lake-raw") }}/sources/{{ source }}/{{ table }}/_manifest.jsonl
+{%- endmacro %}
+
+
+{#
+  Parquet files of a Bronze table listed in its ingestion manifest
+
+  The workers append every written file to <table>/_manifest.jsonl, so one GET
+  replaces the recursive LIST of the ** glob. On incremental runs only files
+  of loads above the watermark are returned, plus the newest file so the list
+  is never empty (its rows are removed by bronze_incremental_filter).
+  Returns none when the table has no manifest yet.
+#}
+{% macro bronze_manifest_files(table, source='api_jsonplaceholder') -%}
+  {%- if not execute or not var('bronze_use_manifest', true) -%}
+    {{ return(none) }}
+  {%- endif -%}
+  {%- set uri = bronze_manifest_uri(table, source) -%}
+  {%- if run_query("SELECT COUNT(*) FROM glob('" ~ uri ~ "')").columns[0].values()[0] == 0 -%}
+    {{ return(none) }}
+  {%- endif -%}
+
+  {%- set watermark = bronze_watermark() if is_incremental() else none -%}
+  {%- set manifest -%}
+    (SELECT key, load_id FROM read_json('{{ uri }}', format = 'newline_delimited',
+       columns = {'key': 'VARCHAR', 'load_id': 'VARCHAR'}) WHERE key LIKE '%.parquet')
+  {%- endset -%}
+  {%- set files_query -%}
+    SELECT DISTINCT key FROM (
+      SELECT key FROM {{ manifest }} AS m
+      {%- if watermark is not none %} WHERE CAST(load_id AS DOUBLE) > {{ watermark }}{% endif %}
+      UNION ALL
+      (SELECT key FROM {{ manifest }} AS m ORDER BY key DESC LIMIT 1)
+    )
+    ORDER BY key
+  {%- endset -%}
+  {{ return(run_query(files_query).columns[0].values() | list) }}
+{%- endmacro %}
+
+
+{#
+  read_parquet over a Bronze table with the year/month/day partition columns exposed.
+  Filters on those columns prune whole directories before any file is opened.
+  With a manifest the explicit file list is read, so planning does not LIST
+  the bucket however many files the table has.
+#}
+{% macro read_bronze(table, source='api_jsonplaceholder') -%}
+  {%- set files = bronze_manifest_files(table, source) -%}
+  {%- if files -%}
+  read_parquet([
+    {%- for key in files %}
+    's3://{{ env_var("R2_BUCKET_NAME", "data-lake-raw") }}/{{ key }}'{{ "," if not loop.last }}
+    {%- endfor %}
+  ], hive_partitioning = true, union_by_name = true)
+  {%- else -%}
+  read_parquet('{{ bronze_path(table, source) }}', hive_partitioning = true, union_by_name = true)
+  {%- endif -%}
+{%- endmacro %}
+
+
+{#
+  Timestamp of a dlt load, derived from _dlt_load_id
+#}
+{% macro dlt_loaded_at(load_id_column='_dlt_load_id') -%}
+  CAST(to_timestamp(CAST({{ load_id_column }} AS DOUBLE)) AS TIMESTAMP)
+{%- endmacro %}
+
+
+{#
+  Highest _dlt_load_id already in {{ this }} (none on the first run)
+#}
+{% macro bronze_watermark(load_id_column='_dlt_load_id') -%}
+  {{ return(run_query(
+    "SELECT MAX(CAST(" ~ load_id_column ~ " AS DOUBLE)) FROM " ~ this
+  ).columns[0].values()[0]) }}
+{%- endmacro %}
+
+
+{#
+  WHERE clause selecting only Bronze rows newer than the model's watermark
+
+  The watermark (highest _dlt_load_id already in {{ this }}) is looked up at
+  compile time and rendered as constants, so DuckDB prunes every
+  year=/month=/day= directory before the watermark day without listing it.
+  Renders nothing on full refreshes and the first run.
+#}
+{% macro bronze_incremental_filter(load_id_column='_dlt_load_id') -%}
+  {%- if is_incremental() and execute -%}
+    {%- set watermark = bronze_watermark(load_id_column) -%}
+    {%- if watermark is not none -%}
+      {%- set watermark_day = modules.datetime.datetime.utcfromtimestamp(watermark).strftime('%Y%m%d') -%}
+  WHERE (year * 10000 + month * 100 + day) >= {{ watermark_day }}
+    AND CAST({{ load_id_column }} AS DOUBLE) > {{ watermark }}
+    {%- endif -%}
+  {%- endif -%}
+{%- endmacro %}
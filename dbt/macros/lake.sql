@@ -0,0 +1,104 @@
+{#
+  Parquet export of Silver/Gold models to R2
+
+  The models stay incremental DuckDB tables. With the `prod` target (or
+  --vars '{lake_export: true}') a post-hook exports the full table to R2
+  after every run:
+
+    s3://<processed bucket>/staging/<model>/user_bucket=N/data_0.parquet
+    s3://<curated bucket>/analytics/marts/<model>/user_bucket=N/data_0.parquet
+
+  The `prod` and `ci` targets are in-memory, so the tables are gone at the
+  start of every run. lake_restore() (on-run-start) recreates each exported
+  incremental model from its last export first; is_incremental() is then
+  true and Bronze is only read for new loads. Without an export (first run,
+  or `ci`) the models are built from the whole Bronze layer.
+
+  Every layer is hash-partitioned on user_id (user_bucket) and sorted by
+  user_id inside each file, so users ⋈ posts reads matching buckets only and
+  row-group min/max statistics on user_id prune point lookups.
+
+  Models declare their export location once, in config:
+    meta={'lake': {'layer': 'processed', 'path': 'staging/stg_api_posts'}},
+    post_hook="{{ lake_export() }}"
+#}
+
+{% macro lake_location(layer, path) -%}
+  {%- if layer == 'processed' -%}
+    {%- set bucket = env_var('R2_BUCKET_PROCESSED', 'data-lake-processed') -%}
+  {%- else -%}
+    {%- set bucket = env_var('R2_BUCKET_CURATED', 'data-lake-curated') -%}
+  {%- endif -%}
+  {{ return('s3://' ~ bucket ~ '/' ~ path) }}
+{%- endmacro %}
+
+
+{#
+  Post-hook exporting {{ this }} as one Parquet file per user_bucket
+
+  Every bucket 0..lake_user_buckets-1 is written on every run, including
+  buckets without rows (an empty file), so a bucket that lost all its rows
+  never keeps a stale file. DuckDB cannot OVERWRITE a partitioned COPY on a
+  remote file system, hence one plain COPY (a single PUT) per bucket.
+
+  Row groups are kept smaller than DuckDB's default (122880 rows) so the
+  user_id min/max ranges per row group stay narrow; override with
+  --vars '{lake_row_group_size: N}'.
+
+  The location defaults to the model's meta.lake (layer, path).
+#}
+{% macro lake_export(layer=none, path=none, partition_by='user_bucket', order_by='user_id') -%}
+  {%- if var('lake_export', target.name == 'prod') -%}
+    {%- set lake = model.config.meta.get('lake', {}) -%}
+    {%- set location = lake_location(layer or lake.layer, path or lake.path) -%}
+    {%- for bucket in range(var('lake_user_buckets', 16)) %}
+COPY (
+  SELECT * EXCLUDE ({{ partition_by }})
+  FROM {{ this }}
+  WHERE {{ partition_by }} = {{ bucket }}
+  ORDER BY {{ order_by }}
+) TO '{{ location }}/{{ partition_by }}={{ bucket }}/data_0.parquet'
+(FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {{ var('lake_row_group_size', 65536) }});
+    {%- endfor %}
+  {%- endif -%}
+{%- endmacro %}
+
+
+{#
+  on-run-start hook recreating exported incremental models from R2
+
+  For every selected incremental model with meta.lake whose table does not
+  exist (in-memory targets), the table is created from its Parquet export
+  (user_bucket comes back as the hive partition column). Skipped with
+  --full-refresh, --vars '{lake_restore: false}', and when export is off.
+  Runs before any model is compiled, so is_incremental() and the Bronze
+  watermark see the restored table.
+#}
+{% macro lake_restore(partition_by='user_bucket') -%}
+  {%- if not execute or flags.FULL_REFRESH or not var('lake_restore', true)
+        or not var('lake_export', target.name == 'prod') -%}
+    {{ return('') }}
+  {%- endif -%}
+  {%- set statements = [] -%}
+  {%- for node in graph.nodes.values()
+        if node.resource_type == 'model' and node.unique_id in selected_resources
+           and node.config.materialized == 'incremental' and node.config.meta.get('lake') -%}
+    {%- set existing = adapter.get_relation(database=node.database, schema=node.schema, identifier=node.alias) -%}
+    {%- set location = lake_location(node.config.meta.lake.layer, node.config.meta.lake.path) -%}
+    {%- set files = location ~ '/' ~ partition_by ~ '=*/*.parquet' -%}
+    {%- if existing is none and run_query("SELECT COUNT(*) FROM glob('" ~ files ~ "')").columns[0].values()[0] > 0 -%}
+      {%- set relation = api.Relation.create(database=node.database, schema=node.schema, identifier=node.alias) -%}
+      {%- do log('Restoring ' ~ relation ~ ' from ' ~ location, info=True) -%}
+      {%- do statements.append(
+            'CREATE SCHEMA IF NOT EXISTS ' ~ relation.without_identifier() ~ ';\n'
+            ~ 'CREATE TABLE ' ~ relation ~ ' AS SELECT * FROM read_parquet(\'' ~ files ~ '\', '
+            ~ 'hive_partitioning = true, hive_types = {\'' ~ partition_by ~ '\': \'INTEGER\'});') -%}
+    {%- endif -%}
+  {%- endfor -%}
+  {{ return(statements | join('\n')) }}
+{%- endmacro %}
+
+
+{% macro user_bucket(column='user_id') -%}
+  ({{ column }} % {{ var('lake_user_buckets', 16) }})
+{%- endmacro %}
@@ -1,6 +1,11 @@
 {{
   config(
-    materialized='table',
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='user_id',
+    on_schema_change='append_new_columns',
+    meta={'lake': {'layer': 'curated', 'path': 'analytics/marts/fct_user_posts'}},
+    post_hook="{{ lake_export() }}",
     tags=['marts', 'analytics']
   )
 }}
@@ -10,36 +15,89 @@
 
   This mart model combines users and their posts for analytics.
   Gold layer data optimized for reporting and dashboards.
+
+  Incremental: the table keeps per-user partial aggregates
+  (post count, sum/max/min of body length). Only users with posts or
+  user attributes loaded after the last run (source_load_id watermark)
+  are recomputed, and their rows replace the previous partials.
+  MAX/MIN cannot be retracted, so changed users are recomputed from
+  their current posts rather than adjusted by deltas.
+  A post moved to another user only refreshes the new owner; run with
+  --full-refresh after such corrections.
+
+  Export (prod): a post-hook writes the whole table to data-lake-curated,
+  partitioned by user_bucket and sorted by user_id (macros/lake.sql).
+  The staging exports are co-partitioned on the same buckets.
 */
 
-WITH users AS (
+{% if is_incremental() %}
+  {% set watermark %}(SELECT COALESCE(MAX(source_load_id), 0) FROM {{ this }}){% endset %}
+{% endif %}
+
+WITH
+
+{% if is_incremental() %}
+changed_users AS (
+  SELECT user_id FROM {{ ref('stg_api_posts') }}
+  WHERE CAST(_dlt_load_id AS DOUBLE) > {{ watermark }}
+  UNION
+  SELECT user_id FROM {{ ref('stg_api_users') }}
+  WHERE CAST(_dlt_load_id AS DOUBLE) > {{ watermark }}
+),
+{% endif %}
+
+users AS (
   SELECT * FROM {{ ref('stg_api_users') }}
+  {% if is_incremental() %}
+  WHERE user_id IN (SELECT user_id FROM changed_users)
+  {% endif %}
 ),
 
 posts AS (
   SELECT * FROM {{ ref('stg_api_posts') }}
+  {% if is_incremental() %}
+  WHERE user_id IN (SELECT user_id FROM changed_users)
+  {% endif %}
+),
+
+post_partials AS (
+  SELECT
+    user_id,
+    COUNT(post_id) AS post_count,
+    SUM(LENGTH(body)) AS sum_post_length,
+    MAX(LENGTH(body)) AS max_post_length,
+    MIN(LENGTH(body)) AS min_post_length,
+    MAX(loaded_at) AS last_post_loaded_at,
+    MAX(CAST(_dlt_load_id AS DOUBLE)) AS max_load_id
+  FROM posts
+  GROUP BY 1
 ),
 
 user_post_metrics AS (
   SELECT
     u.user_id,
+    u.user_bucket,
     u.user_name,
     u.username,
     u.email,
 
-    -- Post metrics
-    COUNT(p.post_id) AS total_posts,
-    AVG(LENGTH(p.body)) AS avg_post_length,
-    MAX(LENGTH(p.body)) AS max_post_length,
-    MIN(LENGTH(p.body)) AS min_post_length,
+    -- Post metrics (AVG is derived from the count/sum partials)
+    COALESCE(p.post_count, 0) AS total_posts,
+    p.sum_post_length / NULLIF(p.post_count, 0) AS avg_post_length,
+    p.max_post_length,
+    p.min_post_length,
 
     -- Metadata
-    MAX(p.loaded_at) AS last_post_loaded_at,
-    CURRENT_TIMESTAMP AS calculated_at
+    p.last_post_loaded_at,
+    CURRENT_TIMESTAMP AS calculated_at,
+
+    -- Partials and watermark for incremental runs
+    COALESCE(p.sum_post_length, 0) AS sum_post_length,
+    GREATEST(CAST(u._dlt_load_id AS DOUBLE), COALESCE(p.max_load_id, 0)) AS source_load_id
 
   FROM users u
-  LEFT JOIN posts p ON u.user_id = p.user_id
-  GROUP BY 1, 2, 3, 4
+  LEFT JOIN post_partials p ON u.user_id = p.user_id
 )
 
 SELECT * FROM user_post_metrics
+ORDER BY user_id
@@ -1,6 +1,11 @@
 {{
   config(
-    materialized='view',
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='post_id',
+    on_schema_change='append_new_columns',
+    meta={'lake': {'layer': 'processed', 'path': 'staging/stg_api_posts'}},
+    post_hook="{{ lake_export() }}",
     tags=['staging', 'api_data']
   )
 }}
@@ -10,12 +15,19 @@
 
   This model reads raw data from R2 Bronze layer and applies
   basic transformations and standardization.
+
+  Incremental: only partitions/loads above the last processed
+  _dlt_load_id are read, and rows are merged on post_id.
+  Export (prod): a post-hook writes the whole table to
+  data-lake-processed, partitioned by user_bucket and sorted by
+  user_id (macros/lake.sql).
 */
 
 WITH source AS (
   SELECT
     *
-  FROM read_parquet('s3://{{ env_var("R2_BUCKET_NAME", "data-lake-raw") }}/sources/api_jsonplaceholder/posts/**/*.parquet')
+  FROM {{ read_bronze('posts') }}
+  {{ bronze_incremental_filter() }}
 ),
 
 cleaned AS (
@@ -25,15 +37,20 @@ cleaned AS (
 
     -- Foreign keys
     CAST(userId AS INTEGER) AS user_id,
+    {{ user_bucket('CAST(userId AS INTEGER)') }} AS user_bucket,
 
     -- Attributes
     CAST(title AS VARCHAR) AS title,
     CAST(body AS VARCHAR) AS body,
 
     -- Metadata
-    CURRENT_TIMESTAMP AS loaded_at
+    {{ dlt_loaded_at() }} AS loaded_at,
+    _dlt_load_id
 
   FROM source
+  -- A post may appear in several loads of one batch: keep the latest
+  QUALIFY ROW_NUMBER() OVER (PARTITION BY CAST(id AS INTEGER) ORDER BY CAST(_dlt_load_id AS DOUBLE) DESC) = 1
 )
 
 SELECT * FROM cleaned
+ORDER BY user_id, post_id
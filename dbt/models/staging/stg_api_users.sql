@@ -1,6 +1,11 @@
 {{
   config(
-    materialized='view',
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='user_id',
+    on_schema_change='append_new_columns',
+    meta={'lake': {'layer': 'processed', 'path': 'staging/stg_api_users'}},
+    post_hook="{{ lake_export() }}",
     tags=['staging', 'api_data']
   )
 }}
@@ -10,18 +15,26 @@
 
   This model reads raw user data from R2 Bronze layer and
   flattens nested JSON structures.
+
+  Incremental: only partitions/loads above the last processed
+  _dlt_load_id are read, and rows are merged on user_id.
+  Export (prod): a post-hook writes the whole table to
+  data-lake-processed, partitioned by user_bucket and sorted by
+  user_id (macros/lake.sql).
 */
 
 WITH source AS (
   SELECT
     *
-  FROM read_parquet('s3://{{ env_var("R2_BUCKET_NAME", "data-lake-raw") }}/sources/api_jsonplaceholder/users/**/*.parquet')
+  FROM {{ read_bronze('users') }}
+  {{ bronze_incremental_filter() }}
 ),
 
 cleaned AS (
   SELECT
     -- Primary key
     CAST(id AS INTEGER) AS user_id,
+    {{ user_bucket('CAST(id AS INTEGER)') }} AS user_bucket,
 
     -- User attributes
     CAST(name AS VARCHAR) AS user_name,
@@ -38,9 +51,13 @@ cleaned AS (
     CAST(company AS JSON) AS company_json,
 
     -- Metadata
-    CURRENT_TIMESTAMP AS loaded_at
+    {{ dlt_loaded_at() }} AS loaded_at,
+    _dlt_load_id
 
   FROM source
+  -- A user may appear in several loads of one batch: keep the latest
+  QUALIFY ROW_NUMBER() OVER (PARTITION BY CAST(id AS INTEGER) ORDER BY CAST(_dlt_load_id AS DOUBLE) DESC) = 1
 )
 
 SELECT * FROM cleaned
+ORDER BY user_id
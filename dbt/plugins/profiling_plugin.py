@@ -0,0 +1,125 @@
+"""
+dbt-duckdb plugin capturing DuckDB query profiles per model
+
+When ``DBT_PROFILE_MODELS`` is set, every statement dbt runs for a model is
+executed with DuckDB JSON profiling enabled. The model is identified from the
+``node_id`` in dbt's default query comment. For each statement the plugin
+keeps the latency, CPU time, rows scanned/produced, bytes read/written and
+the time spent per operator type.
+
+The profiles are collected in ``PROFILES`` and read by
+``scripts/profile_dbt_run.py``, which runs dbt in-process and appends them
+to the local profiling table.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Any
+
+from dbt.adapters.duckdb.plugins import BasePlugin
+
+NODE_ID_PATTERN = re.compile(r'"node_id":\s*"([^"]+)"')
+# Statements that only change settings or metadata are not profiled
+SKIPPED_STATEMENTS = re.compile(r"^\s*(SET|RESET|PRAGMA|BEGIN|COMMIT|ROLLBACK|USE|ATTACH|DETACH)\b", re.I)
+
+PROFILES: dict[str, list[dict[str, Any]]] = defaultdict(list)
+_lock = threading.Lock()
+
+
+def _metric(node: dict[str, Any], *names: str) -> Any:
+    # Metric names differ between DuckDB versions (e.g. operator_timing / timing)
+    for name in names:
+        if node.get(name) is not None:
+            return node[name]
+    return None
+
+
+def summarize_profile(profile: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a DuckDB JSON profile to statement metrics and per-operator timings"""
+    operator_seconds: dict[str, float] = defaultdict(float)
+
+    def walk(node: dict[str, Any]) -> None:
+        operator = _metric(node, "operator_type", "operator_name", "name")
+        timing = _metric(node, "operator_timing", "timing")
+        if operator and timing:
+            operator_seconds[operator.strip()] += float(timing)
+        for child in node.get("children") or []:
+            walk(child)
+
+    for child in profile.get("children") or []:
+        walk(child)
+
+    # The root's first child is the sink (CREATE TABLE AS / COPY / INSERT); its input is the model output
+    sink = (profile.get("children") or [{}])[0]
+    produced = (sink.get("children") or [{}])[0]
+
+    return {
+        "latency_seconds": _metric(profile, "latency", "timing"),
+        "cpu_seconds": _metric(profile, "cpu_time"),
+        "rows_scanned": _metric(profile, "cumulative_rows_scanned"),
+        "rows_produced": _metric(produced, "operator_cardinality", "cardinality"),
+        "bytes_read": _metric(profile, "total_bytes_read"),
+        "bytes_written": _metric(profile, "total_bytes_written"),
+        "peak_memory_bytes": _metric(profile, "system_peak_buffer_memory"),
+        "operator_seconds": dict(operator_seconds),
+    }
+
+
+class ProfilingCursor:
+    """Cursor proxy running each model statement with JSON profiling"""
+
+    def __init__(self, cursor, output_dir: str):
+        self._cursor = cursor
+        self._output_dir = output_dir
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, sql, *args, **kwargs):
+        match = NODE_ID_PATTERN.search(sql) if isinstance(sql, str) else None
+        body = sql.split("*/", 1)[-1] if match else ""
+        if not match or SKIPPED_STATEMENTS.match(body):
+            return self._cursor.execute(sql, *args, **kwargs)
+
+        path = os.path.join(self._output_dir, f"{threading.get_ident()}.json")
+        if os.path.exists(path):
+            os.remove(path)
+        # Output path first: enabling profiling without one prints profiles to stdout
+        self._cursor.execute(f"SET profiling_output = '{path}'")
+        self._cursor.execute("SET profiling_mode = 'detailed'")
+        self._cursor.execute("SET enable_profiling = 'json'")
+        try:
+            result = self._cursor.execute(sql, *args, **kwargs)
+            # Read the profile before the next statement overwrites it
+            self._record(match.group(1), body, path)
+            return result
+        finally:
+            self._cursor.execute("PRAGMA disable_profiling")
+
+    def _record(self, node_id: str, body: str, path: str) -> None:
+        try:
+            with open(path) as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return
+        summary = summarize_profile(profile)
+        summary["statement"] = " ".join(body.split())[:200]
+        with _lock:
+            PROFILES[node_id].append(summary)
+
+
+class Plugin(BasePlugin):
+    def initialize(self, plugin_config: dict[str, Any]):
+        self.enabled = bool(os.getenv("DBT_PROFILE_MODELS"))
+        self.output_dir: str | None = (
+            tempfile.mkdtemp(prefix="dbt_profiles_") if self.enabled else None
+        )
+
+    def configure_cursor(self, cursor):
+        if not self.enabled:
+            return cursor
+        return ProfilingCursor(cursor, self.output_dir)
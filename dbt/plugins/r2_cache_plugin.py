@@ -0,0 +1,36 @@
+"""
+dbt-duckdb plugin routing s3:// reads through the local R2 block cache
+
+Registers ``great_expectations/plugins/r2_cache.py`` on every dbt-duckdb
+connection when ``R2_CACHE_DIR`` is set, so dev runs share the cache with the
+validation scripts and notebooks. Enabled for the ``dev`` target in
+``profiles.yml``.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from dbt.adapters.duckdb.plugins import BasePlugin
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "great_expectations" / "plugins"))
+
+from r2_cache import register_cache  # noqa: E402
+
+
+class Plugin(BasePlugin):
+    def initialize(self, plugin_config: dict[str, Any]):
+        self.cache_dir = plugin_config.get("cache_dir") or os.getenv("R2_CACHE_DIR")
+
+    def configure_connection(self, conn):
+        endpoint = os.getenv("R2_ENDPOINT")
+        if not (self.cache_dir and endpoint):
+            return
+        register_cache(
+            conn,
+            endpoint,
+            os.getenv("R2_ACCESS_KEY_ID", ""),
+            os.getenv("R2_SECRET_ACCESS_KEY", ""),
+            directory=self.cache_dir,
+        )
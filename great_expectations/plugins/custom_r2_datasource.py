@@ -5,11 +5,35 @@ This plugin provides a custom datasource that reads Parquet files
 directly from Cloudflare R2 using DuckDB.
 """
 
+import json
 import os
-from typing import Dict, Any, Optional
+import re
+import sys
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
 import duckdb
-from great_expectations.datasource import Datasource
+import pandas as pd
+import pyarrow as pa
+from great_expectations.core.batch import Batch, BatchDefinition, IDDict
+from great_expectations.core.batch_spec import RuntimeQueryBatchSpec
+from great_expectations.datasource.data_connector import DataConnector
+from great_expectations.datasource.data_connector.batch_filter import build_batch_filter
 from great_expectations.execution_engine import SqlAlchemyExecutionEngine
+from great_expectations.validator.validator import Validator
+
+from r2_connection import R2ConnectionFactory
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from validation_engine import DATASETS, dataset_source_sql, parquet_source  # noqa: E402
+
+# {column: value} or [(column, operator, value), ...]
+Filters = dict[str, Any] | Sequence[tuple[Any, ...]]
 
 
 class R2DuckDBDatasource:
@@ -36,51 +60,586 @@ class R2DuckDBDatasource:
         Returns:
             DuckDB connection object
         """
-        conn = duckdb.connect(database=database)
+        factory = R2ConnectionFactory(
+            endpoint=r2_endpoint,
+            access_key_id=r2_access_key_id,
+            secret_access_key=r2_secret_access_key,
+        )
+        conn = factory.connect(database=database)
+
+        return conn
+
+    @staticmethod
+    def build_parquet_query(
+        bucket: str,
+        path: str,
+        columns: Sequence[str] | None = None,
+        filters: Filters | None = None,
+        limit: int | None = None,
+        hive_partitioning: bool = True
+    ) -> str:
+        """
+        Build a read_parquet query with projection, predicates and limit
 
-        # Install and load required extensions
-        conn.execute("INSTALL httpfs;")
-        conn.execute("LOAD httpfs;")
-        conn.execute("INSTALL parquet;")
-        conn.execute("LOAD parquet;")
+        DuckDB pushes the projection and predicates into the Parquet scan
+        (only the selected column chunks are fetched, row groups are pruned
+        by min/max statistics) and prunes hive partitions (year=/month=/day=)
+        before listing their files.
 
-        # Configure S3 (R2) settings
-        conn.execute(f"SET s3_endpoint='{r2_endpoint}';")
-        conn.execute(f"SET s3_access_key_id='{r2_access_key_id}';")
-        conn.execute(f"SET s3_secret_access_key='{r2_secret_access_key}';")
-        conn.execute("SET s3_region='auto';")
+        Args:
+            bucket: R2 bucket name
+            path: Path to Parquet file(s) (supports wildcards)
+            columns: Columns to read (default: all)
+            filters: ``{column: value}`` (a list value means IN) or a list of
+                ``(column, operator, value)`` tuples. Operators: =, !=, <, <=, >, >=,
+                in, not in, is null, is not null. Partition columns are allowed.
+            limit: Maximum number of rows
+            hive_partitioning: Expose hive partition directories as columns
 
-        return conn
+        Returns:
+            SQL query string
+        """
+        s3_path = _quote_literal(f"s3://{bucket}/{path}")
+        projection = ", ".join(_quote_identifier(c) for c in columns) if columns else "*"
+        query = (
+            f"SELECT {projection} FROM read_parquet({s3_path}, "
+            f"hive_partitioning={'true' if hive_partitioning else 'false'})"
+        )
+
+        predicates = _render_filters(filters)
+        if predicates:
+            query += " WHERE " + " AND ".join(predicates)
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        return query
 
     @staticmethod
     def read_parquet_from_r2(
         conn: duckdb.DuckDBPyConnection,
         bucket: str,
-        path: str
+        path: str,
+        columns: Sequence[str] | None = None,
+        filters: Filters | None = None,
+        limit: int | None = None,
+        hive_partitioning: bool = True
     ) -> duckdb.DuckDBPyRelation:
         """
-        Read Parquet file(s) from R2
+        Read Parquet file(s) from R2 lazily
+
+        Nothing is downloaded until the relation is consumed; call ``.df()``,
+        ``.arrow()`` or ``.fetchall()`` on the result to materialize it.
+
+        Args:
+            conn: DuckDB connection
+            bucket: R2 bucket name
+            path: Path to Parquet file(s) (supports wildcards)
+            columns: Columns to read (default: all)
+            filters: Predicates pushed into the scan (see ``build_parquet_query``)
+            limit: Maximum number of rows
+            hive_partitioning: Expose hive partition directories as columns
+
+        Returns:
+            DuckDB relation (lazy)
+        """
+        query = R2DuckDBDatasource.build_parquet_query(
+            bucket, path, columns, filters, limit, hive_partitioning
+        )
+        return conn.sql(query)
+
+    @staticmethod
+    def read_arrow_batches_from_r2(
+        conn: duckdb.DuckDBPyConnection,
+        bucket: str,
+        path: str,
+        columns: Sequence[str] | None = None,
+        filters: Filters | None = None,
+        limit: int | None = None,
+        batch_size: int = 100_000,
+        hive_partitioning: bool = True
+    ) -> pa.RecordBatchReader:
+        """
+        Stream Parquet file(s) from R2 as Arrow record batches
 
         Args:
             conn: DuckDB connection
             bucket: R2 bucket name
             path: Path to Parquet file(s) (supports wildcards)
+            columns: Columns to read (default: all)
+            filters: Predicates pushed into the scan (see ``build_parquet_query``)
+            limit: Maximum number of rows
+            batch_size: Rows per record batch
+            hive_partitioning: Expose hive partition directories as columns
+
+        Returns:
+            Arrow RecordBatchReader (memory bounded by ``batch_size``)
+        """
+        query = R2DuckDBDatasource.build_parquet_query(
+            bucket, path, columns, filters, limit, hive_partitioning
+        )
+        return conn.execute(query).fetch_record_batch(batch_size)
+
+    @staticmethod
+    def read_pandas_from_r2(
+        conn: duckdb.DuckDBPyConnection,
+        bucket: str,
+        path: str,
+        columns: Sequence[str] | None = None,
+        filters: Filters | None = None,
+        limit: int | None = None,
+        hive_partitioning: bool = True
+    ) -> pd.DataFrame:
+        """
+        Read Parquet file(s) from R2 into pandas (projection/filters still pushed down)
+
+        Returns:
+            pandas DataFrame
+        """
+        return R2DuckDBDatasource.read_parquet_from_r2(
+            conn, bucket, path, columns, filters, limit, hive_partitioning
+        ).df()
+
+
+FILTER_OPERATORS = {"=", "!=", "<>", "<", "<=", ">", ">=", "in", "not in", "is null", "is not null"}
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _render_filters(filters: Filters | None) -> list[str]:
+    """Render filters as SQL predicates with escaped literals"""
+    if not filters:
+        return []
+
+    if isinstance(filters, dict):
+        filters = [
+            (column, "in" if isinstance(value, (list, tuple, set)) else "=", value)
+            for column, value in filters.items()
+        ]
+
+    predicates = []
+    for column, operator, *rest in filters:
+        operator = operator.lower()
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+
+        ident = _quote_identifier(column)
+        if operator in ("is null", "is not null"):
+            predicates.append(f"{ident} {operator.upper()}")
+        elif operator in ("in", "not in"):
+            values = ", ".join(_quote_literal(v) for v in rest[0])
+            predicates.append(f"{ident} {operator.upper()} ({values})")
+        else:
+            predicates.append(f"{ident} {operator} {_quote_literal(rest[0])}")
+
+    return predicates
+
+
+PARTITION_SEGMENT_PATTERN = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)=([^/]+)$")
+DEFAULT_PARTITION_KEYS = ("year", "month", "day")
+
+
+class R2PartitionListing:
+    """
+    Cached listing of hive-partitioned Parquet objects under one R2 prefix
+
+    Bronze partitions are append-only, so after the first full listing only
+    the newest partition and the ones after it are listed again
+    (``StartAfter``). The listing is reused for ``ttl_seconds`` and, when
+    ``cache_dir`` is set, persisted as JSON so later processes start from it.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket: str,
+        prefix: str,
+        partition_keys: Sequence[str] = DEFAULT_PARTITION_KEYS,
+        ttl_seconds: float = 300.0,
+        cache_dir: str | None = None
+    ):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.partition_keys = tuple(partition_keys)
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = (
+            Path(cache_dir) / bucket / f"{self.prefix.replace('/', '__')}.json" if cache_dir else None
+        )
+        self.unmatched: list[str] = []
+        self._partitions: dict[str, dict[str, Any]] = {}
+        self._listed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def partitions(self, refresh: bool = False) -> dict[str, dict[str, Any]]:
+        """
+        Partitions keyed by path (``year=YYYY/month=MM/day=DD``)
+
+        Args:
+            refresh: Discard the cached listing and list the whole prefix again
 
         Returns:
-            DuckDB relation (query result)
+            ``{path: {"identifiers": {key: value}, "objects": {key: etag}}}``
         """
-        s3_path = f"s3://{bucket}/{path}"
-        return conn.execute(f"SELECT * FROM read_parquet('{s3_path}')").fetchdf()
+        with self._lock:
+            expired = (
+                self._listed_at is None or time.monotonic() - self._listed_at > self.ttl_seconds
+            )
+            if refresh or expired:
+                self._refresh(full=refresh)
+            return self._partitions
+
+    def _refresh(self, full: bool) -> None:
+        partitions = {} if full else (self._partitions or self._load())
+
+        start_after = None
+        if partitions:
+            # Keys are zero-padded, so the lexicographic maximum is the newest partition
+            start_after = f"{self.prefix}/{max(partitions)}"
+
+        kwargs = {"Bucket": self.bucket, "Prefix": f"{self.prefix}/"}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+
+        unmatched = []
+        for page in self.s3_client.get_paginator("list_objects_v2").paginate(**kwargs):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if not key.endswith(".parquet"):
+                    continue
+                identifiers = self._identifiers(key)
+                if identifiers is None:
+                    unmatched.append(key)
+                    continue
+                path = "/".join(f"{name}={identifiers[name]}" for name in self.partition_keys)
+                partition = partitions.setdefault(path, {"identifiers": identifiers, "objects": {}})
+                partition["objects"][key] = obj["ETag"].strip('"')
+
+        self._partitions = partitions
+        self.unmatched = unmatched
+        self._listed_at = time.monotonic()
+        self._save()
+
+    def _identifiers(self, key: str) -> dict[str, str] | None:
+        segments = key[len(self.prefix) + 1:].split("/")[:-1]
+        values = {}
+        for segment in segments:
+            match = PARTITION_SEGMENT_PATTERN.match(segment)
+            if match:
+                values[match.group(1)] = match.group(2)
+        if not all(name in values for name in self.partition_keys):
+            return None
+        return {name: values[name] for name in self.partition_keys}
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        return json.loads(self.cache_path.read_text())
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps(self._partitions))
+
+
+class R2SqlAlchemyExecutionEngine(SqlAlchemyExecutionEngine):
+    """
+    SqlAlchemyExecutionEngine for ``duckdb:///`` whose connections are set up
+    by ``R2ConnectionFactory.configure`` (httpfs, settings and the R2 secret)
+
+    Configured in ``great_expectations.yml``::
+
+        execution_engine:
+          class_name: R2SqlAlchemyExecutionEngine
+          module_name: custom_r2_datasource
+          connection_string: "duckdb:///:memory:"
+          create_temp_table: false
+
+    Credentials default to the ``R2_*`` environment variables.
+    """
+
+    def __init__(
+        self,
+        *args,
+        r2_endpoint: str | None = None,
+        r2_access_key_id: str | None = None,
+        r2_secret_access_key: str | None = None,
+        **kwargs
+    ):
+        factory = R2ConnectionFactory(
+            endpoint=r2_endpoint,
+            access_key_id=r2_access_key_id,
+            secret_access_key=r2_secret_access_key,
+        )
+        kwargs.setdefault("connect_args", factory.sqlalchemy_connect_args())
+        super().__init__(*args, **kwargs)
+        # The engine connects lazily, so every pooled connection runs the hook
+        factory.attach_to_engine(self.engine)
+
+
+class R2PartitionedParquetDataConnector(DataConnector):
+    """
+    Data connector exposing each hive partition of an R2 Parquet prefix as a batch
+
+    Configured per asset in ``great_expectations.yml``::
+
+        r2_parquet_connector:
+          class_name: R2PartitionedParquetDataConnector
+          module_name: custom_r2_datasource
+          bucket: data-lake-raw
+          assets:
+            api_posts:
+              prefix: sources/api_jsonplaceholder/posts
+              dataset: api_posts  # optional, defaults to the asset name
+
+    Assets whose dataset is in ``validation_engine.DATASETS`` are projected to
+    their staging columns (the columns the suites expect), like the
+    single-pass engine and the runtime batches of ``run_great_expectations``.
+
+    Batch identifiers are the partition keys (``year``, ``month``, ``day``),
+    so a single day is selected with ``data_connector_query``::
+
+        {"batch_filter_parameters": {"year": "2024", "month": "01", "day": "15"}}
+
+    Batches are ordered oldest to newest; a batch request without a query
+    therefore validates the newest partition. Each batch is a query over the
+    explicit file list of its partition, so no LIST call happens at query time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        datasource_name: str,
+        execution_engine: SqlAlchemyExecutionEngine,
+        assets: dict[str, dict[str, Any]],
+        bucket: str | None = None,
+        base_path: str = "",
+        partition_keys: Sequence[str] = DEFAULT_PARTITION_KEYS,
+        listing_ttl_seconds: float = 300.0,
+        listing_cache_dir: str | None = None,
+        r2_endpoint: str | None = None,
+        r2_access_key_id: str | None = None,
+        r2_secret_access_key: str | None = None,
+        batch_spec_passthrough: dict | None = None,
+        id: str | None = None
+    ):
+        super().__init__(
+            name=name,
+            id=id,
+            datasource_name=datasource_name,
+            execution_engine=execution_engine,
+            batch_spec_passthrough=batch_spec_passthrough,
+        )
+        self.bucket = bucket or os.getenv("R2_BUCKET_NAME", "data-lake-raw")
+        self.partition_keys = tuple(partition_keys)
+
+        s3_client = R2ConnectionFactory(
+            endpoint=r2_endpoint,
+            access_key_id=r2_access_key_id,
+            secret_access_key=r2_secret_access_key,
+        ).s3_client()
+        self._listings = {
+            asset_name: R2PartitionListing(
+                s3_client,
+                asset.get("bucket", self.bucket),
+                "/".join(part.strip("/") for part in (base_path, asset["prefix"]) if part.strip("/")),
+                partition_keys=asset.get("partition_keys", self.partition_keys),
+                ttl_seconds=listing_ttl_seconds,
+                cache_dir=listing_cache_dir,
+            )
+            for asset_name, asset in assets.items()
+        }
+        self._datasets = {asset_name: asset.get("dataset", asset_name) for asset_name, asset in assets.items()}
+
+    def get_partitions(self, data_asset_name: str, refresh: bool = False) -> dict[str, dict[str, Any]]:
+        """Partitions of an asset (see ``R2PartitionListing.partitions``)"""
+        if data_asset_name not in self._listings:
+            raise ValueError(f"Unknown data asset '{data_asset_name}' for connector '{self.name}'")
+        return self._listings[data_asset_name].partitions(refresh=refresh)
+
+    def refresh(self) -> None:
+        """Force a full re-listing of every asset"""
+        for data_asset_name in self._listings:
+            self.get_partitions(data_asset_name, refresh=True)
+
+    def get_available_data_asset_names(self) -> list[str]:
+        return list(self._listings)
+
+    def _refresh_data_references_cache(self) -> None:
+        self._data_references_cache = {
+            data_asset_name: sorted(self.get_partitions(data_asset_name))
+            for data_asset_name in self._listings
+        }
+
+    def _get_data_reference_list(self, data_asset_name: str | None = None) -> list[str]:
+        return sorted(self.get_partitions(data_asset_name))
+
+    def _get_data_reference_list_from_cache_by_data_asset_name(self, data_asset_name: str) -> list[str]:
+        return self._get_data_reference_list(data_asset_name)
+
+    def get_data_reference_count(self) -> int:
+        return sum(len(self.get_partitions(name)) for name in self._listings)
+
+    def get_unmatched_data_references(self) -> list[str]:
+        return [key for listing in self._listings.values() for key in listing.unmatched]
+
+    def get_batch_definition_list_from_batch_request(self, batch_request) -> list[BatchDefinition]:
+        return self._get_batch_definition_list_from_batch_request(batch_request)
+
+    def _get_batch_definition_list_from_batch_request(self, batch_request) -> list[BatchDefinition]:
+        self._validate_batch_request(batch_request=batch_request)
+
+        data_asset_names = (
+            [batch_request.data_asset_name] if batch_request.data_asset_name else list(self._listings)
+        )
+        batch_definition_list = [
+            batch_definition
+            for data_asset_name in data_asset_names
+            for data_reference in self._get_data_reference_list(data_asset_name)
+            for batch_definition in self._map_data_reference_to_batch_definition_list(
+                data_reference, data_asset_name
+            )
+        ]
+
+        data_connector_query = getattr(batch_request, "data_connector_query", None)
+        if data_connector_query:
+            batch_filter = build_batch_filter(data_connector_query_dict=data_connector_query)
+            batch_definition_list = batch_filter.select_from_data_connector_query(
+                batch_definition_list=batch_definition_list
+            )
+
+        return batch_definition_list
+
+    def _map_data_reference_to_batch_definition_list(
+        self, data_reference: str, data_asset_name: str | None = None
+    ) -> list[BatchDefinition]:
+        identifiers = self.get_partitions(data_asset_name)[data_reference]["identifiers"]
+        return [
+            BatchDefinition(
+                datasource_name=self.datasource_name,
+                data_connector_name=self.name,
+                data_asset_name=data_asset_name,
+                batch_identifiers=IDDict(identifiers),
+            )
+        ]
+
+    def _map_batch_definition_to_data_reference(self, batch_definition: BatchDefinition) -> str:
+        listing = self._listings[batch_definition.data_asset_name]
+        return "/".join(
+            f"{name}={batch_definition.batch_identifiers[name]}" for name in listing.partition_keys
+        )
+
+    def _generate_batch_spec_parameters_from_batch_definition(
+        self, batch_definition: BatchDefinition
+    ) -> dict:
+        data_reference = self._map_batch_definition_to_data_reference(batch_definition)
+        listing = self._listings[batch_definition.data_asset_name]
+        partition = self.get_partitions(batch_definition.data_asset_name)[data_reference]
+
+        paths = [f"s3://{listing.bucket}/{key}" for key in sorted(partition["objects"])]
+        dataset = self._datasets[batch_definition.data_asset_name]
+        source = dataset_source_sql(dataset, paths) if dataset in DATASETS else parquet_source(paths)
+        return {
+            "query": f"SELECT * FROM {source}",
+            "data_asset_name": batch_definition.data_asset_name,
+        }
+
+    def build_batch_spec(self, batch_definition: BatchDefinition) -> RuntimeQueryBatchSpec:
+        batch_spec_params = self._generate_batch_spec_parameters_from_batch_definition(
+            batch_definition=batch_definition
+        )
+        if self.batch_spec_passthrough:
+            batch_spec_params.update(self.batch_spec_passthrough)
+        return RuntimeQueryBatchSpec(batch_spec_params)
+
+
+def validate_partitions_in_parallel(
+    context,
+    datasource_name: str,
+    data_connector_name: str,
+    data_asset_name: str,
+    expectation_suite_name: str,
+    partitions: Sequence[str] | None = None,
+    max_workers: int = 4
+) -> dict[str, Any]:
+    """
+    Validate partitions of an asset concurrently, one batch per partition
+
+    Every partition gets its own execution engine (sharing the datasource's
+    SQLAlchemy engine pool, so each worker thread uses its own DuckDB
+    connection) and its own validator, so a slow or failing day does not
+    affect the others.
+
+    Args:
+        context: Great Expectations context
+        datasource_name: Datasource with an ``R2PartitionedParquetDataConnector``
+        data_connector_name: Name of that connector
+        data_asset_name: Asset to validate
+        expectation_suite_name: Suite to validate against
+        partitions: Partition paths to validate (default: all)
+        max_workers: Number of partitions validated at the same time
+
+    Returns:
+        Mapping of partition path to validation result
+    """
+    datasource = context.get_datasource(datasource_name)
+    connector = datasource.data_connectors[data_connector_name]
+    suite = context.get_expectation_suite(expectation_suite_name)
+    selected = sorted(partitions or connector.get_partitions(data_asset_name))
+
+    def validate(partition: str):
+        identifiers = connector.get_partitions(data_asset_name)[partition]["identifiers"]
+        batch_definition = BatchDefinition(
+            datasource_name=datasource_name,
+            data_connector_name=data_connector_name,
+            data_asset_name=data_asset_name,
+            batch_identifiers=IDDict(identifiers),
+        )
+        execution_engine = SqlAlchemyExecutionEngine(
+            engine=datasource.execution_engine.engine, create_temp_table=False
+        )
+        batch_spec = connector.build_batch_spec(batch_definition)
+        batch_data, batch_markers = execution_engine.get_batch_data_and_markers(batch_spec=batch_spec)
+        batch = Batch(
+            data=batch_data,
+            batch_definition=batch_definition,
+            batch_spec=batch_spec,
+            batch_markers=batch_markers,
+        )
+        validator = Validator(
+            execution_engine=execution_engine,
+            expectation_suite=suite,
+            data_context=context,
+            batches=[batch],
+        )
+        return validator.validate()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(selected, executor.map(validate, selected), strict=True))
 
 
 def get_r2_datasource_config(
     datasource_name: str,
     r2_bucket: str,
     base_path: str = "",
-    r2_endpoint: Optional[str] = None,
-    r2_access_key_id: Optional[str] = None,
-    r2_secret_access_key: Optional[str] = None
-) -> Dict[str, Any]:
+    r2_endpoint: str | None = None,
+    r2_access_key_id: str | None = None,
+    r2_secret_access_key: str | None = None,
+    assets: dict[str, str] | None = None,
+    listing_cache_dir: str | None = None
+) -> dict[str, Any]:
     """
     Generate Great Expectations datasource configuration for R2
 
@@ -91,22 +650,44 @@ def get_r2_datasource_config(
         r2_endpoint: R2 endpoint (defaults to env var)
         r2_access_key_id: R2 access key ID (defaults to env var)
         r2_secret_access_key: R2 secret access key (defaults to env var)
+        assets: Mapping of data asset name to prefix (relative to ``base_path``)
+            exposed by the partitioned ``r2_parquet_connector``
+        listing_cache_dir: Directory for the persisted partition listing
 
     Returns:
         Datasource configuration dictionary
     """
-    r2_endpoint = r2_endpoint or os.getenv("R2_ENDPOINT")
-    r2_access_key_id = r2_access_key_id or os.getenv("R2_ACCESS_KEY_ID")
-    r2_secret_access_key = r2_secret_access_key or os.getenv("R2_SECRET_ACCESS_KEY")
+    factory = R2ConnectionFactory(
+        endpoint=r2_endpoint,
+        access_key_id=r2_access_key_id,
+        secret_access_key=r2_secret_access_key,
+    )
 
     return {
         "name": datasource_name,
         "class_name": "Datasource",
         "execution_engine": {
-            "class_name": "SqlAlchemyExecutionEngine",
+            "class_name": "R2SqlAlchemyExecutionEngine",
+            "module_name": "custom_r2_datasource",
             "connection_string": "duckdb:///:memory:",
+            "create_temp_table": False,
+            # Every pooled DuckDB connection runs R2ConnectionFactory.configure
+            "r2_endpoint": factory.endpoint,
+            "r2_access_key_id": factory.access_key_id,
+            "r2_secret_access_key": factory.secret_access_key,
         },
         "data_connectors": {
+            "r2_parquet_connector": {
+                "class_name": "R2PartitionedParquetDataConnector",
+                "module_name": "custom_r2_datasource",
+                "bucket": r2_bucket,
+                "base_path": base_path,
+                "assets": {name: {"prefix": prefix} for name, prefix in (assets or {}).items()},
+                "listing_cache_dir": listing_cache_dir,
+                "r2_endpoint": factory.endpoint,
+                "r2_access_key_id": factory.access_key_id,
+                "r2_secret_access_key": factory.secret_access_key,
+            },
             "default_runtime_data_connector": {
                 "class_name": "RuntimeDataConnector",
                 "batch_identifiers": ["batch_id"],
@@ -0,0 +1,610 @@
+"""
+Mergeable per-partition statistical sketches
+
+For every landed Bronze (or Iceberg) partition this module computes, per column:
+row/null counts, the exact distinct count, min/max, a HyperLogLog distinct-count
+sketch and a t-digest (over values for numeric columns, over lengths for string
+columns). Sketches are persisted as small Parquet sidecars and merged on read, so
+uniqueness, range and drift checks cost O(partitions) instead of O(rows).
+
+Uniqueness is only reported as passing when the sidecars prove it: every
+partition is unique on its own and the partitions' value ranges do not overlap.
+HLL estimates are too coarse to tell a unique key from one with a few duplicates.
+"""
+
+import math
+import os
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+from typing import Any
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NUMERIC_TYPE_PREFIXES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT",
+    "FLOAT", "DOUBLE", "DECIMAL", "REAL",
+)
+STRING_TYPE_PREFIXES = ("VARCHAR", "STRING", "TEXT")
+
+SIDECAR_SCHEMA = pa.schema([
+    ("partition", pa.string()),
+    ("column_name", pa.string()),
+    ("column_type", pa.string()),
+    ("row_count", pa.int64()),
+    ("null_count", pa.int64()),
+    ("distinct_count", pa.int64()),
+    ("min_value", pa.string()),
+    ("max_value", pa.string()),
+    ("digest_of", pa.string()),
+    ("min_numeric", pa.float64()),
+    ("max_numeric", pa.float64()),
+    ("hll_precision", pa.int32()),
+    ("hll_registers", pa.binary()),
+    ("tdigest_means", pa.list_(pa.float64())),
+    ("tdigest_weights", pa.list_(pa.float64())),
+    ("computed_at", pa.timestamp("us", tz="UTC")),
+])
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 64-bit hashes
+
+    Registers merge by element-wise max, so partition sketches can be
+    combined in any order. Standard error is about 1.04 / sqrt(2 ** precision).
+    """
+
+    def __init__(self, precision: int = 14, registers: np.ndarray | None = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = (
+            registers.astype(np.uint8) if registers is not None else np.zeros(self.m, dtype=np.uint8)
+        )
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add an array of uint64 hashes (e.g. DuckDB ``hash()`` output)"""
+        if len(hashes) == 0:
+            return
+
+        hashes = hashes.astype(np.uint64, copy=False)
+        p = np.uint64(self.precision)
+
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # Remaining bits moved to the top, with a guard bit so the word is never zero
+        remainder = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rank = (64 - _bit_length64(remainder) + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HLL sketches with precision {self.precision} and {other.precision}"
+            )
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self) -> float:
+        """Estimated number of distinct values"""
+        m = float(self.m)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+
+        return estimate
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int) -> "HyperLogLog":
+        return cls(precision, np.frombuffer(data, dtype=np.uint8).copy())
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles
+
+    Centroids are clustered with the k1 (arcsine) scale function, which keeps
+    the tails accurate. Digests merge by concatenating and re-compressing centroids.
+    """
+
+    def __init__(
+        self,
+        compression: float = 100.0,
+        means: np.ndarray | None = None,
+        weights: np.ndarray | None = None,
+    ):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, compression: float = 100.0) -> "TDigest":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        digest = cls(compression)
+        digest.means, digest.weights = _compress(values, np.ones(len(values)), compression)
+        return digest
+
+    @property
+    def total_weight(self) -> float:
+        return float(np.sum(self.weights))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        merged = TDigest(self.compression)
+        merged.means, merged.weights = _compress(means, weights, self.compression)
+        return merged
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.means) == 0:
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.total_weight, centers, self.means))
+
+    def cdf(self, x: float) -> float | None:
+        if len(self.means) == 0:
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(x, self.means, centers) / self.total_weight)
+
+
+def _bit_length64(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of uint64 values (frexp is exact on the 32-bit halves)"""
+    hi = (values >> np.uint64(32)).astype(np.float64)
+    lo = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    _, hi_bits = np.frexp(hi)
+    _, lo_bits = np.frexp(lo)
+    return np.where(hi > 0, 32 + hi_bits, lo_bits).astype(np.int64)
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float):
+    """Cluster weighted points into t-digest centroids (vectorized k1 scale)"""
+    if len(means) == 0:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.float64)
+
+    order = np.argsort(means, kind="mergesort")
+    means = means[order]
+    weights = weights[order]
+
+    total = np.sum(weights)
+    q = (np.cumsum(weights) - weights / 2) / total
+    k = compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)) + compression / 4
+    cluster = np.floor(k).astype(np.int64)
+
+    boundaries = np.flatnonzero(np.diff(cluster)) + 1
+    starts = np.concatenate([[0], boundaries])
+    cluster_weights = np.add.reduceat(weights, starts)
+    cluster_means = np.add.reduceat(means * weights, starts) / cluster_weights
+
+    return cluster_means, cluster_weights
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _is_numeric(column_type: str) -> bool:
+    return column_type.upper().startswith(NUMERIC_TYPE_PREFIXES)
+
+
+def _is_string(column_type: str) -> bool:
+    return column_type.upper().startswith(STRING_TYPE_PREFIXES)
+
+
+def compute_partition_sketches(
+    conn: duckdb.DuckDBPyConnection,
+    source_sql: str,
+    partition: str,
+    columns: Sequence[str] | None = None,
+    hll_precision: int = 14,
+    compression: float = 100.0,
+    batch_size: int = 1_000_000,
+) -> pa.Table:
+    """
+    Compute sketches for every column of one partition
+
+    Args:
+        conn: DuckDB connection
+        source_sql: FROM-clause source, e.g. ``read_parquet('s3://.../day=15/*.parquet')``
+        partition: Partition label stored with the sketch (e.g. ``year=2024/month=01/day=15``)
+        columns: Columns to sketch (default: all)
+        hll_precision: HyperLogLog precision (registers = 2 ** precision)
+        compression: t-digest compression
+        batch_size: Rows fetched per Arrow batch while building sketches
+
+    Returns:
+        Arrow table with one row per column, matching ``SIDECAR_SCHEMA``
+    """
+    schema = conn.execute(f"DESCRIBE SELECT * FROM {source_sql}").fetchall()
+    column_types = {row[0]: row[1] for row in schema}
+    if columns is not None:
+        column_types = {name: column_types[name] for name in columns}
+
+    digest_inputs = {}
+    for name, column_type in column_types.items():
+        ident = _quote_identifier(name)
+        if _is_numeric(column_type):
+            digest_inputs[name] = ("value", f"CAST({ident} AS DOUBLE)")
+        elif _is_string(column_type):
+            digest_inputs[name] = ("length", f"CAST(LENGTH({ident}) AS DOUBLE)")
+        else:
+            digest_inputs[name] = (None, "CAST(NULL AS DOUBLE)")
+
+    # Pass 1: exact counts and min/max in a single aggregate
+    aggregates = ["COUNT(*)"]
+    for name in column_types:
+        ident = _quote_identifier(name)
+        digest_input = digest_inputs[name][1]
+        aggregates.append(f"COUNT(*) - COUNT({ident})")
+        aggregates.append(f"COUNT(DISTINCT {ident})")
+        aggregates.append(f"CAST(MIN({ident}) AS VARCHAR)")
+        aggregates.append(f"CAST(MAX({ident}) AS VARCHAR)")
+        aggregates.append(f"MIN({digest_input})")
+        aggregates.append(f"MAX({digest_input})")
+    stats = conn.execute(f"SELECT {', '.join(aggregates)} FROM {source_sql}").fetchone()
+    row_count = stats[0]
+
+    # Pass 2: stream hashes and digest inputs through the sketches in bounded batches
+    projections = []
+    for name in column_types:
+        ident = _quote_identifier(name)
+        projections.append(f"CASE WHEN {ident} IS NULL THEN NULL ELSE hash({ident}) END")
+        projections.append(digest_inputs[name][1])
+
+    hlls = {name: HyperLogLog(hll_precision) for name in column_types}
+    digests = {name: TDigest(compression) for name in column_types}
+
+    reader = conn.execute(
+        f"SELECT {', '.join(projections)} FROM {source_sql}"
+    ).fetch_record_batch(batch_size)
+    for batch in reader:
+        for position, name in enumerate(column_types):
+            hashes = batch.column(2 * position).drop_null()
+            hlls[name].add_hashes(hashes.to_numpy(zero_copy_only=False))
+
+            values = batch.column(2 * position + 1).drop_null()
+            if len(values) > 0:
+                digests[name] = digests[name].merge(
+                    TDigest.from_values(values.to_numpy(zero_copy_only=False), compression)
+                )
+
+    computed_at = datetime.now(UTC)
+    rows: dict[str, list[Any]] = {field.name: [] for field in SIDECAR_SCHEMA}
+    for position, (name, column_type) in enumerate(column_types.items()):
+        digest = digests[name]
+        offset = 1 + 6 * position
+
+        rows["partition"].append(partition)
+        rows["column_name"].append(name)
+        rows["column_type"].append(column_type)
+        rows["row_count"].append(row_count)
+        rows["null_count"].append(stats[offset])
+        rows["distinct_count"].append(stats[offset + 1])
+        rows["min_value"].append(stats[offset + 2])
+        rows["max_value"].append(stats[offset + 3])
+        rows["digest_of"].append(digest_inputs[name][0])
+        rows["min_numeric"].append(stats[offset + 4])
+        rows["max_numeric"].append(stats[offset + 5])
+        rows["hll_precision"].append(hll_precision)
+        rows["hll_registers"].append(hlls[name].to_bytes())
+        rows["tdigest_means"].append(digest.means.tolist())
+        rows["tdigest_weights"].append(digest.weights.tolist())
+        rows["computed_at"].append(computed_at)
+
+    return pa.Table.from_pydict(rows, schema=SIDECAR_SCHEMA)
+
+
+class SketchStore:
+    """
+    Parquet sidecar store for partition sketches
+
+    Layout: ``{root}/{dataset}/{partition}/sketch.parquet``. ``root`` may be a
+    local directory or an ``s3://`` URI (written through DuckDB httpfs).
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, root: str):
+        self.conn = conn
+        self.root = root.rstrip("/")
+
+    def sidecar_path(self, dataset: str, partition: str) -> str:
+        return f"{self.root}/{dataset}/{partition}/sketch.parquet"
+
+    def list_partitions(self, dataset: str) -> list[str]:
+        """Partitions that already have a sidecar"""
+        prefix = f"{self.root}/{dataset}/"
+        files = self.conn.execute(
+            "SELECT file FROM glob(?)", [f"{prefix}**/sketch.parquet"]
+        ).fetchall()
+        return sorted(
+            file[len(prefix):-len("/sketch.parquet")] for (file,) in files if file.startswith(prefix)
+        )
+
+    def sketch_partition(
+        self,
+        dataset: str,
+        partition: str,
+        source_sql: str,
+        columns: Sequence[str] | None = None,
+        **kwargs: Any,
+    ) -> pa.Table:
+        """Compute and persist the sketch sidecar for one partition"""
+        sketches = compute_partition_sketches(self.conn, source_sql, partition, columns, **kwargs)
+        self.write(dataset, partition, sketches)
+        return sketches
+
+    def write(self, dataset: str, partition: str, sketches: pa.Table) -> str:
+        path = self.sidecar_path(dataset, partition)
+        if "://" not in path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.conn.register("_partition_sketch", sketches)
+        try:
+            self.conn.execute(
+                f"COPY _partition_sketch TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+        finally:
+            self.conn.unregister("_partition_sketch")
+
+        return path
+
+    def read(self, dataset: str, partitions: Iterable[str] | None = None) -> pa.Table:
+        """Read raw sidecar rows (optionally restricted to some partitions)"""
+        if partitions is not None:
+            paths = [self.sidecar_path(dataset, partition) for partition in partitions]
+            if not paths:
+                return SIDECAR_SCHEMA.empty_table()
+        else:
+            paths = [f"{self.root}/{dataset}/**/sketch.parquet"]
+
+        # union_by_name: sidecars written before a column was added read it as NULL
+        return self.conn.execute(
+            "SELECT * FROM read_parquet(?, union_by_name = true)", [paths]
+        ).fetch_arrow_table()
+
+    def summary(
+        self,
+        dataset: str,
+        partitions: Iterable[str] | None = None,
+        quantiles: Sequence[float] = (0.01, 0.25, 0.5, 0.75, 0.99),
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Merge partition sketches into per-column summaries
+
+        Returns:
+            Mapping of column name to merged statistics (row/null counts,
+            distinct estimate, min/max, digest quantiles, partition count)
+        """
+        merged = merge_sketches(self.read(dataset, partitions))
+        summary = {}
+
+        for column, state in merged.items():
+            non_null = state["row_count"] - state["null_count"]
+            summary[column] = {
+                "column_type": state["column_type"],
+                "partitions": state["partitions"],
+                "row_count": state["row_count"],
+                "null_count": state["null_count"],
+                "null_fraction": state["null_count"] / state["row_count"] if state["row_count"] else 0.0,
+                "non_null_count": non_null,
+                "distinct_estimate": state["hll"].count(),
+                "distinct_relative_error": state["hll"].relative_error,
+                "min_value": state["min_value"],
+                "max_value": state["max_value"],
+                "digest_of": state["digest_of"],
+                "min_numeric": state["min_numeric"],
+                "max_numeric": state["max_numeric"],
+                "quantiles": {q: state["digest"].quantile(q) for q in quantiles},
+            }
+
+        return summary
+
+    def check_unique(
+        self,
+        dataset: str,
+        column: str,
+        source_sql: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Uniqueness check across all partitions
+
+        The sketches prove uniqueness when every partition has as many exact
+        distinct values as non-null values and the partitions' min/max ranges
+        are disjoint; a partition with fewer distinct than non-null values
+        proves duplicates. Anything else is ``inconclusive``: with
+        ``source_sql`` (the whole dataset) it falls back to an exact scan,
+        otherwise ``success`` is None.
+
+        Returns:
+            ``success``, ``verdict`` (``pass`` / ``fail`` / ``inconclusive``),
+            ``method`` (``sketch`` / ``exact``), ``non_null_count``,
+            ``duplicates`` (exact count when known, else None) and the HLL
+            ``distinct_estimate`` for information
+        """
+        rows = self.read(dataset)
+        rows = rows.filter(pc.equal(rows.column("column_name"), column))
+        merged = merge_sketches(rows).get(column)
+        if merged is None:
+            raise KeyError(f"No sketches of column {column!r} in dataset {dataset!r}")
+
+        non_null = merged["row_count"] - merged["null_count"]
+        result = {
+            "non_null_count": non_null,
+            "distinct_estimate": merged["hll"].count(),
+            "method": "sketch",
+        }
+
+        verdict, duplicates = _prove_unique(rows.to_pylist())
+        if verdict == "inconclusive" and source_sql is not None:
+            ident = _quote_identifier(column)
+            non_null, distinct = self.conn.execute(
+                f"SELECT COUNT({ident}), COUNT(DISTINCT {ident}) FROM {source_sql}"
+            ).fetchone()
+            duplicates = non_null - distinct
+            verdict = "pass" if duplicates == 0 else "fail"
+            result.update({"method": "exact", "non_null_count": non_null})
+
+        result.update({
+            "success": None if verdict == "inconclusive" else verdict == "pass",
+            "verdict": verdict,
+            "duplicates": duplicates,
+        })
+        return result
+
+    def drift(self, dataset: str, column: str, partition: str) -> dict[str, Any]:
+        """
+        Distribution drift of one partition against all other partitions
+
+        Returns the Kolmogorov-Smirnov distance between the two t-digest CDFs.
+        ``ks_distance`` is None when there is no baseline yet (only the current
+        partition has a sketch of ``column``) or the partition has no sketch.
+        """
+        rows = self.read(dataset)
+        current = merge_sketches(rows.filter(pc.equal(rows.column("partition"), partition)))
+        baseline = merge_sketches(rows.filter(pc.not_equal(rows.column("partition"), partition)))
+
+        if column not in current or column not in baseline:
+            return {
+                "partition": partition,
+                "ks_distance": None,
+                "current_weight": current[column]["digest"].total_weight if column in current else 0.0,
+                "baseline_weight": baseline[column]["digest"].total_weight if column in baseline else 0.0,
+                "has_baseline": column in baseline,
+            }
+
+        current_digest = current[column]["digest"]
+        baseline_digest = baseline[column]["digest"]
+
+        grid = np.unique(np.concatenate([current_digest.means, baseline_digest.means]))
+        distance = max(
+            (abs(current_digest.cdf(x) - baseline_digest.cdf(x)) for x in grid),
+            default=0.0,
+        )
+
+        return {
+            "partition": partition,
+            "ks_distance": distance,
+            "current_weight": current_digest.total_weight,
+            "baseline_weight": baseline_digest.total_weight,
+            "has_baseline": True,
+        }
+
+
+def merge_sketches(rows: pa.Table) -> dict[str, dict[str, Any]]:
+    """Merge sidecar rows into one sketch state per column"""
+    merged: dict[str, dict[str, Any]] = {}
+
+    for row in rows.to_pylist():
+        column = row["column_name"]
+        hll = HyperLogLog.from_bytes(row["hll_registers"], row["hll_precision"])
+        digest = TDigest(means=np.array(row["tdigest_means"]), weights=np.array(row["tdigest_weights"]))
+
+        if column not in merged:
+            merged[column] = {
+                "column_type": row["column_type"],
+                "partitions": 1,
+                "row_count": row["row_count"],
+                "null_count": row["null_count"],
+                "min_value": row["min_value"],
+                "max_value": row["max_value"],
+                "digest_of": row["digest_of"],
+                "min_numeric": row["min_numeric"],
+                "max_numeric": row["max_numeric"],
+                "hll": hll,
+                "digest": digest,
+            }
+            continue
+
+        state = merged[column]
+        state["partitions"] += 1
+        state["row_count"] += row["row_count"]
+        state["null_count"] += row["null_count"]
+        if state["digest_of"] == "value":
+            # Numeric min/max strings must follow the numeric order, not the lexical one
+            if _min_none(state["min_numeric"], row["min_numeric"]) != state["min_numeric"]:
+                state["min_value"] = row["min_value"]
+            if _max_none(state["max_numeric"], row["max_numeric"]) != state["max_numeric"]:
+                state["max_value"] = row["max_value"]
+        else:
+            state["min_value"] = _min_none(state["min_value"], row["min_value"])
+            state["max_value"] = _max_none(state["max_value"], row["max_value"])
+        state["min_numeric"] = _min_none(state["min_numeric"], row["min_numeric"])
+        state["max_numeric"] = _max_none(state["max_numeric"], row["max_numeric"])
+        state["hll"] = state["hll"].merge(hll)
+        state["digest"] = state["digest"].merge(digest)
+
+    return merged
+
+
+def _prove_unique(rows: list[dict[str, Any]]) -> tuple[str, int | None]:
+    """
+    Uniqueness verdict of one column from its per-partition sidecar rows
+
+    Returns:
+        ``(verdict, duplicates)``; ``duplicates`` is 0 for ``pass`` and None
+        otherwise (a partition with duplicates proves a failure, not the total)
+    """
+    ranges = []
+    duplicates = 0
+    provable = True
+    for row in rows:
+        non_null = row["row_count"] - row["null_count"]
+        if non_null == 0:
+            continue
+        if row.get("distinct_count") is None:
+            provable = False
+            continue
+        duplicates += non_null - row["distinct_count"]
+
+        # Numeric bounds follow the numeric order; string bounds the lexical one
+        if row["digest_of"] == "value":
+            bounds = (row["min_numeric"], row["max_numeric"])
+        elif row["digest_of"] == "length":
+            bounds = (row["min_value"], row["max_value"])
+        else:
+            bounds = (None, None)
+        if None in bounds:
+            provable = False
+        else:
+            ranges.append(bounds)
+
+    if duplicates > 0:
+        # Duplicates inside a partition are exact; other partitions may add more
+        return "fail", None
+    if not provable:
+        return "inconclusive", None
+
+    ranges.sort()
+    for (_, previous_max), (current_min, _) in zip(ranges, ranges[1:], strict=False):
+        if current_min <= previous_max:
+            return "inconclusive", None
+    return "pass", 0
+
+
+def _min_none(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def _max_none(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
@@ -0,0 +1,573 @@
+"""
+Daily Quality Rollups for the Data Quality Dashboard
+
+Maintains small pre-aggregated tables in a local DuckDB file so the
+dashboard never scans raw validation results or Bronze files:
+
+- ``daily_expectation_rollup``: per day, dataset and expectation (suite,
+  type, column): evaluations, passed/failed, unexpected/element/missing
+  counts, last run and last failure, from the columnar validation result
+  store (``validation_result_store.py``)
+- ``daily_ingestion_rollup``: per day and dataset: files, rows, bytes and
+  loads, from the Bronze manifests (``r2_manifest.py``)
+- ``daily_schema``: per day and dataset: column names and types, from the
+  Parquet footers of that day's files
+
+``refresh()`` is incremental: only days from the last rolled-up day (minus a
+lookback for late results) onwards are recomputed, and the result store is
+read with ``run_date`` partition pruning. The dashboard queries are
+O(days x datasets x expectations), independent of the number of raw results.
+
+The rollup file is attached only for the duration of one refresh (read-write)
+or one dashboard query (read-only) and detached afterwards, so an open
+dashboard never keeps the file locked against the CLI refresh.
+
+Usage:
+    python great_expectations/plugins/quality_rollups.py            # incremental refresh
+    python great_expectations/plugins/quality_rollups.py --full     # rebuild from scratch
+"""
+
+import argparse
+import functools
+import os
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any
+
+import duckdb
+import pandas as pd
+
+from r2_connection import get_pool
+from r2_manifest import MANIFEST_COLUMNS, manifest_uri
+from validation_result_store import ValidationResultStore, default_result_store_root
+
+GX_ROOT = os.path.join(os.path.dirname(__file__), "..")
+DEFAULT_ROLLUP_DB = os.path.join(GX_ROOT, "uncommitted", "quality_rollups.duckdb")
+DEFAULT_LOOKBACK_DAYS = 2
+# Dataset (GE data asset) -> Bronze table prefix
+DEFAULT_DATASETS = {
+    "api_posts": "sources/api_jsonplaceholder/posts",
+    "api_users": "sources/api_jsonplaceholder/users",
+}
+ANOMALY_SIGMA = 3.0
+
+ROLLUP_TABLES = {
+    "daily_expectation_rollup": """
+        run_date DATE,
+        dataset VARCHAR,
+        suite VARCHAR,
+        expectation_type VARCHAR,
+        "column" VARCHAR,
+        evaluations BIGINT,
+        passed BIGINT,
+        failed BIGINT,
+        unexpected_count BIGINT,
+        element_count BIGINT,
+        missing_count BIGINT,
+        last_run_time TIMESTAMPTZ,
+        last_failure_time TIMESTAMPTZ,
+        avg_duration_seconds DOUBLE
+    """,
+    "daily_ingestion_rollup": """
+        run_date DATE,
+        dataset VARCHAR,
+        files BIGINT,
+        row_count BIGINT,
+        bytes BIGINT,
+        loads BIGINT,
+        last_written_at TIMESTAMPTZ
+    """,
+    "daily_schema": """
+        run_date DATE,
+        dataset VARCHAR,
+        column_name VARCHAR,
+        column_type VARCHAR
+    """,
+}
+
+
+# Attachments are per database and pooled connections share one; one rollup operation at a time
+_attach_lock = threading.RLock()
+
+
+def _with_rollups(read_only: bool = True):
+    """Run the decorated method with the rollup file attached (read-only by default)"""
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.attached(read_only=read_only):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _in_list(values: Sequence[str]) -> str:
+    return ", ".join("'" + value.replace("'", "''") + "'" for value in values)
+
+
+def _start_literal(start: date | None) -> str:
+    """Lower run date bound (the epoch for a full refresh)"""
+    return f"DATE '{(start or date(1970, 1, 1)).isoformat()}'"
+
+
+class QualityRollups:
+    """
+    Daily rollups of validation results and ingestion metrics
+
+    Args:
+        conn: DuckDB connection configured for R2
+        rollup_db: Local DuckDB file holding the rollups (env ``QUALITY_ROLLUP_DB``)
+        result_store_root: Validation result store root (default: ``VALIDATION_RESULT_STORE_ROOT``
+            or ``uncommitted/validation_results``)
+        bucket: Bronze bucket (env ``R2_BUCKET_NAME``)
+        datasets: ``{dataset: Bronze table prefix}``
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        rollup_db: str | None = None,
+        result_store_root: str | None = None,
+        bucket: str | None = None,
+        datasets: dict[str, str] | None = None,
+    ):
+        self.conn = conn
+        self.rollup_db = rollup_db or os.getenv("QUALITY_ROLLUP_DB", DEFAULT_ROLLUP_DB)
+        self.store = ValidationResultStore(conn, result_store_root or default_result_store_root(GX_ROOT))
+        self.bucket = bucket or os.getenv("R2_BUCKET_NAME", "data-lake-raw")
+        self.datasets = DEFAULT_DATASETS if datasets is None else datasets
+
+        self._attach_depth = 0
+
+        if "://" not in self.rollup_db:
+            os.makedirs(os.path.dirname(os.path.abspath(self.rollup_db)), exist_ok=True)
+
+    @contextmanager
+    def attached(self, read_only: bool = True):
+        """
+        Attach the rollup file as ``quality_rollups`` and detach it on exit
+
+        Nested calls reuse the outer attachment. A missing local file is
+        created (with empty rollup tables) by the first attachment.
+        """
+        with _attach_lock:
+            if self._attach_depth:
+                self._attach_depth += 1
+                try:
+                    yield
+                finally:
+                    self._attach_depth -= 1
+                return
+
+            if read_only and "://" not in self.rollup_db and not os.path.exists(self.rollup_db):
+                read_only = False
+            path = self.rollup_db.replace("'", "''")
+            self.conn.execute(f"ATTACH '{path}' AS quality_rollups{' (READ_ONLY)' if read_only else ''}")
+            self._attach_depth = 1
+            try:
+                if not read_only:
+                    for table, columns in ROLLUP_TABLES.items():
+                        self.conn.execute(f"CREATE TABLE IF NOT EXISTS quality_rollups.{table} ({columns})")
+                yield
+            finally:
+                self._attach_depth = 0
+                self.conn.execute("DETACH quality_rollups")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _refresh_start(self, table: str, lookback_days: int) -> date | None:
+        latest = self.conn.execute(f"SELECT MAX(run_date) FROM quality_rollups.{table}").fetchone()[0]
+        return latest - timedelta(days=lookback_days) if latest is not None else None
+
+    def _replace_days(self, table: str, start: date | None, select_sql: str) -> int:
+        """Replace the rows of ``table`` from ``start`` on with ``select_sql`` (one transaction)"""
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            if start is None:
+                self.conn.execute(f"DELETE FROM quality_rollups.{table}")
+            else:
+                self.conn.execute(f"DELETE FROM quality_rollups.{table} WHERE run_date >= ?", [start])
+            self.conn.execute(f"INSERT INTO quality_rollups.{table} {select_sql}")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM quality_rollups.{table} WHERE run_date >= {_start_literal(start)}"
+        ).fetchone()[0]
+
+    @_with_rollups(read_only=False)
+    def refresh_expectations(self, lookback_days: int = DEFAULT_LOOKBACK_DAYS, full: bool = False) -> int:
+        """Re-aggregate validation results from the refresh start day on"""
+        start = None if full else self._refresh_start("daily_expectation_rollup", lookback_days)
+        date_column = self.store.date_column
+        try:
+            return self._replace_days(
+                "daily_expectation_rollup",
+                start,
+                f"""
+                SELECT
+                    {date_column} AS run_date,
+                    COALESCE(data_asset, suite) AS dataset,
+                    suite,
+                    expectation_type,
+                    "column",
+                    COUNT(*) AS evaluations,
+                    COUNT(*) FILTER (WHERE success) AS passed,
+                    COUNT(*) FILTER (WHERE NOT success) AS failed,
+                    SUM(unexpected_count) AS unexpected_count,
+                    SUM(element_count) AS element_count,
+                    SUM(missing_count) AS missing_count,
+                    MAX(run_time) AS last_run_time,
+                    MAX(run_time) FILTER (WHERE NOT success) AS last_failure_time,
+                    AVG(duration_seconds) AS avg_duration_seconds
+                FROM {self.store.source_sql()}
+                WHERE {date_column} >= {_start_literal(start)}
+                GROUP BY ALL
+                """,
+            )
+        except (duckdb.IOException, duckdb.CatalogException):
+            # No results stored yet
+            return 0
+
+    def _day_files(self, prefix: str, start: date | None) -> list[tuple[date, list[str]]]:
+        uri = manifest_uri(self.bucket, prefix).replace("'", "''")
+        return self.conn.execute(
+            f"""
+            SELECT make_date(year, month, day) AS run_date, list('s3://{self.bucket}/' || key ORDER BY key)
+            FROM read_json('{uri}', format = 'newline_delimited', columns = {MANIFEST_COLUMNS})
+            WHERE key LIKE '%.parquet' AND make_date(year, month, day) >= {_start_literal(start)}
+            GROUP BY 1
+            ORDER BY 1
+            """
+        ).fetchall()
+
+    @_with_rollups(read_only=False)
+    def refresh_ingestion(self, lookback_days: int = DEFAULT_LOOKBACK_DAYS, full: bool = False) -> int:
+        """Re-aggregate the Bronze manifests (and day schemas) from the refresh start day on"""
+        start = None if full else self._refresh_start("daily_ingestion_rollup", lookback_days)
+        selects = []
+        schema_rows: list[tuple[date, str, str, str]] = []
+        for dataset, prefix in self.datasets.items():
+            uri = manifest_uri(self.bucket, prefix).replace("'", "''")
+            try:
+                day_files = self._day_files(prefix, start)
+            except duckdb.IOException:
+                # Table without a manifest yet
+                continue
+
+            selects.append(
+                f"""
+                SELECT
+                    make_date(year, month, day) AS run_date,
+                    '{dataset.replace("'", "''")}' AS dataset,
+                    COUNT(DISTINCT key) AS files,
+                    SUM("rows") AS row_count,
+                    SUM(size) AS bytes,
+                    COUNT(DISTINCT load_id) AS loads,
+                    MAX(written_at) AS last_written_at
+                FROM read_json('{uri}', format = 'newline_delimited', columns = {MANIFEST_COLUMNS})
+                WHERE key LIKE '%.parquet' AND make_date(year, month, day) >= {_start_literal(start)}
+                GROUP BY 1
+                """
+            )
+            # Parquet footers only, one DESCRIBE per day
+            for run_date, files in day_files:
+                described = self.conn.execute(
+                    f"DESCRIBE SELECT * FROM read_parquet([{_in_list(files)}], union_by_name = true)"
+                ).fetchall()
+                schema_rows.extend((run_date, dataset, row[0], row[1]) for row in described)
+
+        if not selects:
+            return 0
+
+        count = self._replace_days("daily_ingestion_rollup", start, " UNION ALL ".join(selects))
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            if start is None:
+                self.conn.execute("DELETE FROM quality_rollups.daily_schema")
+            else:
+                self.conn.execute("DELETE FROM quality_rollups.daily_schema WHERE run_date >= ?", [start])
+            if schema_rows:
+                self.conn.executemany("INSERT INTO quality_rollups.daily_schema VALUES (?, ?, ?, ?)", schema_rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return count
+
+    @_with_rollups(read_only=False)
+    def refresh(self, lookback_days: int = DEFAULT_LOOKBACK_DAYS, full: bool = False) -> dict[str, int]:
+        """Incrementally refresh all rollups; returns the refreshed row counts"""
+        return {
+            "expectations": self.refresh_expectations(lookback_days, full),
+            "ingestion": self.refresh_ingestion(lookback_days, full),
+        }
+
+    # ------------------------------------------------------------------
+    # Dashboard queries (rollups only)
+    # ------------------------------------------------------------------
+
+    def _filters(self, since: date, datasets: Sequence[str] | None) -> str:
+        filters = [f"run_date >= DATE '{since.isoformat()}'"]
+        if datasets:
+            filters.append(f"dataset IN ({_in_list(datasets)})")
+        return " AND ".join(filters)
+
+    @_with_rollups()
+    def dataset_names(self) -> list[str]:
+        rows = self.conn.execute(
+            """
+            SELECT dataset FROM quality_rollups.daily_expectation_rollup
+            UNION SELECT dataset FROM quality_rollups.daily_ingestion_rollup
+            ORDER BY 1
+            """
+        ).fetchall()
+        return [row[0] for row in rows if row[0] is not None]
+
+    @_with_rollups()
+    def summary(self, since: date, datasets: Sequence[str] | None = None) -> dict[str, Any]:
+        evaluations, passed, failed, monitored, last_run = self.conn.execute(
+            f"""
+            SELECT
+                COALESCE(SUM(evaluations), 0),
+                COALESCE(SUM(passed), 0),
+                COALESCE(SUM(failed), 0),
+                COUNT(DISTINCT dataset),
+                MAX(last_run_time)
+            FROM quality_rollups.daily_expectation_rollup
+            WHERE {self._filters(since, datasets)}
+            """
+        ).fetchone()
+        return {
+            "evaluations": evaluations,
+            "passed": passed,
+            "failed": failed,
+            "success_rate": passed / evaluations if evaluations else None,
+            "datasets": monitored,
+            "last_run_time": last_run,
+        }
+
+    @_with_rollups()
+    def trend(self, since: date, datasets: Sequence[str] | None = None) -> pd.DataFrame:
+        return self.conn.execute(
+            f"""
+            SELECT run_date AS date, SUM(passed) AS passed, SUM(failed) AS failed
+            FROM quality_rollups.daily_expectation_rollup
+            WHERE {self._filters(since, datasets)}
+            GROUP BY run_date
+            ORDER BY run_date
+            """
+        ).df()
+
+    @_with_rollups()
+    def failures(self, since: date, datasets: Sequence[str] | None = None, limit: int = 100) -> pd.DataFrame:
+        return self.conn.execute(
+            f"""
+            SELECT
+                last_failure_time AS "Last Failure",
+                dataset AS "Dataset",
+                expectation_type AS "Expectation",
+                "column" AS "Column",
+                failed AS "Failed Runs",
+                unexpected_count AS "Unexpected Values"
+            FROM quality_rollups.daily_expectation_rollup
+            WHERE {self._filters(since, datasets)} AND failed > 0
+            ORDER BY last_failure_time DESC
+            LIMIT {int(limit)}
+            """
+        ).df()
+
+    @_with_rollups()
+    def schema_changes(self, since: date, datasets: Sequence[str] | None = None) -> pd.DataFrame:
+        """Columns added, removed or retyped between consecutive observed days"""
+        # One day before the window so a change on its first day is detected
+        lookback = since - timedelta(days=1)
+        return self.conn.execute(
+            f"""
+            WITH days AS (
+                SELECT DISTINCT dataset, run_date FROM quality_rollups.daily_schema
+                WHERE {self._filters(lookback, datasets)}
+            ),
+            pairs AS (
+                SELECT dataset, run_date,
+                       LAG(run_date) OVER (PARTITION BY dataset ORDER BY run_date) AS previous_date
+                FROM days
+            ),
+            latest_schema AS (
+                SELECT p.dataset, p.run_date, p.previous_date, s.column_name, s.column_type
+                FROM pairs p JOIN quality_rollups.daily_schema s USING (dataset, run_date)
+                WHERE p.previous_date IS NOT NULL
+            ),
+            previous_schema AS (
+                SELECT p.dataset, p.run_date, s.column_name, s.column_type
+                FROM pairs p JOIN quality_rollups.daily_schema s
+                  ON s.dataset = p.dataset AND s.run_date = p.previous_date
+            )
+            SELECT
+                COALESCE(c.run_date, v.run_date) AS "Date",
+                COALESCE(c.dataset, v.dataset) AS "Dataset",
+                CASE
+                    WHEN v.column_name IS NULL THEN 'Column Added'
+                    WHEN c.column_name IS NULL THEN 'Column Removed'
+                    ELSE 'Type Changed'
+                END AS "Change Type",
+                COALESCE(c.column_name, v.column_name) AS "Column",
+                CASE
+                    WHEN v.column_name IS NULL THEN 'Added ' || c.column_type || ' column'
+                    WHEN c.column_name IS NULL THEN 'Removed ' || v.column_type || ' column'
+                    ELSE 'Changed from ' || v.column_type || ' to ' || c.column_type
+                END AS "Details"
+            FROM latest_schema c
+            FULL OUTER JOIN previous_schema v
+              ON c.dataset = v.dataset AND c.run_date = v.run_date AND c.column_name = v.column_name
+            WHERE (v.column_name IS NULL OR c.column_name IS NULL OR c.column_type <> v.column_type)
+              AND COALESCE(c.run_date, v.run_date) >= DATE '{since.isoformat()}'
+            ORDER BY 1 DESC, 2, 4
+            """
+        ).df()
+
+    @_with_rollups()
+    def daily_rows(self, since: date, datasets: Sequence[str] | None = None) -> pd.DataFrame:
+        """Ingested rows per day and dataset with mean +/- ``ANOMALY_SIGMA`` std bounds"""
+        return self.conn.execute(
+            f"""
+            WITH daily AS (
+                SELECT run_date AS date, dataset, SUM(row_count) AS row_count
+                FROM quality_rollups.daily_ingestion_rollup
+                WHERE {self._filters(since, datasets)}
+                GROUP BY ALL
+            ),
+            bounds AS (
+                SELECT dataset, AVG(row_count) AS mean, STDDEV_SAMP(row_count) AS std
+                FROM daily GROUP BY dataset
+            )
+            SELECT
+                daily.*,
+                mean - {ANOMALY_SIGMA} * std AS lower_bound,
+                mean + {ANOMALY_SIGMA} * std AS upper_bound,
+                COALESCE(row_count NOT BETWEEN mean - {ANOMALY_SIGMA} * std AND mean + {ANOMALY_SIGMA} * std, false)
+                    AS is_anomaly
+            FROM daily JOIN bounds USING (dataset)
+            ORDER BY dataset, date
+            """
+        ).df()
+
+    @_with_rollups()
+    def scores(self, since: date, datasets: Sequence[str] | None = None) -> pd.DataFrame:
+        """
+        Quality dimensions per dataset (0-100)
+
+        - Completeness: 1 - missing / element counts of the expectations
+        - Validity: expectation pass rate
+        - Consistency: share of observed days without a schema change
+        - Timeliness: share of days in the window with at least one load
+        """
+        window_days = max(1, (date.today() - since).days + 1)
+        filters = self._filters(since, datasets)
+        frame = self.conn.execute(
+            f"""
+            WITH expectations AS (
+                SELECT
+                    dataset,
+                    SUM(passed) / NULLIF(SUM(evaluations), 0) AS validity,
+                    1 - SUM(missing_count) / NULLIF(SUM(element_count), 0) AS completeness
+                FROM quality_rollups.daily_expectation_rollup
+                WHERE {filters}
+                GROUP BY dataset
+            ),
+            ingestion AS (
+                SELECT dataset, COUNT(DISTINCT run_date) AS load_days
+                FROM quality_rollups.daily_ingestion_rollup
+                WHERE {filters} AND loads > 0
+                GROUP BY dataset
+            ),
+            schema_days AS (
+                SELECT dataset, COUNT(DISTINCT run_date) AS observed_days
+                FROM quality_rollups.daily_schema
+                WHERE {filters}
+                GROUP BY dataset
+            )
+            SELECT
+                dataset AS "Dataset",
+                100 * completeness AS "Completeness",
+                100 * validity AS "Validity",
+                observed_days,
+                100 * LEAST(load_days / {window_days}, 1) AS "Timeliness"
+            FROM expectations
+            FULL OUTER JOIN ingestion USING (dataset)
+            FULL OUTER JOIN schema_days USING (dataset)
+            ORDER BY dataset
+            """
+        ).df()
+
+        changes = self.schema_changes(since, datasets)
+        change_days = changes.groupby("Dataset")["Date"].nunique() if not changes.empty else pd.Series(dtype=int)
+        frame["Consistency"] = [
+            100 * (1 - change_days.get(dataset, 0) / observed) if observed else None
+            for dataset, observed in zip(frame["Dataset"], frame["observed_days"], strict=True)
+        ]
+        frame = frame.drop(columns=["observed_days"])
+        dimensions = ["Completeness", "Validity", "Consistency", "Timeliness"]
+        frame["Quality Score"] = frame[dimensions].astype(float).mean(axis=1, skipna=True)
+        return frame[["Dataset", "Quality Score", *dimensions]]
+
+    @_with_rollups()
+    def recommendations(self, since: date, datasets: Sequence[str] | None = None) -> list[tuple[str, str, str, str]]:
+        """``(severity, location, issue, recommendation)`` derived from the rollups"""
+        items = []
+        for failure in self.failures(since, datasets, limit=20).to_dict("records"):
+            location = f"{failure['Dataset']}.{failure['Column']}" if failure["Column"] else failure["Dataset"]
+            unexpected = failure["Unexpected Values"]
+            items.append((
+                "🔴 Critical" if failure["Failed Runs"] > 1 else "🟡 Warning",
+                location,
+                f"{failure['Expectation']} failed {int(failure['Failed Runs'])} time(s)"
+                + (f", {int(unexpected):,} unexpected values" if pd.notna(unexpected) else ""),
+                "Investigate the source data or the ingestion pipeline",
+            ))
+
+        rows = self.daily_rows(since, datasets)
+        for anomaly in rows[rows["is_anomaly"]].to_dict("records"):
+            items.append((
+                "🟡 Warning",
+                anomaly["dataset"],
+                f"{int(anomaly['row_count']):,} rows ingested on {anomaly['date']:%Y-%m-%d} "
+                f"(outside {ANOMALY_SIGMA:g}σ bounds)",
+                "Check the data pipeline for issues",
+            ))
+
+        for change in self.schema_changes(since, datasets).to_dict("records"):
+            items.append((
+                "🟢 Info",
+                change["Dataset"],
+                f"{change['Change Type']}: {change['Column']} on {change['Date']:%Y-%m-%d}",
+                "Update documentation and downstream consumers",
+            ))
+        return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the daily quality rollups")
+    parser.add_argument("--db", default=None, help="Rollup DuckDB file (default: QUALITY_ROLLUP_DB)")
+    parser.add_argument("--result-store", default=None, help="Validation result store root")
+    parser.add_argument("--lookback-days", type=int, default=DEFAULT_LOOKBACK_DAYS,
+                        help="Days before the last rolled-up day to recompute")
+    parser.add_argument("--full", action="store_true", help="Rebuild all rollups")
+    args = parser.parse_args()
+
+    with get_pool().connection() as conn:
+        rollups = QualityRollups(conn, rollup_db=args.db, result_store_root=args.result_store)
+        counts = rollups.refresh(lookback_days=args.lookback_days, full=args.full)
+    print(f"📊 Refreshed rollups in {rollups.rollup_db}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
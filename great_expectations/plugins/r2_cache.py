@@ -0,0 +1,422 @@
+"""
+Local Read-Through Cache for R2 Objects
+
+dbt dev runs, the validation scripts and the marimo notebooks read the same
+immutable Bronze Parquet files over and over. This module keeps the byte
+ranges they read on local disk:
+
+- Objects are split into fixed-size blocks; a read fetches only the missing
+  blocks of the requested range (Parquet footers, column chunks)
+- Blocks are keyed by bucket, key and ETag, so a rewritten object is never
+  served stale
+- An SQLite index shared by all local processes tracks block sizes, last
+  access and the running byte total; the least recently used blocks are
+  evicted above the size cap
+- Hits do not write to the index: access times and hit/miss counters are
+  buffered per process and persisted in batches
+
+The cache is an fsspec filesystem registered on DuckDB connections for the
+``s3://`` protocol (registered Python filesystems take precedence over
+httpfs), so existing queries are cached without rewriting paths.
+``R2ConnectionFactory`` registers it when ``R2_CACHE_DIR`` is set; dbt uses it
+through ``dbt/plugins/r2_cache_plugin.py``.
+
+    python great_expectations/plugins/r2_cache.py --stats
+    python great_expectations/plugins/r2_cache.py --clear
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import fsspec
+from fsspec.spec import AbstractBufferedFile
+
+DEFAULT_MAX_BYTES = 10 * 1024**3
+DEFAULT_BLOCK_SIZE = 4 * 1024**2
+# Evict down to this fraction of the cap so eviction is not run on every write
+EVICTION_TARGET = 0.9
+# Buffered hits are written to the index after this many hits or seconds
+ACCESS_FLUSH_BLOCKS = 256
+ACCESS_FLUSH_SECONDS = 5.0
+
+
+class RangeCache:
+    """
+    On-disk block cache with LRU eviction under a size cap
+
+    Hits only touch the block file: access times and counters are buffered
+    in memory and written in one SQLite transaction every
+    ``ACCESS_FLUSH_BLOCKS`` hits / ``ACCESS_FLUSH_SECONDS``, before eviction
+    and at exit. The cached byte total is kept as a running value in the
+    index, so a write never sums the whole table.
+
+    Args:
+        directory: Cache directory (blocks and ``index.sqlite3``)
+        max_bytes: Size cap for cached blocks
+        block_size: Block size in bytes (fixed per directory)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "bytes_served": 0, "bytes_fetched": 0, "evictions": 0}
+        # Not yet written to the index: path -> last access, counter increments
+        self._pending_access: dict[str, float] = {}
+        self._pending_counts: dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS blocks ("
+                " path TEXT PRIMARY KEY, bucket TEXT, key TEXT, etag TEXT,"
+                " block INTEGER, size INTEGER, last_access REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS blocks_lru ON blocks (last_access)")
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER)"
+            )
+            # Seeds the running total once for indexes created before it existed
+            db.execute(
+                "INSERT OR IGNORE INTO usage SELECT 0, COALESCE(SUM(size), 0) FROM blocks"
+            )
+        atexit.register(self.flush)
+
+    def _db(self) -> sqlite3.Connection:
+        # One SQLite connection per thread; DuckDB reads from several threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+            self._local.db = db
+        return db
+
+    def block_path(self, bucket: str, key: str, etag: str, block: int) -> str:
+        digest = hashlib.sha256(f"{bucket}\0{key}\0{etag}".encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.{block}")
+
+    def get(self, bucket: str, key: str, etag: str, block: int) -> bytes | None:
+        """Cached block or None"""
+        path = self.block_path(bucket, key, etag, block)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._count(misses=1)
+            return None
+
+        self._count(hits=1, bytes_served=len(data))
+        with self._lock:
+            self._pending_access[path] = time.time()
+            due = (
+                self._pending_counts.get("hits", 0) >= ACCESS_FLUSH_BLOCKS
+                or time.monotonic() - self._flushed_at >= ACCESS_FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+        return data
+
+    def put(self, bucket: str, key: str, etag: str, block: int, data: bytes) -> None:
+        """Store a block and evict least recently used blocks above the cap"""
+        path = self.block_path(bucket, key, etag, block)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial block
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._count(bytes_fetched=len(data))
+
+        evicted: list[str] = []
+        with self._db() as db:
+            self._write_pending(db)
+            previous = db.execute("SELECT size FROM blocks WHERE path = ?", (path,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, bucket, key, etag, block, len(data), time.time()),
+            )
+            total = db.execute(
+                "UPDATE usage SET bytes = bytes + ? RETURNING bytes",
+                (len(data) - (previous[0] if previous else 0),),
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                evicted = self._evict(db, total)
+
+        for evicted_path in evicted:
+            try:
+                os.remove(evicted_path)
+            except FileNotFoundError:
+                pass
+        if evicted:
+            self._count(evictions=len(evicted))
+
+    def _evict(self, db: sqlite3.Connection, total: int) -> list[str]:
+        """Delete index rows of least recently used blocks down to the eviction target"""
+        target = int(self.max_bytes * EVICTION_TARGET)
+        evicted = []
+        freed = 0
+        for path, size in db.execute("SELECT path, size FROM blocks ORDER BY last_access"):
+            if total - freed <= target:
+                break
+            evicted.append(path)
+            freed += size
+        db.executemany("DELETE FROM blocks WHERE path = ?", [(path,) for path in evicted])
+        db.execute("UPDATE usage SET bytes = bytes - ?", (freed,))
+        return evicted
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self._counters[name] += value
+                self._pending_counts[name] = self._pending_counts.get(name, 0) + value
+
+    def _write_pending(self, db: sqlite3.Connection) -> None:
+        """Write buffered access times and counters inside the caller's transaction"""
+        with self._lock:
+            access, self._pending_access = self._pending_access, {}
+            counts, self._pending_counts = self._pending_counts, {}
+            self._flushed_at = time.monotonic()
+        db.executemany(
+            "UPDATE blocks SET last_access = MAX(last_access, ?) WHERE path = ?",
+            [(accessed, path) for path, accessed in access.items()],
+        )
+        db.executemany(
+            "INSERT INTO stats VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            list(counts.items()),
+        )
+
+    def flush(self) -> None:
+        """Write buffered access times and counters to the index"""
+        with self._lock:
+            if not (self._pending_access or self._pending_counts):
+                return
+        with self._db() as db:
+            self._write_pending(db)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters of this process, all-time totals and disk usage"""
+        self.flush()
+        with self._db() as db:
+            entries = db.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+            disk_bytes = db.execute("SELECT bytes FROM usage").fetchone()[0]
+            totals = dict(db.execute("SELECT name, value FROM stats").fetchall())
+
+        with self._lock:
+            process = dict(self._counters)
+
+        def hit_rate(counters: dict[str, int]) -> float | None:
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            return counters.get("hits", 0) / lookups if lookups else None
+
+        return {
+            "directory": self.directory,
+            "entries": entries,
+            "disk_bytes": disk_bytes,
+            "max_bytes": self.max_bytes,
+            "block_size": self.block_size,
+            "process": {**process, "hit_rate": hit_rate(process)},
+            "total": {**totals, "hit_rate": hit_rate(totals)},
+        }
+
+    def clear(self) -> None:
+        """Remove every cached block and reset the counters"""
+        with self._lock:
+            self._pending_access.clear()
+            self._pending_counts.clear()
+        with self._db() as db:
+            paths = [row[0] for row in db.execute("SELECT path FROM blocks")]
+            db.execute("DELETE FROM blocks")
+            db.execute("DELETE FROM stats")
+            db.execute("UPDATE usage SET bytes = 0")
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class CachedR2File(AbstractBufferedFile):
+    """Read-only file whose ranges are served block by block from the cache"""
+
+    def __init__(self, fs: "CachedR2FileSystem", path: str, info: dict[str, Any], **kwargs):
+        self.bucket, _, self.key = path.partition("/")
+        self.etag = (info.get("ETag") or info.get("etag") or "").strip('"')
+        # fsspec's open() passes its own block and cache settings; blocks are the cache's
+        for name in ("block_size", "cache_type", "cache_options"):
+            kwargs.pop(name, None)
+        super().__init__(
+            fs, path, mode="rb", block_size=fs.cache.block_size, cache_type="none",
+            size=info["size"], **kwargs
+        )
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        cache = self.fs.cache
+        block_size = cache.block_size
+        chunks: list[bytes] = []
+
+        for block in range(start // block_size, (end - 1) // block_size + 1):
+            block_start = block * block_size
+            data = cache.get(self.bucket, self.key, self.etag, block)
+            if data is None:
+                block_end = min(block_start + block_size, self.size)
+                data = self.fs.remote.cat_file(self.path, start=block_start, end=block_end)
+                cache.put(self.bucket, self.key, self.etag, block, data)
+            chunks.append(data[max(start - block_start, 0):end - block_start])
+
+        return b"".join(chunks)
+
+
+class CachedR2FileSystem(fsspec.AbstractFileSystem):
+    """
+    fsspec filesystem for ``s3://`` that reads through a ``RangeCache``
+
+    Listing, metadata and writes go straight to the wrapped s3fs filesystem;
+    only reads of objects with an ETag are cached.
+    """
+
+    protocol = ("s3", "s3a")
+    # One instance per cache/endpoint; fsspec instance caching would share them across configs
+    cachable = False
+
+    def __init__(self, cache: RangeCache, remote: "fsspec.AbstractFileSystem", **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.remote = remote
+
+    def ls(self, path, detail=True, **kwargs):
+        return self.remote.ls(path, detail=detail, **kwargs)
+
+    def info(self, path, **kwargs):
+        return self.remote.info(path, **kwargs)
+
+    def find(self, path, maxdepth=None, withdirs=False, detail=False, **kwargs):
+        return self.remote.find(path, maxdepth=maxdepth, withdirs=withdirs, detail=detail, **kwargs)
+
+    def glob(self, path, maxdepth=None, **kwargs):
+        return self.remote.glob(path, maxdepth=maxdepth, **kwargs)
+
+    def modified(self, path):
+        return self.remote.modified(path)
+
+    def mkdir(self, path, create_parents=True, **kwargs):
+        return self.remote.mkdir(path, create_parents=create_parents, **kwargs)
+
+    def makedirs(self, path, exist_ok=False):
+        return self.remote.makedirs(path, exist_ok=exist_ok)
+
+    def rm_file(self, path):
+        return self.remote.rm_file(path)
+
+    def _open(self, path, mode="rb", **kwargs):
+        path = self._strip_protocol(path)
+        if mode != "rb":
+            return self.remote.open(path, mode=mode, **kwargs)
+
+        info = self.remote.info(path)
+        if not (info.get("ETag") or info.get("etag")):
+            return self.remote.open(path, mode=mode, **kwargs)
+        return CachedR2File(self, path, info, **kwargs)
+
+
+_cache: RangeCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(directory: str | None = None) -> RangeCache | None:
+    """
+    Process-wide cache for ``directory`` (default: ``R2_CACHE_DIR``)
+
+    Returns None when no cache directory is configured.
+    ``R2_CACHE_MAX_BYTES`` and ``R2_CACHE_BLOCK_SIZE`` override the defaults.
+    """
+    global _cache
+    directory = directory or os.getenv("R2_CACHE_DIR")
+    if not directory:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.directory != directory:
+            _cache = RangeCache(
+                directory,
+                max_bytes=int(os.getenv("R2_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+                block_size=int(os.getenv("R2_CACHE_BLOCK_SIZE", str(DEFAULT_BLOCK_SIZE))),
+            )
+        return _cache
+
+
+def register_cache(
+    conn: Any,
+    endpoint: str,
+    access_key_id: str,
+    secret_access_key: str,
+    directory: str | None = None,
+) -> CachedR2FileSystem | None:
+    """
+    Route ``s3://`` reads of a DuckDB connection through the local cache
+
+    Args:
+        conn: DuckDB connection (the registration applies to its database)
+        endpoint: R2 endpoint (with or without scheme)
+        access_key_id: R2 access key ID
+        secret_access_key: R2 secret access key
+        directory: Cache directory (default: ``R2_CACHE_DIR``)
+
+    Returns:
+        The registered filesystem, or None if no cache directory is configured
+    """
+    cache = get_cache(directory)
+    if cache is None:
+        return None
+
+    import s3fs
+
+    if "://" not in endpoint:
+        endpoint = f"https://{endpoint}"
+    remote = s3fs.S3FileSystem(
+        key=access_key_id,
+        secret=secret_access_key,
+        client_kwargs={"endpoint_url": endpoint, "region_name": "auto"},
+    )
+    filesystem = CachedR2FileSystem(cache, remote)
+    conn.register_filesystem(filesystem)
+    return filesystem
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local R2 read-through cache")
+    parser.add_argument("--dir", default=None, help="Cache directory (default: R2_CACHE_DIR)")
+    parser.add_argument("--stats", action="store_true", help="Print hit/miss statistics")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached blocks")
+    args = parser.parse_args()
+
+    cache = get_cache(args.dir)
+    if cache is None:
+        parser.error("Set R2_CACHE_DIR or pass --dir")
+
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {cache.directory}")
+    if args.stats or not args.clear:
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Server-side Chart Data for Notebooks
+
+Aggregates chart inputs inside DuckDB so only a bounded number of points is
+shipped to Plotly, whatever the size of the dataset in R2:
+
+- ``histogram_bins``: equal-width bins (numeric and temporal columns)
+- ``top_values``: top-K value counts plus an "other" bucket
+- ``downsample_series``: time series reduced per time bucket with min/max
+  (2 points per bucket) or M4 pre-aggregation followed by LTTB
+  (Largest-Triangle-Three-Buckets) down to the requested point count
+
+All functions return pandas DataFrames with at most ``MAX_POINTS`` rows.
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from r2_dataset import R2Dataset, is_temporal_type, quote_identifier
+
+MAX_POINTS = 2000
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def _column_type(dataset: R2Dataset, column: str) -> str:
+    return dict(dataset.schema())[column]
+
+
+def _numeric_expression(dataset: R2Dataset, column: str) -> str:
+    """Column as DOUBLE (temporal columns as epoch seconds)"""
+    quoted = quote_identifier(column)
+    if is_temporal_type(_column_type(dataset, column)):
+        return f"epoch({quoted})::DOUBLE"
+    return f"{quoted}::DOUBLE"
+
+
+def histogram_bins(
+    dataset: R2Dataset,
+    column: str,
+    bins: int = 50,
+    bounds: tuple[float, float] | None = None,
+) -> pd.DataFrame:
+    """
+    Equal-width histogram computed in DuckDB
+
+    Args:
+        dataset: Lazy R2 dataset
+        column: Numeric or temporal column
+        bins: Number of bins (capped at ``MAX_POINTS``)
+        bounds: Known ``(min, max)`` (e.g. from the profile) to skip the bounds pass
+
+    Returns:
+        DataFrame with ``bin_start``, ``bin_end`` and ``count``
+    """
+    bins = max(1, min(int(bins), MAX_POINTS))
+    value = _numeric_expression(dataset, column)
+    source = dataset.source_sql()
+    bounds_sql = (
+        f"SELECT {float(bounds[0])!r} AS lo, {float(bounds[1])!r} AS hi"
+        if bounds is not None
+        else f"SELECT MIN({value}) AS lo, MAX({value}) AS hi FROM {source}"
+    )
+    result = dataset.conn.execute(
+        f"""
+        WITH bounds AS ({bounds_sql}),
+        binned AS (
+            SELECT
+                COALESCE(LEAST(FLOOR(({value} - lo) / NULLIF((hi - lo) / {bins}, 0)), {bins} - 1), 0)::INTEGER AS bin,
+                lo,
+                hi
+            FROM {source}, bounds
+            WHERE {value} IS NOT NULL
+        )
+        SELECT
+            lo + bin * (hi - lo) / {bins} AS bin_start,
+            lo + (bin + 1) * (hi - lo) / {bins} AS bin_end,
+            COUNT(*) AS count
+        FROM binned
+        GROUP BY bin, lo, hi
+        ORDER BY bin
+        """
+    ).df()
+
+    if is_temporal_type(_column_type(dataset, column)):
+        for edge in ("bin_start", "bin_end"):
+            result[edge] = pd.to_datetime(result[edge], unit="s", utc=True)
+    return result
+
+
+def top_values(dataset: R2Dataset, column: str, k: int = 20) -> pd.DataFrame:
+    """
+    Top-K value counts computed in DuckDB
+
+    Returns:
+        DataFrame with ``value`` and ``count``; values beyond the top K are
+        summed into a final ``(other)`` row
+    """
+    k = max(1, min(int(k), MAX_POINTS - 1))
+    quoted = quote_identifier(column)
+    result = dataset.conn.execute(
+        f"""
+        WITH counts AS (
+            SELECT {quoted}::VARCHAR AS value, COUNT(*) AS count
+            FROM {dataset.source_sql()}
+            GROUP BY ALL
+        ),
+        ranked AS (
+            SELECT *, ROW_NUMBER() OVER (ORDER BY count DESC, value) AS value_rank FROM counts
+        )
+        SELECT value, count FROM (
+            SELECT COALESCE(value, '(null)') AS value, count, value_rank FROM ranked WHERE value_rank <= {k}
+            UNION ALL
+            SELECT '(other)', SUM(count), {k} + 1 FROM ranked WHERE value_rank > {k} HAVING COUNT(*) > 0
+        )
+        ORDER BY value_rank
+        """
+    ).df()
+    return result
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep
+    the visual shape of the series (``x`` must be sorted)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    bucket_size = (n - 2) / (threshold - 2)
+    selected = [0]
+    anchor = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(areas))
+        selected.append(anchor)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def downsample_series(
+    dataset: R2Dataset,
+    time_column: str,
+    value_column: str,
+    points: int = MAX_POINTS,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """
+    Downsampled time series of ``value_column`` over ``time_column``
+
+    ``minmax`` keeps the minimum and maximum of each of ``points / 2`` time
+    buckets. ``lttb`` first reduces each of ``points`` buckets to its first,
+    last, min and max point (M4) inside DuckDB and then applies LTTB locally to
+    at most ``4 * points`` rows.
+
+    Returns:
+        DataFrame with ``time_column`` and ``value_column``, sorted by time
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method} (expected one of {DOWNSAMPLING_METHODS})")
+
+    points = max(3, min(int(points), MAX_POINTS))
+    buckets = points // 2 if method == "minmax" else points
+    x = _numeric_expression(dataset, time_column)
+    y = _numeric_expression(dataset, value_column)
+    m4_columns = (
+        ""
+        if method == "minmax"
+        else ", MIN(x) AS first_x, arg_min(y, x) AS first_y, MAX(x) AS last_x, arg_max(y, x) AS last_y"
+    )
+
+    reduced = dataset.conn.execute(
+        f"""
+        WITH series AS MATERIALIZED (
+            SELECT {x} AS x, {y} AS y
+            FROM {dataset.source_sql()}
+            WHERE {x} IS NOT NULL AND {y} IS NOT NULL
+        ),
+        bounds AS (SELECT MIN(x) AS lo, MAX(x) AS hi FROM series),
+        bucketed AS (
+            SELECT
+                COALESCE(LEAST(FLOOR((x - lo) / NULLIF((hi - lo) / {buckets}, 0)), {buckets} - 1), 0) AS bucket,
+                x,
+                y
+            FROM series, bounds
+        )
+        SELECT
+            arg_min(x, y) AS min_x, MIN(y) AS min_y,
+            arg_max(x, y) AS max_x, MAX(y) AS max_y
+            {m4_columns}
+        FROM bucketed
+        GROUP BY bucket
+        """
+    ).df()
+
+    pairs = [("min_x", "min_y"), ("max_x", "max_y")]
+    if method == "lttb":
+        pairs += [("first_x", "first_y"), ("last_x", "last_y")]
+    stacked = pd.concat(
+        [reduced[[x_column, y_column]].set_axis(["x", "y"], axis=1) for x_column, y_column in pairs],
+        ignore_index=True,
+    ).drop_duplicates().sort_values("x", kind="stable")
+
+    if method == "lttb":
+        indices = lttb(stacked["x"].to_numpy(), stacked["y"].to_numpy(), points)
+        stacked = stacked.iloc[indices]
+
+    result = stacked.rename(columns={"x": time_column, "y": value_column}).reset_index(drop=True)
+    if is_temporal_type(_column_type(dataset, time_column)):
+        result[time_column] = pd.to_datetime(result[time_column], unit="s", utc=True)
+    return result
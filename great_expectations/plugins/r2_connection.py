@@ -0,0 +1,309 @@
+"""
+Shared DuckDB Connection Factory for R2
+
+One place that knows how to open a DuckDB connection against Cloudflare R2.
+Used by the Great Expectations plugin, the validation scripts and the marimo
+notebooks.
+
+- Extensions are loaded from a pre-populated local extension directory
+  (no network INSTALL on the hot path)
+- Credentials are registered once through ``CREATE SECRET``
+- httpfs is tuned for remote Parquet (metadata/object cache, keep-alive,
+  thread count for parallel range reads)
+- The Bronze manifest macros (``bronze_manifest``, ``bronze_manifest_files``)
+  are registered, so file lists come from one manifest GET instead of a LIST
+- With ``R2_CACHE_DIR`` set, ``s3://`` reads go through the local
+  read-through block cache (``r2_cache.py``)
+- A pool hands out cursors on one pre-warmed database instance, so the
+  extension load and secret setup are paid once per process
+
+Pre-populate the extension directory once (e.g. in CI or an image build):
+
+    python great_expectations/plugins/r2_connection.py --install
+"""
+
+import argparse
+import os
+import queue
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import duckdb
+
+from r2_cache import register_cache
+from r2_manifest import create_manifest_macros
+
+EXTENSIONS = ("httpfs",)
+DEFAULT_EXTENSION_DIRECTORY = os.path.join(os.path.expanduser("~"), ".duckdb", "extensions")
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _strip_scheme(endpoint: str) -> str:
+    for scheme in ("https://", "http://"):
+        if endpoint.startswith(scheme):
+            return endpoint[len(scheme):]
+    return endpoint
+
+
+class R2ConnectionFactory:
+    """
+    Factory for DuckDB connections configured for R2
+
+    All arguments default to environment variables:
+    ``R2_ENDPOINT``, ``R2_ACCESS_KEY_ID``, ``R2_SECRET_ACCESS_KEY``,
+    ``DUCKDB_EXTENSION_DIRECTORY``, ``DUCKDB_THREADS``, ``R2_USE_SSL`` and
+    ``R2_CACHE_DIR``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        extension_directory: str | None = None,
+        threads: int | None = None,
+        use_ssl: bool | None = None,
+        allow_extension_install: bool | None = None,
+        extra_settings: dict[str, Any] | None = None,
+        cache_dir: str | None = None,
+    ):
+        self.endpoint = endpoint or os.getenv("R2_ENDPOINT")
+        self.access_key_id = access_key_id or os.getenv("R2_ACCESS_KEY_ID")
+        self.secret_access_key = secret_access_key or os.getenv("R2_SECRET_ACCESS_KEY")
+        self.extension_directory = extension_directory or os.getenv(
+            "DUCKDB_EXTENSION_DIRECTORY", DEFAULT_EXTENSION_DIRECTORY
+        )
+        self.threads = threads or int(os.getenv("DUCKDB_THREADS", str(max(4, (os.cpu_count() or 1) * 2))))
+        self.use_ssl = (
+            use_ssl if use_ssl is not None else os.getenv("R2_USE_SSL", "true").lower() != "false"
+        )
+        self.allow_extension_install = (
+            allow_extension_install
+            if allow_extension_install is not None
+            else os.getenv("DUCKDB_ALLOW_EXTENSION_INSTALL", "false").lower() == "true"
+        )
+        self.extra_settings = extra_settings or {}
+        self.cache_dir = cache_dir or os.getenv("R2_CACHE_DIR")
+
+    @property
+    def configured(self) -> bool:
+        """True if R2 credentials are available"""
+        return all([self.endpoint, self.access_key_id, self.secret_access_key])
+
+    def connect(self, database: str = ":memory:") -> duckdb.DuckDBPyConnection:
+        """
+        Open and configure a new DuckDB database connection
+
+        Args:
+            database: DuckDB database path (default: in-memory)
+
+        Returns:
+            DuckDB connection with httpfs loaded and the R2 secret registered
+        """
+        conn = duckdb.connect(
+            database=database,
+            config={
+                "extension_directory": self.extension_directory,
+                "autoinstall_known_extensions": self.allow_extension_install,
+                "threads": self.threads,
+            },
+        )
+        self.configure(conn)
+        return conn
+
+    def configure(self, conn: Any) -> None:
+        """
+        Configure an existing connection (also used for connections created by
+        other libraries, e.g. SQLAlchemy or dbt-duckdb)
+        """
+        self._load_extensions(conn)
+        create_manifest_macros(conn)
+
+        settings = {
+            # Cache HEAD/metadata responses and Parquet footers across queries
+            "enable_http_metadata_cache": True,
+            "enable_object_cache": True,
+            "http_keep_alive": True,
+            "http_retries": 5,
+            # Row groups are fetched with parallel ranged GETs, one per thread
+            "threads": self.threads,
+            "preserve_insertion_order": False,
+            **self.extra_settings,
+        }
+        for name, value in settings.items():
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            elif isinstance(value, str):
+                value = _sql_literal(value)
+            conn.execute(f"SET GLOBAL {name} = {value}")
+
+        if self.configured:
+            conn.execute(
+                "CREATE OR REPLACE SECRET r2 ("
+                " TYPE S3,"
+                f" KEY_ID {_sql_literal(self.access_key_id)},"
+                f" SECRET {_sql_literal(self.secret_access_key)},"
+                f" ENDPOINT {_sql_literal(_strip_scheme(self.endpoint))},"
+                " REGION 'auto',"
+                " URL_STYLE 'path',"
+                f" USE_SSL {'true' if self.use_ssl else 'false'}"
+                ")"
+            )
+            if self.cache_dir and hasattr(conn, "register_filesystem"):
+                register_cache(
+                    conn,
+                    f"{'https' if self.use_ssl else 'http'}://{_strip_scheme(self.endpoint)}",
+                    self.access_key_id,
+                    self.secret_access_key,
+                    directory=self.cache_dir,
+                )
+
+    def sqlalchemy_connect_args(self) -> dict[str, Any]:
+        """
+        ``connect_args`` for a ``duckdb:///`` SQLAlchemy engine (duckdb_engine)
+
+        Only database options that must be set when the database is opened.
+        Extensions, settings and the R2 secret are applied by ``configure``
+        through ``attach_to_engine``, so credentials never become plain
+        ``s3_*`` settings.
+        """
+        return {
+            "config": {
+                "extension_directory": self.extension_directory,
+                "autoinstall_known_extensions": self.allow_extension_install,
+                "threads": self.threads,
+            }
+        }
+
+    def attach_to_engine(self, engine: Any) -> None:
+        """Run ``configure`` on every new DBAPI connection of a SQLAlchemy engine"""
+        from sqlalchemy import event
+
+        event.listen(engine, "connect", lambda dbapi_connection, _record: self.configure(dbapi_connection))
+
+    def s3_client(self):
+        """boto3 S3 client for the same R2 endpoint and credentials"""
+        import boto3
+
+        endpoint = self.endpoint or ""
+        if endpoint and not endpoint.startswith("http"):
+            endpoint = f"{'https' if self.use_ssl else 'http'}://{endpoint}"
+
+        return boto3.client(
+            "s3",
+            endpoint_url=endpoint or None,
+            aws_access_key_id=self.access_key_id,
+            aws_secret_access_key=self.secret_access_key,
+            region_name="auto",
+        )
+
+    def _load_extensions(self, conn: Any) -> None:
+        for extension in EXTENSIONS:
+            try:
+                conn.execute(f"LOAD {extension}")
+            except duckdb.Error as e:
+                if not self.allow_extension_install:
+                    raise RuntimeError(
+                        f"DuckDB extension '{extension}' is not available in "
+                        f"{self.extension_directory}. Run "
+                        "`python great_expectations/plugins/r2_connection.py --install` once, "
+                        "or set DUCKDB_ALLOW_EXTENSION_INSTALL=true."
+                    ) from e
+                conn.execute(f"INSTALL {extension}")
+                conn.execute(f"LOAD {extension}")
+
+
+class R2ConnectionPool:
+    """
+    Pool of cursors on one pre-warmed DuckDB database
+
+    Cursors share the database instance, so loaded extensions, the R2 secret,
+    global settings and the metadata cache are shared, while each borrower
+    gets its own connection for thread-safe use.
+    """
+
+    def __init__(self, factory: R2ConnectionFactory | None = None, max_idle: int = 8):
+        self.factory = factory or R2ConnectionFactory()
+        self.max_idle = max_idle
+        self._base = self.factory.connect()
+        self._idle: queue.LifoQueue[duckdb.DuckDBPyConnection] = queue.LifoQueue()
+
+    @property
+    def configured(self) -> bool:
+        return self.factory.configured
+
+    def acquire(self) -> duckdb.DuckDBPyConnection:
+        """Borrow a cursor (call ``release`` when done, or use ``connection()``)"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._base.cursor()
+
+    def release(self, conn: duckdb.DuckDBPyConnection) -> None:
+        if self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+        self._base.close()
+
+
+_default_pool: R2ConnectionPool | None = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool() -> R2ConnectionPool:
+    """Process-wide pool configured from environment variables"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = R2ConnectionPool()
+        return _default_pool
+
+
+def get_r2_connection() -> duckdb.DuckDBPyConnection:
+    """A new cursor on the process-wide pre-warmed database"""
+    return get_pool().acquire()
+
+
+def install_extensions(
+    extension_directory: str | None = None, extensions: Sequence[str] = EXTENSIONS
+) -> str:
+    """Download extensions into the local extension directory (requires network)"""
+    directory = extension_directory or os.getenv(
+        "DUCKDB_EXTENSION_DIRECTORY", DEFAULT_EXTENSION_DIRECTORY
+    )
+    os.makedirs(directory, exist_ok=True)
+
+    conn = duckdb.connect(config={"extension_directory": directory})
+    for extension in extensions:
+        conn.execute(f"INSTALL {extension}")
+    conn.close()
+
+    return directory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DuckDB R2 connection utilities")
+    parser.add_argument("--install", action="store_true", help="Pre-populate the extension directory")
+    parser.add_argument("--extension-directory", help="Extension directory to populate")
+    args = parser.parse_args()
+
+    if args.install:
+        print(f"✅ Extensions installed to {install_extensions(args.extension_directory)}")
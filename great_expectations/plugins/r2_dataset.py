@@ -0,0 +1,181 @@
+"""
+Lazy R2 Dataset Handle for Notebooks
+
+Wraps a Parquet prefix in R2 as a lazy DuckDB relation. Nothing is
+downloaded until a cell asks for a result, and every request is answered by
+the cheapest source available:
+
+- file list: the Bronze manifest (one GET), otherwise a single glob
+- column list and types: ``DESCRIBE`` (Parquet footers only)
+- row count: manifest row counts, otherwise Parquet footer metadata
+- preview: ``LIMIT`` (only the first row groups are read)
+- everything else: a relation with the cell's own projection, filter and
+  limit pushed into the Parquet scan
+
+Used by ``marimo/notebooks/r2_data_exploration.py``.
+"""
+
+from collections.abc import Sequence
+
+import duckdb
+
+from r2_manifest import manifest_files, manifest_row_count
+
+RECURSIVE_PARQUET_SUFFIX = "/**/*.parquet"
+NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+    "UINTEGER", "UBIGINT", "FLOAT", "REAL", "DOUBLE", "DECIMAL",
+)
+TEMPORAL_TYPES = ("DATE", "TIMESTAMP")
+# Lists and arrays of a scalar type start with the scalar type name (INTEGER[])
+NESTED_TYPE_MARKERS = ("[", "STRUCT(", "MAP(", "UNION(")
+
+
+def _is_nested_type(column_type: str) -> bool:
+    upper = column_type.upper()
+    return any(marker in upper for marker in NESTED_TYPE_MARKERS)
+
+
+def is_numeric_type(column_type: str) -> bool:
+    return column_type.upper().startswith(NUMERIC_TYPES) and not _is_nested_type(column_type)
+
+
+def is_temporal_type(column_type: str) -> bool:
+    return column_type.upper().startswith(TEMPORAL_TYPES) and not _is_nested_type(column_type)
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class R2Dataset:
+    """
+    Lazy handle on ``s3://{bucket}/{path}``
+
+    Args:
+        conn: DuckDB connection configured for R2
+        bucket: R2 bucket name
+        path: Object path or glob, e.g. ``sources/api_jsonplaceholder/posts/**/*.parquet``
+        hive_partitioning: Expose ``key=value`` directories as columns
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        bucket: str,
+        path: str,
+        hive_partitioning: bool = True,
+    ):
+        self.conn = conn
+        self.bucket = bucket
+        self.path = path.lstrip("/")
+        self.hive_partitioning = hive_partitioning
+        self._files: list[str] | None = None
+        self._schema: list[tuple[str, str]] | None = None
+        self._row_count: int | None = None
+
+    @property
+    def uri(self) -> str:
+        return f"s3://{self.bucket}/{self.path}"
+
+    @property
+    def manifest_prefix(self) -> str | None:
+        """Table prefix if the path covers a whole Bronze table (manifest eligible)"""
+        if self.path.endswith(RECURSIVE_PARQUET_SUFFIX):
+            return self.path[: -len(RECURSIVE_PARQUET_SUFFIX)]
+        return None
+
+    def refresh(self) -> None:
+        """Forget the resolved file list, schema and row count (e.g. after new files landed)"""
+        self._files = None
+        self._schema = None
+        self._row_count = None
+
+    def files(self) -> list[str]:
+        """Parquet files of the dataset (resolved once)"""
+        if self._files is None:
+            files = None
+            if self.manifest_prefix:
+                files = manifest_files(self.conn, self.bucket, self.manifest_prefix)
+            if not files:
+                files = [
+                    row[0]
+                    for row in self.conn.execute(
+                        f"SELECT file FROM glob({_quote_literal(self.uri)}) ORDER BY file"
+                    ).fetchall()
+                ]
+            self._files = files
+        return self._files
+
+    def source_sql(self) -> str:
+        """``read_parquet`` over the resolved file list (no further listing)"""
+        files = self.files()
+        if not files:
+            raise FileNotFoundError(f"No Parquet files match {self.uri}")
+        file_list = ", ".join(_quote_literal(file) for file in files)
+        options = "union_by_name = true"
+        if self.hive_partitioning:
+            options += ", hive_partitioning = true"
+        return f"read_parquet([{file_list}], {options})"
+
+    def relation(self) -> duckdb.DuckDBPyRelation:
+        """Lazy relation over the whole dataset"""
+        return self.conn.sql(f"SELECT * FROM {self.source_sql()}")
+
+    def schema(self) -> list[tuple[str, str]]:
+        """``[(column, type)]`` from the Parquet footers"""
+        if self._schema is None:
+            self._schema = [
+                (row[0], row[1])
+                for row in self.conn.execute(f"DESCRIBE SELECT * FROM {self.source_sql()}").fetchall()
+            ]
+        return self._schema
+
+    def columns(self) -> list[str]:
+        return [name for name, _ in self.schema()]
+
+    def row_count(self) -> int:
+        """Row count from the manifest, otherwise from Parquet footer metadata"""
+        if self._row_count is None:
+            count = None
+            if self.manifest_prefix:
+                count = manifest_row_count(self.conn, self.bucket, self.manifest_prefix)
+            if count is None:
+                file_list = ", ".join(_quote_literal(file) for file in self.files())
+                count = self.conn.execute(
+                    "SELECT COALESCE(SUM(row_group_num_rows), 0) FROM ("
+                    " SELECT DISTINCT file_name, row_group_id, row_group_num_rows"
+                    f" FROM parquet_metadata([{file_list}]))"
+                ).fetchone()[0]
+            self._row_count = int(count)
+        return self._row_count
+
+    def select(
+        self,
+        columns: Sequence[str] | None = None,
+        where: str | None = None,
+        limit: int | None = None,
+    ) -> duckdb.DuckDBPyRelation:
+        """
+        Relation with projection, filter and limit pushed into the Parquet scan
+
+        Args:
+            columns: Columns to read (default: all)
+            where: SQL predicate (hive partition columns prune whole files)
+            limit: Maximum rows
+        """
+        projection = ", ".join(quote_identifier(column) for column in columns) if columns else "*"
+        sql = f"SELECT {projection} FROM {self.source_sql()}"
+        if where:
+            sql += f" WHERE {where}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.sql(sql)
+
+    def preview(self, limit: int = 10):
+        """First rows as a pandas DataFrame"""
+        return self.select(limit=limit).df()
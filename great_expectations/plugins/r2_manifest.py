@@ -0,0 +1,137 @@
+"""
+Bronze Manifest Reader for Cloudflare Data Platform
+
+The ingestion workers append every file they write to
+``{table prefix}/_manifest.jsonl`` (see ``workers/ingestion/manifest.py``).
+Reading that one object replaces the recursive LIST behind
+``read_parquet('.../**/*.parquet')``, so query planning costs one GET however
+many files the table has accumulated.
+
+Two DuckDB table macros are registered on every connection from
+``R2ConnectionFactory``::
+
+    SELECT * FROM bronze_manifest('s3://data-lake-raw/sources/api_jsonplaceholder/posts/_manifest.jsonl');
+    SELECT * FROM bronze_manifest_files('s3://…/_manifest.jsonl');  -- full s3:// URIs of the Parquet files
+
+``read_parquet`` only accepts a constant file list, so Python callers resolve
+the list first with ``manifest_files()`` and pass it on.
+"""
+
+
+import duckdb
+
+MANIFEST_NAME = "_manifest.jsonl"
+
+MANIFEST_COLUMNS = (
+    "{'key': 'VARCHAR', 'size': 'BIGINT', 'etag': 'VARCHAR', 'rows': 'BIGINT',"
+    " 'year': 'INTEGER', 'month': 'INTEGER', 'day': 'INTEGER',"
+    " 'load_id': 'VARCHAR', 'table': 'VARCHAR', 'written_at': 'TIMESTAMPTZ'}"
+)
+
+
+def manifest_uri(bucket: str, prefix: str) -> str:
+    """``s3://{bucket}/{prefix}/_manifest.jsonl``"""
+    return f"s3://{bucket}/{prefix.strip('/')}/{MANIFEST_NAME}"
+
+
+def create_manifest_macros(conn) -> None:
+    """Register ``bronze_manifest(uri)`` and ``bronze_manifest_files(uri)`` on a connection"""
+    conn.execute(
+        "CREATE OR REPLACE MACRO bronze_manifest(uri) AS TABLE "
+        f"SELECT * FROM read_json(uri, format = 'newline_delimited', columns = {MANIFEST_COLUMNS})"
+    )
+    conn.execute(
+        "CREATE OR REPLACE MACRO bronze_manifest_files(uri) AS TABLE "
+        "SELECT regexp_replace(uri, '^(s3://[^/]+/).*$', '\\1') || key AS file, "
+        "size, etag, rows, year, month, day, load_id "
+        "FROM bronze_manifest(uri) "
+        "WHERE key LIKE '%.parquet' "
+        "ORDER BY key"
+    )
+
+
+def manifest_files(
+    conn: duckdb.DuckDBPyConnection,
+    bucket: str,
+    prefix: str,
+    min_day: int | None = None,
+    min_load_id: float | None = None,
+) -> list[str] | None:
+    """
+    Parquet files of a Bronze table according to its manifest
+
+    Args:
+        conn: DuckDB connection configured for R2
+        bucket: R2 bucket holding the table
+        prefix: Table prefix (e.g. ``sources/api_jsonplaceholder/posts``)
+        min_day: Only partitions on or after this day (``YYYYMMDD``)
+        min_load_id: Only files of loads newer than this ``_dlt_load_id``
+
+    Returns:
+        ``s3://`` URIs, or None if the table has no manifest yet (callers fall
+        back to globbing the prefix)
+    """
+    uri = manifest_uri(bucket, prefix).replace("'", "''")
+    filters = ["key LIKE '%.parquet'"]
+    if min_day is not None:
+        filters.append(f"(year * 10000 + month * 100 + day) >= {int(min_day)}")
+    if min_load_id is not None:
+        filters.append(f"CAST(load_id AS DOUBLE) > {float(min_load_id)!r}")
+
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT DISTINCT key
+            FROM read_json('{uri}', format = 'newline_delimited', columns = {MANIFEST_COLUMNS})
+            WHERE {' AND '.join(filters)}
+            ORDER BY key
+            """
+        ).fetchall()
+    except duckdb.IOException:
+        return None
+
+    return [f"s3://{bucket}/{key}" for (key,) in rows]
+
+
+def manifest_row_count(conn: duckdb.DuckDBPyConnection, bucket: str, prefix: str) -> int | None:
+    """
+    Total rows of a Bronze table from its manifest
+
+    Returns:
+        The row count, or None if there is no manifest or some files were
+        registered without a row count
+    """
+    uri = manifest_uri(bucket, prefix).replace("'", "''")
+    try:
+        files, counted, rows = conn.execute(
+            f"""
+            SELECT COUNT(*), COUNT(rows), SUM(rows)
+            FROM read_json('{uri}', format = 'newline_delimited', columns = {MANIFEST_COLUMNS})
+            WHERE key LIKE '%.parquet'
+            """
+        ).fetchone()
+    except duckdb.IOException:
+        return None
+    return int(rows) if files and files == counted else None
+
+
+def manifest_versions(conn: duckdb.DuckDBPyConnection, bucket: str, prefix: str) -> dict[str, str] | None:
+    """
+    ``{s3 uri: etag}`` of the Parquet files of a Bronze table
+
+    Returns:
+        The versions, or None if the table has no manifest
+    """
+    uri = manifest_uri(bucket, prefix).replace("'", "''")
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT key, arg_max(etag, written_at)
+            FROM read_json('{uri}', format = 'newline_delimited', columns = {MANIFEST_COLUMNS})
+            WHERE key LIKE '%.parquet'
+            GROUP BY key
+            """
+        ).fetchall()
+    except duckdb.IOException:
+        return None
+    return {f"s3://{bucket}/{key}": etag or "" for key, etag in rows}
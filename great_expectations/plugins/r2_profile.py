@@ -0,0 +1,170 @@
+"""
+One-pass Column Profiling over R2
+
+Computes every column statistic the exploration notebook shows (non-null and
+null counts, approximate distinct counts, min/max, mean, standard deviation,
+quartiles) plus the duplicate row count in a single DuckDB aggregate scan
+over the Parquet files in R2.
+
+- Distinct counts use ``approx_count_distinct`` (HyperLogLog) over ``hash()``
+  of the value, so nested types are supported as well
+- Duplicate rows are counted as ``COUNT(*) - COUNT(DISTINCT hash(<all columns>))``:
+  one 64-bit hash per row instead of a sort over full rows
+- Profiles are cached per dataset URI and file list, so re-running a cell is
+  free and a new file landing in the prefix triggers a fresh scan
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import pandas as pd
+
+from r2_dataset import R2Dataset, is_numeric_type, quote_identifier
+
+# Types without a meaningful ordering are not given min/max
+UNORDERED_TYPE_MARKERS = ("[]", "STRUCT", "MAP", "UNION", "JSON")
+QUANTILES = (0.25, 0.5, 0.75)
+CACHE_SIZE = 8
+
+_cache: "OrderedDict[tuple[str, tuple[str, ...]], DatasetProfile]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _is_ordered_type(column_type: str) -> bool:
+    upper = column_type.upper()
+    return not any(marker in upper for marker in UNORDERED_TYPE_MARKERS)
+
+
+def profile_sql(source_sql: str, schema: list[tuple[str, str]]) -> str:
+    """Single aggregate query computing all column statistics of ``schema``"""
+    all_columns = ", ".join(quote_identifier(name) for name, _ in schema)
+    expressions = [
+        "COUNT(*) AS row_count",
+        f"COUNT(DISTINCT hash({all_columns})) AS distinct_rows",
+    ]
+    for index, (name, column_type) in enumerate(schema):
+        column = quote_identifier(name)
+        expressions.append(f"COUNT({column}) AS c{index}_count")
+        expressions.append(
+            f"approx_count_distinct(hash({column})) FILTER (WHERE {column} IS NOT NULL) AS c{index}_distinct"
+        )
+        if _is_ordered_type(column_type):
+            expressions.append(f"MIN({column})::VARCHAR AS c{index}_min")
+            expressions.append(f"MAX({column})::VARCHAR AS c{index}_max")
+        if is_numeric_type(column_type):
+            expressions.append(f"AVG({column}::DOUBLE) AS c{index}_mean")
+            expressions.append(f"STDDEV_SAMP({column}::DOUBLE) AS c{index}_std")
+            quantiles = ", ".join(str(q) for q in QUANTILES)
+            expressions.append(f"approx_quantile({column}::DOUBLE, [{quantiles}]) AS c{index}_quantiles")
+    return f"SELECT {', '.join(expressions)} FROM {source_sql}"
+
+
+class DatasetProfile:
+    """Result of one profiling scan"""
+
+    def __init__(
+        self,
+        uri: str,
+        row_count: int,
+        distinct_rows: int,
+        columns: pd.DataFrame,
+        elapsed_seconds: float,
+    ):
+        self.uri = uri
+        self.row_count = row_count
+        self.distinct_rows = distinct_rows
+        self.columns = columns
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def duplicate_rows(self) -> int:
+        return self.row_count - self.distinct_rows
+
+    @property
+    def null_counts(self) -> dict[str, int]:
+        return dict(zip(self.columns["Column"], self.columns["Null Count"], strict=True))
+
+    def column(self, name: str) -> dict[str, Any]:
+        """Statistics of a single column"""
+        return self.columns[self.columns["Column"] == name].iloc[0].to_dict()
+
+    def quality_metrics(self) -> pd.DataFrame:
+        null_counts = self.columns["Null Count"]
+        return pd.DataFrame({
+            "Metric": [
+                "Total Rows",
+                "Total Columns",
+                "Duplicate Rows",
+                "Total Missing Values",
+                "Columns with Missing Values",
+            ],
+            "Value": [
+                self.row_count,
+                len(self.columns),
+                self.duplicate_rows,
+                int(null_counts.sum()),
+                int((null_counts > 0).sum()),
+            ],
+        })
+
+
+def _build_profile(uri: str, schema: list[tuple[str, str]], values: dict[str, Any], elapsed: float) -> DatasetProfile:
+    row_count = values["row_count"]
+    rows = []
+    for index, (name, column_type) in enumerate(schema):
+        non_null = values[f"c{index}_count"]
+        quantiles = values.get(f"c{index}_quantiles") or [None] * len(QUANTILES)
+        rows.append({
+            "Column": name,
+            "Type": column_type,
+            "Non-Null Count": non_null,
+            "Null Count": row_count - non_null,
+            "Null %": (row_count - non_null) / row_count * 100 if row_count else 0.0,
+            "Distinct (approx.)": values[f"c{index}_distinct"],
+            "Min": values.get(f"c{index}_min"),
+            "Max": values.get(f"c{index}_max"),
+            "Mean": values.get(f"c{index}_mean"),
+            "Std": values.get(f"c{index}_std"),
+            "25%": quantiles[0],
+            "50%": quantiles[1],
+            "75%": quantiles[2],
+        })
+    return DatasetProfile(uri, row_count, values["distinct_rows"], pd.DataFrame(rows), elapsed)
+
+
+def profile_dataset(dataset: R2Dataset, refresh: bool = False) -> DatasetProfile:
+    """
+    Profile all columns of ``dataset`` in one scan (cached)
+
+    Args:
+        dataset: Lazy R2 dataset
+        refresh: Ignore the cached profile
+    """
+    key = (dataset.uri, tuple(dataset.files()))
+    with _cache_lock:
+        if not refresh and key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    schema = dataset.schema()
+    started = time.monotonic()
+    cursor = dataset.conn.execute(profile_sql(dataset.source_sql(), schema))
+    names = [description[0] for description in cursor.description]
+    values = dict(zip(names, cursor.fetchone(), strict=True))
+    profile = _build_profile(dataset.uri, schema, values, time.monotonic() - started)
+
+    with _cache_lock:
+        _cache[key] = profile
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return profile
+
+
+def clear_cache(uri: str | None = None) -> None:
+    """Drop cached profiles (of one dataset URI, or all)"""
+    with _cache_lock:
+        for key in [key for key in _cache if uri is None or key[0] == uri]:
+            del _cache[key]
@@ -0,0 +1,307 @@
+"""
+Query Result Cache for Notebooks
+
+marimo re-runs every downstream cell when an upstream UI element changes.
+``QueryCache`` makes those re-runs free when neither the query nor the data
+changed: results are kept as Arrow tables, keyed by the normalized SQL and
+a fingerprint of the ETags of the dataset's files.
+
+- Memory: LRU bounded by ``max_bytes`` (Arrow buffer size)
+- Spill: evicted results are optionally written to local Parquet and
+  promoted back on the next hit; the directory is bounded by
+  ``max_spill_bytes`` (least recently used files are deleted first)
+- Invalidation: the file versions come from the Bronze manifest (one GET),
+  otherwise from one LIST of the prefix, refreshed at most every
+  ``version_ttl`` seconds. When a file is added, removed or rewritten the
+  fingerprint changes, the dataset's file list is refreshed and the stale
+  entries of that dataset are dropped, in memory and spilled
+"""
+
+import fnmatch
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from r2_dataset import R2Dataset, quote_identifier
+from r2_manifest import manifest_versions
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_SPILL_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_VERSION_TTL = 10.0
+WILDCARD = re.compile(r"[*?\[]")
+# String literals and quoted identifiers, or runs of comments and whitespace
+SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|(?:\s+|--[^\n]*|/\*.*?\*/)+", re.S)
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip comments, collapse whitespace and trailing semicolons (quoted text is kept as is)"""
+
+    def replace(match: "re.Match") -> str:
+        if match.group(1):
+            return match.group(1)
+        return " "
+
+    return SQL_TOKENS.sub(replace, sql).strip().rstrip(";").strip()
+
+
+def list_versions(dataset: R2Dataset, s3_client: Any) -> dict[str, str]:
+    """``{s3 uri: etag}`` of the objects matching the dataset path (one LIST)"""
+    wildcard = WILDCARD.search(dataset.path)
+    prefix = dataset.path[: wildcard.start()] if wildcard else dataset.path
+    versions = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=dataset.bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            if wildcard is None or fnmatch.fnmatchcase(item["Key"], dataset.path):
+                versions[f"s3://{dataset.bucket}/{item['Key']}"] = item["ETag"].strip('"')
+    return versions
+
+
+class QueryCache:
+    """
+    Arrow result cache keyed by normalized SQL and file versions
+
+    Args:
+        max_bytes: In-memory budget (default 512 MiB, env ``R2_QUERY_CACHE_MAX_BYTES``)
+        spill_dir: Directory for evicted results as Parquet (env ``R2_QUERY_CACHE_DIR``; None disables spilling)
+        max_spill_bytes: Spill directory budget (default 2 GiB, env ``R2_QUERY_CACHE_MAX_SPILL_BYTES``)
+        version_ttl: Seconds a file version listing is reused
+        s3_client: boto3 client for prefixes without a manifest (default: ``R2ConnectionFactory().s3_client()``)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        spill_dir: str | None = None,
+        version_ttl: float = DEFAULT_VERSION_TTL,
+        s3_client: Any = None,
+        max_spill_bytes: int | None = None,
+    ):
+        self.max_bytes = max_bytes or int(os.getenv("R2_QUERY_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.spill_dir = spill_dir or os.getenv("R2_QUERY_CACHE_DIR")
+        self.max_spill_bytes = max_spill_bytes or int(
+            os.getenv("R2_QUERY_CACHE_MAX_SPILL_BYTES", DEFAULT_MAX_SPILL_BYTES)
+        )
+        self.version_ttl = version_ttl
+        self._s3_client = s3_client
+        self._entries: OrderedDict[str, tuple[str, pa.Table]] = OrderedDict()
+        self._bytes = 0
+        self._versions: dict[str, tuple[float, str]] = {}
+        self._datasets: dict[tuple[str, str], R2Dataset] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    @property
+    def s3_client(self) -> Any:
+        if self._s3_client is None:
+            from r2_connection import R2ConnectionFactory
+
+            self._s3_client = R2ConnectionFactory().s3_client()
+        return self._s3_client
+
+    def dataset(self, conn: duckdb.DuckDBPyConnection, bucket: str, path: str) -> R2Dataset:
+        """
+        Reusable dataset handle for ``s3://{bucket}/{path}``
+
+        Re-running the load cell returns the same handle with its resolved
+        files, schema and row count, refreshed only when the versions changed.
+        """
+        with self._lock:
+            dataset = self._datasets.get((bucket, path))
+            if dataset is None or dataset.conn is not conn:
+                dataset = self._datasets[(bucket, path)] = R2Dataset(conn, bucket, path)
+        self.fingerprint(dataset)
+        return dataset
+
+    def fingerprint(self, dataset: R2Dataset) -> str:
+        """Hash of the dataset's file versions; refreshes the dataset when they changed"""
+        with self._lock:
+            cached = self._versions.get(dataset.uri)
+        if cached and time.monotonic() - cached[0] < self.version_ttl:
+            return cached[1]
+
+        versions = None
+        if dataset.manifest_prefix:
+            versions = manifest_versions(dataset.conn, dataset.bucket, dataset.manifest_prefix)
+        if not versions:
+            versions = list_versions(dataset, self.s3_client)
+
+        digest = hashlib.sha256()
+        for uri in sorted(versions):
+            digest.update(f"{uri}\0{versions[uri]}\n".encode())
+        fingerprint = digest.hexdigest()
+
+        if cached and cached[1] != fingerprint:
+            dataset.refresh()
+            self.invalidate(dataset.uri)
+        elif sorted(versions) != sorted(dataset.files()):
+            dataset.refresh()
+        with self._lock:
+            self._versions[dataset.uri] = (time.monotonic(), fingerprint)
+        return fingerprint
+
+    def key(self, sql: str, dataset: R2Dataset) -> str:
+        return hashlib.sha256(
+            f"{dataset.uri}\0{self.fingerprint(dataset)}\0{normalize_sql(sql)}".encode()
+        ).hexdigest()
+
+    @staticmethod
+    def _uri_prefix(uri: str) -> str:
+        return hashlib.sha256(uri.encode()).hexdigest()[:16]
+
+    def _spill_path(self, key: str, uri: str) -> str:
+        """Spill file named ``{uri hash}-{key}.parquet`` so a dataset's files can be found by prefix"""
+        return os.path.join(self.spill_dir, f"{self._uri_prefix(uri)}-{key}.parquet")
+
+    def get(self, key: str, uri: str) -> pa.Table | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][1]
+        path = self._spill_path(key, uri) if self.spill_dir else None
+        if path and os.path.exists(path):
+            table = pq.read_table(path)
+            # The mtime orders spill files for LRU eviction
+            os.utime(path)
+            with self._lock:
+                self.hits += 1
+            self.put(key, uri, table)
+            return table
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, uri: str, table: pa.Table) -> None:
+        if table.nbytes > self.max_bytes:
+            self._spill(key, uri, table)
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (uri, table)
+            self._bytes += table.nbytes
+            evicted = []
+            while self._bytes > self.max_bytes:
+                old_key, (old_uri, old_table) = self._entries.popitem(last=False)
+                self._bytes -= old_table.nbytes
+                evicted.append((old_key, old_uri, old_table))
+        for old_key, old_uri, old_table in evicted:
+            self._spill(old_key, old_uri, old_table)
+
+    def _spill(self, key: str, uri: str, table: pa.Table) -> None:
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key, uri)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        pq.write_table(table, temp_path, compression="zstd")
+        os.replace(temp_path, path)
+        self._evict_spill()
+
+    def _spill_files(self, prefix: str = "") -> list[os.DirEntry]:
+        return [
+            entry for entry in os.scandir(self.spill_dir)
+            if entry.name.startswith(prefix) and entry.name.endswith(".parquet")
+        ]
+
+    def _evict_spill(self) -> None:
+        """Delete the least recently used spill files until the directory fits ``max_spill_bytes``"""
+        files = []
+        for entry in self._spill_files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_spill_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def run(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        sql: str,
+        dataset: R2Dataset,
+        view: str | None = None,
+    ) -> pa.Table:
+        """
+        Result of ``sql`` over ``dataset`` (cached)
+
+        Args:
+            conn: Connection to execute on
+            sql: Query
+            dataset: Dataset whose files the query reads
+            view: If set, ``sql`` refers to the dataset under this view name;
+                the view is (re)created over the current file list on a miss
+        """
+        key = self.key(sql, dataset)
+        table = self.get(key, dataset.uri)
+        if table is None:
+            if view:
+                conn.execute(
+                    f"CREATE OR REPLACE TEMP VIEW {quote_identifier(view)} AS SELECT * FROM {dataset.source_sql()}"
+                )
+            table = conn.execute(sql).fetch_arrow_table()
+            self.put(key, dataset.uri, table)
+        return table
+
+    def invalidate(self, uri: str | None = None) -> None:
+        """Drop cached results, in memory and spilled (of one dataset URI, or all)"""
+        with self._lock:
+            for key in [key for key, (entry_uri, _) in self._entries.items() if uri is None or entry_uri == uri]:
+                self._bytes -= self._entries.pop(key)[1].nbytes
+            if uri is None:
+                self._versions.clear()
+        if self.spill_dir:
+            prefix = "" if uri is None else f"{self._uri_prefix(uri)}-"
+            for entry in self._spill_files(prefix):
+                self._remove(entry.path)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+_default_cache: QueryCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide query cache configured from environment variables"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = QueryCache()
+        return _default_cache
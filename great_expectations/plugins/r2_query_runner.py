@@ -0,0 +1,238 @@
+"""
+Non-blocking Query Runner for Notebooks
+
+Runs ad-hoc SQL over an R2 dataset in a background thread so a heavy query
+never freezes the notebook:
+
+- each query gets its own DuckDB cursor with the dataset exposed as a view
+  (``df`` by default) over the Parquet files in R2
+- progress is read from DuckDB's query progress while the query runs
+- ``cancel()`` and the per-query timeout call ``interrupt()`` on that cursor
+- SELECT queries are wrapped in ``LIMIT row_cap + 1`` (pushed down by
+  DuckDB), so at most ``row_cap + 1`` rows are ever fetched; the result is
+  materialized once as an Arrow table and ``page()`` slices it for display
+- results go through ``QueryCache`` when one is given, so re-running an
+  unchanged query on unchanged files returns immediately
+"""
+
+import re
+import threading
+import time
+import uuid
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from r2_dataset import R2Dataset, quote_identifier
+from r2_query_cache import QueryCache, normalize_sql
+
+DEFAULT_ROW_CAP = 10_000
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_TIMEOUT = 120.0
+# Seconds between repeated interrupts of a cancelled query
+INTERRUPT_INTERVAL = 0.05
+# Statements whose result can be wrapped in a subquery
+ROW_QUERY = re.compile(r"^\(?\s*(SELECT|WITH|FROM|VALUES|TABLE)\b", re.I)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED, TIMED_OUT)
+
+
+def capped_sql(sql: str, row_cap: int) -> str:
+    """``sql`` limited to ``row_cap + 1`` rows (one extra row detects truncation)"""
+    normalized = normalize_sql(sql)
+    if not ROW_QUERY.match(normalized):
+        return normalized
+    return f"SELECT * FROM ({normalized}) AS capped LIMIT {int(row_cap) + 1}"
+
+
+class QueryJob:
+    """A query running (or finished) in the background"""
+
+    def __init__(self, sql: str, row_cap: int, page_size: int):
+        self.id = uuid.uuid4().hex[:8]
+        self.sql = sql
+        self.row_cap = row_cap
+        self.page_size = page_size
+        self.status = PENDING
+        self.error: str | None = None
+        self.table: pa.Table | None = None
+        self.truncated = False
+        self.cached = False
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._cursor: duckdb.DuckDBPyConnection | None = None
+        self._cancel_requested = False
+        self._timed_out = False
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def row_count(self) -> int:
+        return self.table.num_rows if self.table is not None else 0
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.row_count // self.page_size))
+
+    def progress(self) -> float | None:
+        """Completion in percent while running (None if DuckDB cannot estimate it)"""
+        if self.status in FINISHED_STATES:
+            return 100.0 if self.status == SUCCEEDED else None
+        with self._lock:
+            cursor = self._cursor
+        if cursor is None or not hasattr(cursor, "query_progress"):
+            return None
+        try:
+            value = cursor.query_progress()
+        except duckdb.Error:
+            return None
+        return value if value >= 0 else None
+
+    def cancel(self) -> None:
+        """Interrupt the query (no-op once finished)"""
+        self._interrupt(timed_out=False)
+
+    def _interrupt(self, timed_out: bool) -> None:
+        with self._lock:
+            if self.done or self._cancel_requested:
+                return
+            self._cancel_requested = True
+            self._timed_out = timed_out
+        threading.Thread(target=self._keep_interrupting, name=f"interrupt-{self.id}", daemon=True).start()
+
+    def _keep_interrupting(self) -> None:
+        # interrupt() only reaches a statement that is already executing, so it is
+        # repeated until the worker finishes (covers a cancel between two statements)
+        while True:
+            with self._lock:
+                if self._cursor is not None:
+                    self._cursor.interrupt()
+            if self._done.wait(INTERRUPT_INTERVAL):
+                return
+
+    def _check_cancelled(self) -> None:
+        with self._lock:
+            if self._cancel_requested:
+                raise duckdb.InterruptException("cancelled")
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def page(self, number: int = 0) -> pd.DataFrame:
+        """Rows of page ``number`` (0-based) as a DataFrame"""
+        if self.table is None:
+            return pd.DataFrame()
+        number = max(0, min(int(number), self.page_count - 1))
+        return self.table.slice(number * self.page_size, self.page_size).to_pandas()
+
+
+class QueryRunner:
+    """
+    Runs queries over ``dataset`` in background threads, one at a time
+
+    Args:
+        conn: DuckDB connection configured for R2 (each query uses its own cursor)
+        dataset: Dataset exposed to the queries as ``view``
+        cache: Optional result cache
+        row_cap: Maximum rows kept per query
+        page_size: Rows per page
+        timeout: Seconds before a query is interrupted (None: no timeout)
+        view: View name of the dataset in the queries
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        dataset: R2Dataset,
+        cache: QueryCache | None = None,
+        row_cap: int = DEFAULT_ROW_CAP,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        view: str = "df",
+    ):
+        self.conn = conn
+        self.dataset = dataset
+        self.cache = cache
+        self.row_cap = row_cap
+        self.page_size = page_size
+        self.timeout = timeout
+        self.view = view
+        self.current: QueryJob | None = None
+        # The dataset resolves files and versions on the shared connection,
+        # which must not be used by a cancelled and a new query at once
+        self._dataset_lock = threading.Lock()
+
+    def submit(self, sql: str) -> QueryJob:
+        """Start ``sql`` in the background (a still running previous query is cancelled)"""
+        if self.current is not None:
+            self.current.cancel()
+        job = QueryJob(sql, self.row_cap, self.page_size)
+        self.current = job
+        threading.Thread(target=self._run, args=(job,), name=f"query-{job.id}", daemon=True).start()
+        return job
+
+    def _run(self, job: QueryJob) -> None:
+        job.started_at = time.monotonic()
+        job.status = RUNNING
+        timer = None
+        cursor = self.conn.cursor()
+        try:
+            with job._lock:
+                job._cursor = cursor
+            job._check_cancelled()
+            # Progress is only tracked with the progress bar enabled (never printed)
+            cursor.execute("SET enable_progress_bar = true")
+            cursor.execute("SET enable_progress_bar_print = false")
+            if self.timeout:
+                timer = threading.Timer(self.timeout, job._interrupt, kwargs={"timed_out": True})
+                timer.daemon = True
+                timer.start()
+
+            sql = capped_sql(job.sql, self.row_cap)
+            with self._dataset_lock:
+                # The key refreshes the dataset's file list first if new files landed
+                key = self.cache.key(sql, self.dataset) if self.cache is not None else None
+                source_sql = self.dataset.source_sql()
+            table = self.cache.get(key, self.dataset.uri) if key else None
+            job.cached = table is not None
+            if table is None:
+                cursor.execute(
+                    f"CREATE OR REPLACE TEMP VIEW {quote_identifier(self.view)} AS SELECT * FROM {source_sql}"
+                )
+                table = cursor.execute(sql).fetch_arrow_table()
+                if key:
+                    self.cache.put(key, self.dataset.uri, table)
+
+            job.truncated = table.num_rows > self.row_cap
+            job.table = table.slice(0, self.row_cap)
+            job.status = SUCCEEDED
+        except duckdb.InterruptException:
+            job.status = TIMED_OUT if job._timed_out else CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with job._lock:
+                job._cursor = None
+                job.finished_at = time.monotonic()
+                job._done.set()
+            cursor.close()
@@ -0,0 +1,90 @@
+"""
+Checkpoint Action for Bounded Unexpected-Row Capture
+
+For every failed row-level expectation, streams the failing rows of the
+validated batch into a capped Parquet file (see ``scripts/unexpected_rows.py``)
+and adds the file pointer and a small sample to the expectation result.
+Place it before ``StoreValidationResultAction`` so the stored result
+contains the pointers.
+"""
+
+import sys
+from pathlib import Path
+
+from great_expectations.checkpoint.actions import ValidationAction
+
+from r2_connection import get_pool
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from unexpected_rows import (  # noqa: E402
+    DEFAULT_ROW_CAP,
+    DEFAULT_SAMPLE_SIZE,
+    capture_expectation_rows,
+    capture_path,
+    default_output_root,
+)
+from validation_engine import raised_exception  # noqa: E402
+
+
+class CaptureUnexpectedRowsAction(ValidationAction):
+    """
+    Capture failing rows of query-based batches into Parquet files
+
+    Configure in a checkpoint::
+
+        - name: capture_unexpected_rows
+          action:
+            class_name: CaptureUnexpectedRowsAction
+            module_name: unexpected_rows_action
+            row_cap: 10000
+            output_root: s3://data-lake-raw/_quality/unexpected_rows  # optional
+    """
+
+    def __init__(
+        self,
+        data_context,
+        output_root: str | None = None,
+        row_cap: int = DEFAULT_ROW_CAP,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+    ):
+        super().__init__(data_context)
+        self.output_root = output_root or default_output_root(data_context.root_directory)
+        self.row_cap = row_cap
+        self.sample_size = sample_size
+
+    def _run(
+        self,
+        validation_result_suite,
+        validation_result_suite_identifier,
+        data_asset=None,
+        expectation_suite_identifier=None,
+        checkpoint_identifier=None,
+        **kwargs,
+    ):
+        query = (validation_result_suite.meta.get("batch_spec") or {}).get("query")
+        if not query or validation_result_suite.success:
+            return {"unexpected_rows": []}
+
+        source_sql = f"({query}) AS src"
+        suite_name = validation_result_suite.meta["expectation_suite_name"]
+        run_name = validation_result_suite_identifier.run_id.run_name
+        paths = []
+
+        with get_pool().connection() as conn:
+            for position, expectation_result in enumerate(validation_result_suite.results):
+                if expectation_result.success or raised_exception(expectation_result.exception_info):
+                    continue
+                expectation = {
+                    "expectation_type": expectation_result.expectation_config.expectation_type,
+                    "kwargs": dict(expectation_result.expectation_config.kwargs),
+                }
+                path = capture_path(self.output_root, suite_name, run_name, position, expectation)
+                capture = capture_expectation_rows(
+                    conn, expectation, source_sql, path, self.row_cap, self.sample_size
+                )
+                if capture is not None:
+                    expectation_result.result["unexpected_rows"] = capture
+                    paths.append(path)
+
+        return {"unexpected_rows": paths}
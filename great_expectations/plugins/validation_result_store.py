@@ -0,0 +1,215 @@
+"""
+Columnar Validation Result Store for Cloudflare Data Platform
+
+Flattens validation results into one row per expectation and appends them
+to a Parquet table partitioned by run date (local directory or ``s3://``
+URI), or to a DuckDB database file. Quality trends over months of runs then
+become a single aggregate query instead of parsing thousands of JSON files.
+
+Works with Great Expectations results (``to_json_dict()``) and with the
+GE-compatible dicts of the single-pass DuckDB engines. The checkpoint uses
+it through ``StoreColumnarValidationResultAction``
+(``validation_result_store_action.py``).
+"""
+
+import json
+import os
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from validation_engine import raised_exception  # noqa: E402
+
+RESULT_SCHEMA = pa.schema([
+    ("run_id", pa.string()),
+    ("run_time", pa.timestamp("us", tz="UTC")),
+    ("suite", pa.string()),
+    ("data_asset", pa.string()),
+    ("engine", pa.string()),
+    ("expectation_index", pa.int32()),
+    ("expectation_type", pa.string()),
+    ("column", pa.string()),
+    ("success", pa.bool_()),
+    ("observed_value", pa.string()),
+    ("element_count", pa.int64()),
+    ("missing_count", pa.int64()),
+    ("unexpected_count", pa.int64()),
+    ("unexpected_percent", pa.float64()),
+    ("raised_exception", pa.bool_()),
+    ("duration_seconds", pa.float64()),
+])
+
+TABLE_NAME = "validation_results"
+
+
+def _run_identity(meta: dict[str, Any]) -> dict[str, Any]:
+    run_id = meta.get("run_id") or {}
+    if isinstance(run_id, str):
+        run_id = {"run_name": run_id}
+    run_time = run_id.get("run_time")
+    if isinstance(run_time, str):
+        run_time = datetime.fromisoformat(run_time.replace("Z", "+00:00"))
+    if run_time is None:
+        run_time = datetime.now(UTC)
+    elif run_time.tzinfo is None:
+        run_time = run_time.replace(tzinfo=UTC)
+    return {"run_id": run_id.get("run_name") or run_time.strftime("%Y%m%dT%H%M%S"), "run_time": run_time}
+
+
+def _count(value: Any) -> int | None:
+    return int(value) if value is not None else None
+
+
+def flatten_validation_result(
+    result: dict[str, Any], data_asset_name: str | None = None
+) -> pa.Table:
+    """
+    One row per expectation of a validation result
+
+    Args:
+        result: Validation result JSON (GE ``to_json_dict()`` or engine output)
+        data_asset_name: Asset name (default: taken from the active batch definition)
+
+    Returns:
+        Arrow table with ``RESULT_SCHEMA``
+    """
+    meta = result.get("meta") or {}
+    identity = _run_identity(meta)
+    data_asset_name = data_asset_name or (meta.get("active_batch_definition") or {}).get(
+        "data_asset_name"
+    )
+
+    rows: list[dict[str, Any]] = []
+    for index, entry in enumerate(result.get("results") or []):
+        config = entry.get("expectation_config") or {}
+        observed = entry.get("result") or {}
+        observed_value = observed.get("observed_value")
+        rows.append({
+            **identity,
+            "suite": meta.get("expectation_suite_name"),
+            "data_asset": data_asset_name,
+            "engine": meta.get("engine", "great_expectations"),
+            "expectation_index": index,
+            "expectation_type": config.get("expectation_type"),
+            "column": (config.get("kwargs") or {}).get("column"),
+            "success": bool(entry.get("success")),
+            "observed_value": (
+                json.dumps(observed_value, default=str) if observed_value is not None else None
+            ),
+            "element_count": _count(observed.get("element_count")),
+            "missing_count": _count(observed.get("missing_count")),
+            "unexpected_count": _count(observed.get("unexpected_count")),
+            "unexpected_percent": observed.get("unexpected_percent"),
+            "raised_exception": raised_exception(entry.get("exception_info")) is not None,
+            "duration_seconds": meta.get("duration_seconds"),
+        })
+
+    return pa.Table.from_pylist(rows, schema=RESULT_SCHEMA)
+
+
+class ValidationResultStore:
+    """
+    Append-only columnar store of per-expectation validation outcomes
+
+    ``root`` is either a directory / ``s3://`` URI (Parquet layout
+    ``{root}/run_date=YYYY-MM-DD/{suite}-{run_id}.parquet``) or a path ending
+    in ``.duckdb`` (rows appended to table ``validation_results``).
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, root: str):
+        self.conn = conn
+        self.root = root.rstrip("/")
+        self.is_duckdb = self.root.endswith(".duckdb")
+        if self.is_duckdb:
+            self.conn.execute(f"ATTACH IF NOT EXISTS '{self.root}' AS validation_result_store")
+
+    def write(self, result: dict[str, Any], data_asset_name: str | None = None) -> str:
+        """Append the rows of one validation result; returns where they were written"""
+        table = flatten_validation_result(result, data_asset_name)
+        if table.num_rows == 0:
+            return self.root
+
+        self.conn.register("_validation_result_rows", table)
+        try:
+            if self.is_duckdb:
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS validation_result_store.{TABLE_NAME} AS "
+                    "SELECT * FROM _validation_result_rows LIMIT 0"
+                )
+                self.conn.execute(
+                    f"INSERT INTO validation_result_store.{TABLE_NAME} "
+                    "SELECT * FROM _validation_result_rows"
+                )
+                return f"{self.root}#{TABLE_NAME}"
+
+            first = table.slice(0, 1).to_pylist()[0]
+            path = (
+                f"{self.root}/run_date={first['run_time']:%Y-%m-%d}/"
+                f"{first['suite']}-{first['run_id']}.parquet"
+            )
+            if "://" not in path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.conn.execute(
+                f"COPY _validation_result_rows TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+            return path
+        finally:
+            self.conn.unregister("_validation_result_rows")
+
+    def source_sql(self) -> str:
+        """FROM-clause over the whole history (``run_date`` is a partition column)"""
+        if self.is_duckdb:
+            return f"validation_result_store.{TABLE_NAME}"
+        return (
+            f"read_parquet('{self.root}/**/*.parquet', hive_partitioning=true, union_by_name=true)"
+        )
+
+    @property
+    def date_column(self) -> str:
+        """Run date expression (the ``run_date`` partition column for Parquet, so filters prune files)"""
+        return "CAST(run_time AS DATE)" if self.is_duckdb else "CAST(run_date AS DATE)"
+
+    def trend(self, days: int = 365, suite: str | None = None) -> pa.Table:
+        """
+        Daily pass rate and unexpected counts per suite and expectation
+
+        Only partitions within the window are read (``run_date`` pruning).
+        """
+        date_column = self.date_column
+        filters = [f"{date_column} >= current_date - INTERVAL {int(days)} DAY"]
+        parameters: list[Any] = []
+        if suite is not None:
+            filters.append("suite = ?")
+            parameters.append(suite)
+
+        return self.conn.execute(
+            f"""
+            SELECT
+                {date_column} AS run_date,
+                suite,
+                expectation_type,
+                "column",
+                COUNT(*) AS evaluations,
+                AVG(CASE WHEN success THEN 1.0 ELSE 0.0 END) AS pass_rate,
+                SUM(unexpected_count) AS unexpected_count,
+                AVG(duration_seconds) AS avg_duration_seconds
+            FROM {self.source_sql()}
+            WHERE {' AND '.join(filters)}
+            GROUP BY ALL
+            ORDER BY run_date, suite, expectation_type, "column"
+            """,
+            parameters,
+        ).fetch_arrow_table()
+
+
+def default_result_store_root(gx_root_directory: str) -> str:
+    """``VALIDATION_RESULT_STORE_ROOT`` or ``uncommitted/validation_results`` under the GE root"""
+    return os.getenv("VALIDATION_RESULT_STORE_ROOT") or os.path.join(
+        gx_root_directory, "uncommitted", "validation_results"
+    )
@@ -0,0 +1,43 @@
+"""
+Checkpoint Action for the Columnar Validation Result Store
+
+Appends each validation result to the Parquet / DuckDB result store of
+``validation_result_store.py`` (kept free of Great Expectations imports so
+the store and the quality rollups load without GE).
+"""
+
+from great_expectations.checkpoint.actions import ValidationAction
+
+from r2_connection import get_pool
+from validation_result_store import ValidationResultStore, default_result_store_root
+
+
+class StoreColumnarValidationResultAction(ValidationAction):
+    """
+    Checkpoint action appending each validation result to the columnar store
+
+    Configure in a checkpoint::
+
+        - name: store_columnar_validation_result
+          action:
+            class_name: StoreColumnarValidationResultAction
+            module_name: validation_result_store_action
+            root: s3://data-lake-curated/quality/validation_results  # optional
+    """
+
+    def __init__(self, data_context, root: str | None = None):
+        super().__init__(data_context)
+        self.root = root or default_result_store_root(data_context.root_directory)
+
+    def _run(
+        self,
+        validation_result_suite,
+        validation_result_suite_identifier,
+        data_asset=None,
+        expectation_suite_identifier=None,
+        checkpoint_identifier=None,
+        **kwargs,
+    ):
+        with get_pool().connection() as conn:
+            path = ValidationResultStore(conn, self.root).write(validation_result_suite.to_json_dict())
+        return {"columnar_result_store": path}
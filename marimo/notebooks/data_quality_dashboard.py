@@ -11,14 +11,19 @@ def __():
     import pandas as pd
     import plotly.express as px
     import plotly.graph_objects as go
+    from contextlib import contextmanager
     from datetime import datetime, timedelta
     import os
     import sys
 
     # Add great_expectations to path
     sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+    # Shared R2 helpers and the quality rollups live in the Great Expectations plugins directory
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../../great_expectations/plugins'))
+    from quality_rollups import QualityRollups
+    from r2_connection import get_pool
 
-    return datetime, duckdb, go, mo, os, pd, px, sys, timedelta
+    return QualityRollups, contextmanager, datetime, duckdb, get_pool, go, mo, os, pd, px, sys, timedelta
 
 
 @app.cell
@@ -30,14 +35,52 @@ def __(mo):
         Real-time data quality monitoring for Cloudflare R2 data.
 
         This dashboard integrates:
-        - Great Expectations validation results
-        - Elementary monitoring data
-        - Custom quality metrics
+        - Great Expectations validation results (columnar result store)
+        - Ingestion metrics from the Bronze manifests
+        - Schema snapshots from the Parquet footers
+
+        All panels read daily rollups only (`great_expectations/plugins/quality_rollups.py`).
         """
     )
     return
 
 
+@app.cell
+def __(QualityRollups, contextmanager, get_pool, mo):
+    # Rollups are refreshed incrementally (last rolled-up days only) when the dashboard opens
+    refresh_button = mo.ui.button(label="Refresh rollups")
+
+    @contextmanager
+    def open_rollups():
+        # Every query borrows a pooled cursor and returns it, so re-runs never hold connections
+        with get_pool().connection() as _conn:
+            yield QualityRollups(_conn)
+
+    return open_rollups, refresh_button
+
+
+@app.cell
+def __(mo, open_rollups, refresh_button):
+    # Clicking the button re-runs this cell
+    _ = refresh_button
+    try:
+        with open_rollups() as _rollups:
+            refresh_counts = _rollups.refresh()
+        refresh_error = None
+    except Exception as e:
+        refresh_counts = None
+        refresh_error = str(e)
+
+    if refresh_error:
+        mo.callout(
+            mo.md(f"⚠️ **Rollup refresh failed** (showing the last rollups): {refresh_error}"),
+            kind="warn"
+        )
+    else:
+        mo.hstack([refresh_button, mo.md(f"Rollups refreshed: {refresh_counts}")], justify="start")
+    return refresh_counts, refresh_error
+
+
 @app.cell
 def __(mo):
     mo.md("## Configuration")
@@ -45,7 +88,7 @@ def __(mo):
 
 
 @app.cell
-def __(datetime, mo, timedelta):
+def __(mo, open_rollups, refresh_counts, timedelta):
     # Time range selector
     time_ranges = {
         "Last 24 hours": timedelta(days=1),
@@ -59,9 +102,12 @@ def __(datetime, mo, timedelta):
         label="Time Range"
     )
 
-    # Dataset selector
+    # Dataset selector (datasets present in the rollups, re-read after a refresh)
+    _ = refresh_counts
+    with open_rollups() as _rollups:
+        _dataset_names = _rollups.dataset_names()
     datasets = mo.ui.dropdown(
-        options=["All Datasets", "api_posts", "api_users"],
+        options=["All Datasets", *_dataset_names],
         value="All Datasets",
         label="Dataset"
     )
@@ -70,22 +116,39 @@ def __(datetime, mo, timedelta):
     return datasets, time_range, time_ranges
 
 
+@app.cell
+def __(datasets, datetime, refresh_counts, time_range, time_ranges):
+    # Filters applied to every rollup query (re-evaluated after a refresh)
+    _ = refresh_counts
+    since = (datetime.now() - time_ranges[time_range.value]).date()
+    selected_datasets = None if datasets.value == "All Datasets" else [datasets.value]
+    return selected_datasets, since
+
+
 @app.cell
 def __(mo):
     mo.md(
         """
         ## Data Quality Overview
 
-        Key metrics across all datasets:
+        Key metrics across the selected datasets:
         """
     )
     return
 
 
 @app.cell
-def __(datasets, mo, pd):
-    # Mock data quality metrics
-    # In production, this would query Great Expectations results from R2/D1
+def __(datetime, mo, open_rollups, pd, selected_datasets, since):
+    with open_rollups() as _rollups:
+        summary = _rollups.summary(since, selected_datasets)
+
+    if summary["last_run_time"] is not None:
+        age = datetime.now(summary["last_run_time"].tzinfo) - summary["last_run_time"]
+        last_check = f"{age.total_seconds() / 3600:.0f} hours ago"
+    else:
+        age = None
+        last_check = "never"
+    success_rate = f"{summary['success_rate']:.1%}" if summary["success_rate"] is not None else "-"
 
     quality_summary = pd.DataFrame({
         'Metric': [
@@ -97,37 +160,37 @@ def __(datasets, mo, pd):
             'Last Check'
         ],
         'Value': [
-            '245',
-            '238',
-            '7',
-            '97.1%',
-            '2' if datasets.value == "All Datasets" else '1',
-            '2 hours ago'
+            f"{summary['evaluations']:,}",
+            f"{summary['passed']:,}",
+            f"{summary['failed']:,}",
+            success_rate,
+            str(summary['datasets']),
+            last_check
         ]
     })
 
     # Display as cards
     mo.hstack([
         mo.stat(
-            value="97.1%",
+            value=success_rate,
             label="Success Rate",
-            caption="238/245 validations passed",
+            caption=f"{summary['passed']:,}/{summary['evaluations']:,} validations passed",
             bordered=True
         ),
         mo.stat(
-            value="7",
+            value=f"{summary['failed']:,}",
             label="Failed Checks",
-            caption="Requires attention",
+            caption="Requires attention" if summary['failed'] else "All checks passed",
             bordered=True
         ),
         mo.stat(
-            value="2",
+            value=str(summary['datasets']),
             label="Active Datasets",
-            caption="Currently monitored",
+            caption=f"Last check {last_check}",
             bordered=True
         )
     ])
-    return (quality_summary,)
+    return age, last_check, quality_summary, success_rate, summary
 
 
 @app.cell
@@ -137,23 +200,13 @@ def __(mo):
 
 
 @app.cell
-def __(datetime, go, mo, pd, timedelta):
-    # Mock validation trend data
-    dates = pd.date_range(
-        end=datetime.now(),
-        periods=30,
-        freq='D'
-    )
+def __(go, mo, open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        trend_data = _rollups.trend(since, selected_datasets)
 
-    trend_data = pd.DataFrame({
-        'date': dates,
-        'passed': [235 + (i % 10) for i in range(30)],
-        'failed': [10 - (i % 10) for i in range(30)]
-    })
-
-    fig = go.Figure()
+    trend_fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
+    trend_fig.add_trace(go.Scatter(
         x=trend_data['date'],
         y=trend_data['passed'],
         name='Passed',
@@ -161,7 +214,7 @@ def __(datetime, go, mo, pd, timedelta):
         line=dict(color='green')
     ))
 
-    fig.add_trace(go.Scatter(
+    trend_fig.add_trace(go.Scatter(
         x=trend_data['date'],
         y=trend_data['failed'],
         name='Failed',
@@ -169,15 +222,15 @@ def __(datetime, go, mo, pd, timedelta):
         line=dict(color='red')
     ))
 
-    fig.update_layout(
+    trend_fig.update_layout(
         title='Validation Results Over Time',
         xaxis_title='Date',
         yaxis_title='Number of Validations',
         hovermode='x unified'
     )
 
-    mo.ui.plotly(fig)
-    return dates, fig, trend_data
+    mo.ui.plotly(trend_fig)
+    return trend_fig, trend_data
 
 
 @app.cell
@@ -186,41 +239,19 @@ def __(mo):
         """
         ## Failed Validations
 
-        Recent validation failures:
+        Expectations that failed in the selected range (per day):
         """
     )
     return
 
 
 @app.cell
-def __(datetime, pd):
-    # Mock failed validations
-    failed_validations = pd.DataFrame({
-        'Timestamp': [
-            datetime.now() - timedelta(hours=2),
-            datetime.now() - timedelta(hours=5),
-            datetime.now() - timedelta(hours=8),
-            datetime.now() - timedelta(days=1),
-            datetime.now() - timedelta(days=1, hours=3),
-            datetime.now() - timedelta(days=2),
-            datetime.now() - timedelta(days=2, hours=6)
-        ],
-        'Dataset': ['api_posts', 'api_users', 'api_posts', 'api_users', 'api_posts', 'api_users', 'api_posts'],
-        'Expectation': [
-            'expect_column_values_to_not_be_null',
-            'expect_column_values_to_be_unique',
-            'expect_column_value_lengths_to_be_between',
-            'expect_column_values_to_match_regex',
-            'expect_table_row_count_to_be_between',
-            'expect_column_values_to_not_be_null',
-            'expect_column_values_to_be_unique'
-        ],
-        'Column': ['body', 'email', 'title', 'phone', None, 'username', 'post_id'],
-        'Severity': ['High', 'Critical', 'Medium', 'Low', 'High', 'Critical', 'Critical']
-    })
+def __(open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        failed_validations = _rollups.failures(since, selected_datasets)
 
     # Format timestamp
-    failed_validations['Timestamp'] = failed_validations['Timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+    failed_validations['Last Failure'] = failed_validations['Last Failure'].dt.strftime('%Y-%m-%d %H:%M')
 
     failed_validations
     return (failed_validations,)
@@ -234,14 +265,19 @@ def __(mo):
 
 @app.cell
 def __(failed_validations, mo, px):
-    fig = px.pie(
-        failed_validations,
-        names='Dataset',
-        title='Failed Validations by Dataset'
-    )
+    if not failed_validations.empty:
+        failures_fig = px.pie(
+            failed_validations,
+            names='Dataset',
+            values='Failed Runs',
+            title='Failed Validations by Dataset'
+        )
 
-    mo.ui.plotly(fig)
-    return (fig,)
+        mo.ui.plotly(failures_fig)
+    else:
+        failures_fig = None
+        mo.md("✅ No failed validations in the selected range")
+    return (failures_fig,)
 
 
 @app.cell
@@ -257,29 +293,23 @@ def __(mo):
 
 
 @app.cell
-def __(go, mo, pd):
-    # Mock quality scores
-    quality_scores = pd.DataFrame({
-        'Dataset': ['api_posts', 'api_users'],
-        'Quality Score': [95, 98],
-        'Completeness': [98, 99],
-        'Validity': [92, 97],
-        'Consistency': [95, 98],
-        'Timeliness': [96, 99]
-    })
+def __(go, mo, open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        quality_scores = _rollups.scores(since, selected_datasets)
+    dimensions = ['Completeness', 'Validity', 'Consistency', 'Timeliness']
 
     # Radar chart
-    fig = go.Figure()
+    scores_fig = go.Figure()
 
     for _, row in quality_scores.iterrows():
-        fig.add_trace(go.Scatterpolar(
-            r=[row['Completeness'], row['Validity'], row['Consistency'], row['Timeliness']],
-            theta=['Completeness', 'Validity', 'Consistency', 'Timeliness'],
+        scores_fig.add_trace(go.Scatterpolar(
+            r=[row[dimension] for dimension in dimensions],
+            theta=dimensions,
             fill='toself',
             name=row['Dataset']
         ))
 
-    fig.update_layout(
+    scores_fig.update_layout(
         polar=dict(
             radialaxis=dict(
                 visible=True,
@@ -289,14 +319,14 @@ def __(go, mo, pd):
         title='Data Quality Dimensions'
     )
 
-    mo.ui.plotly(fig)
-    return fig, quality_scores
+    mo.ui.plotly(scores_fig)
+    return dimensions, scores_fig, quality_scores
 
 
 @app.cell
 def __(mo, quality_scores):
     mo.md("### Quality Scores Table")
-    quality_scores
+    quality_scores.round(1)
     return
 
 
@@ -306,32 +336,18 @@ def __(mo):
         """
         ## Schema Changes
 
-        Recent schema changes detected:
+        Schema changes detected between consecutive days:
         """
     )
     return
 
 
 @app.cell
-def __(datetime, pd, timedelta):
-    # Mock schema changes
-    schema_changes = pd.DataFrame({
-        'Timestamp': [
-            datetime.now() - timedelta(days=3),
-            datetime.now() - timedelta(days=7),
-            datetime.now() - timedelta(days=14)
-        ],
-        'Dataset': ['api_users', 'api_posts', 'api_users'],
-        'Change Type': ['Column Added', 'Type Changed', 'Column Removed'],
-        'Column': ['verified_at', 'user_id', 'legacy_id'],
-        'Details': [
-            'Added TIMESTAMP column',
-            'Changed from VARCHAR to INTEGER',
-            'Removed deprecated column'
-        ]
-    })
+def __(open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        schema_changes = _rollups.schema_changes(since, selected_datasets)
 
-    schema_changes['Timestamp'] = schema_changes['Timestamp'].dt.strftime('%Y-%m-%d')
+    schema_changes['Date'] = schema_changes['Date'].dt.strftime('%Y-%m-%d')
     schema_changes
     return (schema_changes,)
 
@@ -342,98 +358,65 @@ def __(mo):
         """
         ## Anomaly Detection
 
-        Statistical anomalies detected by Elementary:
+        Daily ingested rows outside mean ± 3σ of the selected range:
         """
     )
     return
 
 
 @app.cell
-def __(datetime, go, mo, pd, timedelta):
-    # Mock anomaly data
-    dates = pd.date_range(
-        end=datetime.now(),
-        periods=30,
-        freq='D'
-    )
-
-    # Simulated row count with anomalies
-    import numpy as np
-    np.random.seed(42)
-
-    base_count = 1000
-    normal_variation = np.random.normal(0, 50, 28)
-    row_counts = [base_count + v for v in normal_variation]
-
-    # Add two anomalies
-    row_counts = [800, 1200] + row_counts  # First two days are anomalies
-
-    anomaly_data = pd.DataFrame({
-        'date': dates,
-        'row_count': row_counts,
-        'is_anomaly': [True, True] + [False] * 28
-    })
-
-    # Calculate bounds
-    mean = anomaly_data[~anomaly_data['is_anomaly']]['row_count'].mean()
-    std = anomaly_data[~anomaly_data['is_anomaly']]['row_count'].std()
-
-    fig = go.Figure()
-
-    # Add normal data
-    normal_data = anomaly_data[~anomaly_data['is_anomaly']]
-    fig.add_trace(go.Scatter(
-        x=normal_data['date'],
-        y=normal_data['row_count'],
-        mode='lines+markers',
-        name='Normal',
-        line=dict(color='blue')
-    ))
+def __(go, mo, open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        anomaly_data = _rollups.daily_rows(since, selected_datasets)
+
+    anomaly_fig = go.Figure()
+
+    for dataset_name, dataset_rows in anomaly_data.groupby('dataset'):
+        # Add normal data
+        anomaly_fig.add_trace(go.Scatter(
+            x=dataset_rows['date'],
+            y=dataset_rows['row_count'],
+            mode='lines+markers',
+            name=dataset_name
+        ))
 
-    # Add anomalies
-    anomaly_points = anomaly_data[anomaly_data['is_anomaly']]
-    fig.add_trace(go.Scatter(
-        x=anomaly_points['date'],
-        y=anomaly_points['row_count'],
-        mode='markers',
-        name='Anomaly',
-        marker=dict(color='red', size=12, symbol='x')
-    ))
+        # Add anomalies
+        anomaly_points = dataset_rows[dataset_rows['is_anomaly']]
+        anomaly_fig.add_trace(go.Scatter(
+            x=anomaly_points['date'],
+            y=anomaly_points['row_count'],
+            mode='markers',
+            name=f'{dataset_name} anomaly',
+            marker=dict(color='red', size=12, symbol='x')
+        ))
 
-    # Add bounds
-    fig.add_hline(
-        y=mean + 3*std,
-        line_dash="dash",
-        line_color="orange",
-        annotation_text="Upper Bound"
-    )
-    fig.add_hline(
-        y=mean - 3*std,
-        line_dash="dash",
-        line_color="orange",
-        annotation_text="Lower Bound"
-    )
+        # Add bounds
+        anomaly_fig.add_trace(go.Scatter(
+            x=dataset_rows['date'],
+            y=dataset_rows['upper_bound'],
+            mode='lines',
+            name=f'{dataset_name} bounds',
+            line={'color': 'orange', 'dash': 'dash'},
+            legendgroup=f'{dataset_name} bounds'
+        ))
+        anomaly_fig.add_trace(go.Scatter(
+            x=dataset_rows['date'],
+            y=dataset_rows['lower_bound'],
+            mode='lines',
+            line={'color': 'orange', 'dash': 'dash'},
+            legendgroup=f'{dataset_name} bounds',
+            showlegend=False
+        ))
 
-    fig.update_layout(
-        title='Row Count Anomaly Detection (api_posts)',
+    anomaly_fig.update_layout(
+        title='Ingested Row Count Anomaly Detection',
         xaxis_title='Date',
         yaxis_title='Row Count',
         hovermode='x unified'
     )
 
-    mo.ui.plotly(fig)
-    return (
-        anomaly_data,
-        anomaly_points,
-        base_count,
-        fig,
-        mean,
-        normal_data,
-        normal_variation,
-        np,
-        row_counts,
-        std,
-    )
+    mo.ui.plotly(anomaly_fig)
+    return anomaly_data, anomaly_fig
 
 
 @app.cell
@@ -449,13 +432,12 @@ def __(mo):
 
 
 @app.cell
-def __(mo):
-    recommendations = [
-        ("🔴 Critical", "api_users.email", "7 duplicate emails detected", "Add unique constraint or investigate data source"),
-        ("🟡 Warning", "api_posts.body", "2 NULL values found", "Update data pipeline to ensure completeness"),
-        ("🟢 Info", "api_users", "Schema change detected 3 days ago", "Update documentation and downstream consumers"),
-        ("🟡 Warning", "api_posts", "Row count 20% below expected", "Check data pipeline for issues")
-    ]
+def __(mo, open_rollups, selected_datasets, since):
+    with open_rollups() as _rollups:
+        recommendations = _rollups.recommendations(since, selected_datasets)
+
+    if not recommendations:
+        mo.md("✅ No open quality issues in the selected range")
 
     for severity, location, issue, recommendation in recommendations:
         mo.callout(
@@ -526,9 +508,9 @@ def __(mo):
         This marimo notebook provides real-time data quality monitoring.
 
         **Data Sources:**
-        - Great Expectations validation results
-        - Elementary anomaly detection
-        - Custom quality metrics
+        - Great Expectations validation results (daily rollup per dataset and expectation)
+        - Ingestion metrics from the Bronze manifests (daily rollup per dataset)
+        - Parquet schema snapshots (daily per dataset)
 
         **Features:**
         - 📊 Interactive quality metrics
@@ -11,7 +11,40 @@ def __():
     import pandas as pd
     import plotly.express as px
     import os
-    return duckdb, mo, os, pd, px
+    import sys
+
+    # Shared R2 helpers live in the Great Expectations plugins directory
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../../great_expectations/plugins'))
+    from r2_connection import get_pool
+    from r2_charts import MAX_POINTS, downsample_series, histogram_bins, top_values
+    from r2_dataset import is_numeric_type, is_temporal_type
+    from r2_profile import profile_dataset
+    from r2_query_cache import get_query_cache
+    from r2_query_runner import DEFAULT_PAGE_SIZE, DEFAULT_ROW_CAP, QueryRunner
+
+    # Results survive marimo re-runs until the query or the files change
+    query_cache = get_query_cache()
+
+    return (
+        DEFAULT_PAGE_SIZE,
+        DEFAULT_ROW_CAP,
+        MAX_POINTS,
+        QueryRunner,
+        downsample_series,
+        duckdb,
+        get_pool,
+        histogram_bins,
+        is_numeric_type,
+        is_temporal_type,
+        mo,
+        os,
+        pd,
+        profile_dataset,
+        px,
+        query_cache,
+        sys,
+        top_values,
+    )
 
 
 @app.cell
@@ -29,7 +62,7 @@ def __(mo):
 
 
 @app.cell
-def __(mo):
+def __(mo, os):
     # Interactive configuration
     r2_bucket = mo.ui.text(
         label="R2 Bucket Name",
@@ -46,30 +79,11 @@ def __(mo):
 
 
 @app.cell
-def __(duckdb, os):
-    # Setup DuckDB connection with R2
+def __(get_pool):
+    # Setup DuckDB connection with R2 (shared, pre-warmed pool)
     def setup_duckdb_r2():
-        conn = duckdb.connect(":memory:")
-
-        # Install extensions
-        conn.execute("INSTALL httpfs;")
-        conn.execute("LOAD httpfs;")
-        conn.execute("INSTALL parquet;")
-        conn.execute("LOAD parquet;")
-
-        # Configure R2 credentials
-        r2_endpoint = os.getenv("R2_ENDPOINT")
-        r2_access_key = os.getenv("R2_ACCESS_KEY_ID")
-        r2_secret_key = os.getenv("R2_SECRET_ACCESS_KEY")
-
-        if all([r2_endpoint, r2_access_key, r2_secret_key]):
-            conn.execute(f"SET s3_endpoint='{r2_endpoint}';")
-            conn.execute(f"SET s3_access_key_id='{r2_access_key}';")
-            conn.execute(f"SET s3_secret_access_key='{r2_secret_key}';")
-            conn.execute("SET s3_region='auto';")
-            return conn, True
-        else:
-            return conn, False
+        pool = get_pool()
+        return pool.acquire(), pool.configured
 
     conn, r2_configured = setup_duckdb_r2()
     return conn, r2_configured, setup_duckdb_r2
@@ -93,37 +107,42 @@ def __(mo):
         """
         ## Data Loading
 
-        Load data from R2 using DuckDB:
+        The dataset is opened lazily: only the file list, the Parquet footers
+        (schema) and the row count metadata are read here. Each cell below
+        pushes its own projection, filter and limit into DuckDB.
         """
     )
     return
 
 
 @app.cell
-def __(conn, data_path, r2_bucket):
-    # Load data from R2
+def __(conn, data_path, query_cache, r2_bucket):
+    # Open the dataset lazily (no row data is downloaded; the handle is reused until new files land)
     s3_path = f"s3://{r2_bucket.value}/{data_path.value}"
 
     try:
-        query = f"SELECT * FROM read_parquet('{s3_path}')"
-        df = conn.execute(query).fetchdf()
+        dataset = query_cache.dataset(conn, r2_bucket.value, data_path.value)
+        schema = dataset.schema()
+        row_count = dataset.row_count()
         load_status = "success"
         error_msg = None
     except Exception as e:
-        df = None
+        dataset = None
+        schema = []
+        row_count = None
         load_status = "error"
         error_msg = str(e)
 
-    return df, error_msg, load_status, query, s3_path
+    return dataset, error_msg, load_status, row_count, s3_path, schema
 
 
 @app.cell
-def __(df, error_msg, load_status, mo, s3_path):
+def __(dataset, error_msg, load_status, mo, row_count, s3_path, schema):
     if load_status == "success":
         mo.md(f"""
-        ✅ **Data loaded successfully** from `{s3_path}`
+        ✅ **Dataset opened** from `{s3_path}`
 
-        **Rows**: {len(df):,} | **Columns**: {len(df.columns)}
+        **Rows**: {row_count:,} (metadata) | **Columns**: {len(schema)} | **Files**: {len(dataset.files()):,}
         """)
     else:
         mo.callout(
@@ -134,8 +153,8 @@ def __(df, error_msg, load_status, mo, s3_path):
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
+def __(dataset, mo):
+    if dataset is not None:
         mo.md(
             """
             ## Data Overview
@@ -147,52 +166,55 @@ def __(df, mo):
 
 
 @app.cell
-def __(df):
-    if df is not None:
-        # Display first 10 rows
-        df.head(10)
+def __(conn, dataset, query_cache):
+    if dataset is not None:
+        # First 10 rows (LIMIT is pushed into the Parquet scan; cached)
+        query_cache.run(conn, "SELECT * FROM df LIMIT 10", dataset, view="df").to_pandas()
     return
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
-        mo.md("### Data Types")
+def __(dataset, profile_dataset):
+    # Profile every column in one aggregate scan (cached per dataset and file list)
+    profile = profile_dataset(dataset) if dataset is not None else None
+    null_counts = profile.null_counts if profile is not None else {}
+    return null_counts, profile
+
+
+@app.cell
+def __(mo, profile):
+    if profile is not None:
+        mo.md(f"### Data Types\n\nProfiled in one scan ({profile.elapsed_seconds:.2f}s)")
     return
 
 
 @app.cell
-def __(df, pd):
-    if df is not None:
+def __(profile):
+    if profile is not None:
         # Data types summary
-        dtypes_df = pd.DataFrame({
-            'Column': df.columns,
-            'Type': df.dtypes.values,
-            'Non-Null Count': df.count().values,
-            'Null Count': df.isnull().sum().values
-        })
+        dtypes_df = profile.columns[['Column', 'Type', 'Non-Null Count', 'Null Count', 'Distinct (approx.)']]
         dtypes_df
     return (dtypes_df,)
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
+def __(dataset, mo):
+    if dataset is not None:
         mo.md("### Summary Statistics")
     return
 
 
 @app.cell
-def __(df):
-    if df is not None:
-        # Summary statistics
-        df.describe()
+def __(profile):
+    if profile is not None:
+        # Summary statistics from the same profiling scan
+        profile.columns[['Column', 'Type', 'Min', 'Max', 'Mean', 'Std', '25%', '50%', '75%']]
     return
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
+def __(dataset, mo):
+    if dataset is not None:
         mo.md(
             """
             ## Data Quality Checks
@@ -204,38 +226,24 @@ def __(df, mo):
 
 
 @app.cell
-def __(df, pd):
-    if df is not None:
-        # Data quality metrics
-        quality_metrics = pd.DataFrame({
-            'Metric': [
-                'Total Rows',
-                'Total Columns',
-                'Duplicate Rows',
-                'Total Missing Values',
-                'Columns with Missing Values'
-            ],
-            'Value': [
-                len(df),
-                len(df.columns),
-                df.duplicated().sum(),
-                df.isnull().sum().sum(),
-                (df.isnull().sum() > 0).sum()
-            ]
-        })
+def __(profile):
+    if profile is not None:
+        # Data quality metrics (duplicates counted by row hash in the profiling scan)
+        quality_metrics = profile.quality_metrics()
         quality_metrics
     return (quality_metrics,)
 
 
 @app.cell
-def __(df, mo, px):
-    if df is not None and df.isnull().sum().sum() > 0:
+def __(mo, null_counts, pd, px):
+    if sum(null_counts.values()) > 0:
         mo.md("### Missing Values by Column")
 
         # Missing values visualization
-        missing_df = df.isnull().sum().reset_index()
-        missing_df.columns = ['Column', 'Missing Count']
-        missing_df = missing_df[missing_df['Missing Count'] > 0]
+        missing_df = pd.DataFrame(
+            [(name, count) for name, count in null_counts.items() if count > 0],
+            columns=['Column', 'Missing Count']
+        )
 
         fig = px.bar(
             missing_df,
@@ -248,8 +256,8 @@ def __(df, mo, px):
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
+def __(dataset, mo):
+    if dataset is not None:
         mo.md(
             """
             ## Interactive Exploration
@@ -261,11 +269,11 @@ def __(df, mo):
 
 
 @app.cell
-def __(df, mo):
-    if df is not None:
+def __(dataset, mo, schema):
+    if dataset is not None:
         column_selector = mo.ui.dropdown(
-            options=list(df.columns),
-            value=df.columns[0] if len(df.columns) > 0 else None,
+            options=[name for name, _ in schema],
+            value=schema[0][0] if len(schema) > 0 else None,
             label="Select Column"
         )
         column_selector
@@ -273,23 +281,20 @@ def __(df, mo):
 
 
 @app.cell
-def __(column_selector, df, mo, pd, px):
-    if df is not None and column_selector.value:
+def __(column_selector, mo, pd, profile):
+    if profile is not None and column_selector.value:
         selected_col = column_selector.value
 
         mo.md(f"### Analysis of `{selected_col}`")
 
-        # Column statistics
-        col_data = df[selected_col]
+        # Column statistics from the cached profile (no extra scan)
+        col_stats = profile.column(selected_col)
+        col_type = col_stats['Type']
+        col_unique = col_stats['Distinct (approx.)']
 
         stats = pd.DataFrame({
-            'Statistic': ['Count', 'Unique Values', 'Missing', 'Data Type'],
-            'Value': [
-                col_data.count(),
-                col_data.nunique(),
-                col_data.isnull().sum(),
-                str(col_data.dtype)
-            ]
+            'Statistic': ['Count', 'Unique Values (approx.)', 'Missing', 'Data Type'],
+            'Value': [col_stats['Non-Null Count'], col_unique, col_stats['Null Count'], col_type]
         })
 
         mo.vstack([
@@ -297,34 +302,79 @@ def __(column_selector, df, mo, pd, px):
             stats,
             mo.md("**Value Distribution:**")
         ])
-    return col_data, selected_col, stats
+    return col_stats, col_type, col_unique, selected_col, stats
 
 
 @app.cell
-def __(col_data, df, mo, px, selected_col):
-    if df is not None and selected_col:
-        # Visualization based on data type
-        if pd.api.types.is_numeric_dtype(col_data):
-            # Histogram for numeric columns
-            fig = px.histogram(
-                df,
-                x=selected_col,
+def __(
+    col_stats,
+    col_type,
+    dataset,
+    histogram_bins,
+    is_numeric_type,
+    is_temporal_type,
+    mo,
+    px,
+    selected_col,
+    top_values,
+):
+    if dataset is not None and selected_col:
+        # Visualization based on data type (aggregated in DuckDB, only bins/top-K are returned)
+        if is_numeric_type(col_type):
+            bounds = None
+            if col_stats['Min'] is not None and col_stats['Max'] is not None:
+                bounds = (float(col_stats['Min']), float(col_stats['Max']))
+            chart_data = histogram_bins(dataset, selected_col, bins=50, bounds=bounds)
+            fig = px.bar(
+                chart_data,
+                x='bin_start',
+                y='count',
                 title=f'Distribution of {selected_col}'
             )
-            mo.ui.plotly(fig)
-        elif col_data.nunique() < 50:
-            # Bar chart for categorical with few unique values
-            value_counts = col_data.value_counts().reset_index()
-            value_counts.columns = [selected_col, 'Count']
-
+            fig.update_traces(offset=0, width=(chart_data['bin_end'] - chart_data['bin_start']).tolist())
+        elif is_temporal_type(col_type):
+            chart_data = histogram_bins(dataset, selected_col, bins=100)
+            fig = px.bar(
+                chart_data,
+                x='bin_start',
+                y='count',
+                title=f'Rows over {selected_col}'
+            )
+        else:
+            chart_data = top_values(dataset, selected_col, k=20)
             fig = px.bar(
-                value_counts.head(20),
-                x=selected_col,
-                y='Count',
+                chart_data,
+                x='value',
+                y='count',
                 title=f'Top 20 Values of {selected_col}'
             )
-            mo.ui.plotly(fig)
-    return fig, value_counts
+        mo.vstack([mo.ui.plotly(fig), mo.md(f"*{len(chart_data):,} points sent to the chart*")])
+    return bounds, chart_data, fig
+
+
+@app.cell
+def __(dataset, is_numeric_type, is_temporal_type, mo, schema, selected_col):
+    # Time series of the selected numeric column (downsampled in DuckDB)
+    temporal_columns = [name for name, column_type in schema if is_temporal_type(column_type)]
+    if dataset is not None and selected_col and temporal_columns and is_numeric_type(dict(schema)[selected_col]):
+        time_axis = mo.ui.dropdown(options=temporal_columns, value=temporal_columns[0], label="Time axis")
+        downsampling = mo.ui.dropdown(options=["lttb", "minmax"], value="lttb", label="Downsampling")
+        mo.hstack([time_axis, downsampling])
+    else:
+        time_axis = None
+        downsampling = None
+    return downsampling, temporal_columns, time_axis
+
+
+@app.cell
+def __(MAX_POINTS, dataset, downsample_series, downsampling, mo, px, selected_col, time_axis):
+    if dataset is not None and time_axis is not None and time_axis.value:
+        series = downsample_series(
+            dataset, time_axis.value, selected_col, points=MAX_POINTS, method=downsampling.value
+        )
+        series_fig = px.line(series, x=time_axis.value, y=selected_col, title=f'{selected_col} over {time_axis.value}')
+        mo.vstack([mo.ui.plotly(series_fig), mo.md(f"*{len(series):,} points ({downsampling.value})*")])
+    return series, series_fig
 
 
 @app.cell
@@ -333,14 +383,14 @@ def __(mo):
         """
         ## SQL Query Interface
 
-        Run custom SQL queries on the loaded data:
+        Run custom SQL queries on the dataset (available as the view `df`):
         """
     )
     return
 
 
 @app.cell
-def __(mo):
+def __(DEFAULT_ROW_CAP, mo):
     sql_query = mo.ui.text_area(
         label="SQL Query",
         value="SELECT * FROM df LIMIT 10",
@@ -348,30 +398,84 @@ def __(mo):
     )
 
     run_button = mo.ui.button(label="Run Query")
+    timeout_seconds = mo.ui.number(start=5, stop=3600, step=5, value=120, label="Timeout (s)")
 
-    mo.vstack([sql_query, run_button])
-    return run_button, sql_query
+    mo.vstack([
+        sql_query,
+        mo.hstack([run_button, timeout_seconds], justify="start"),
+        mo.md(f"*Queries run in the background; results are capped at {DEFAULT_ROW_CAP:,} rows.*")
+    ])
+    return run_button, sql_query, timeout_seconds
 
 
 @app.cell
-def __(conn, df, mo, run_button, sql_query):
-    if df is not None and run_button.value:
-        try:
-            # Register dataframe as table
-            conn.register('df', df)
-            result = conn.execute(sql_query.value).fetchdf()
+def __(QueryRunner, conn, dataset, query_cache, timeout_seconds):
+    # Background runner: own cursor per query, dataset as the view `df` over R2, results via the cache
+    runner = (
+        QueryRunner(conn, dataset, cache=query_cache, timeout=timeout_seconds.value)
+        if dataset is not None
+        else None
+    )
+    return (runner,)
+
 
+@app.cell
+def __(DEFAULT_PAGE_SIZE, DEFAULT_ROW_CAP, mo, run_button, runner, sql_query):
+    if runner is not None and run_button.value:
+        job = runner.submit(sql_query.value)
+        cancel_button = mo.ui.button(label="Cancel", on_click=lambda _: job.cancel())
+        page_number = mo.ui.number(
+            start=1, stop=-(-DEFAULT_ROW_CAP // DEFAULT_PAGE_SIZE), value=1, label="Page"
+        )
+        query_refresh = mo.ui.refresh(options=["1s"], default_interval="1s")
+        mo.hstack([cancel_button, page_number, query_refresh], justify="start")
+    else:
+        job = None
+        cancel_button = None
+        page_number = None
+        query_refresh = None
+    return cancel_button, job, page_number, query_refresh
+
+
+@app.cell
+def __(job, mo, page_number, query_refresh):
+    # Re-rendered by the refresh ticker; never blocks on the query
+    query_refresh
+    progress = None
+    result = None
+    if job is not None:
+        if not job.done:
+            progress = job.progress()
+            mo.md(
+                f"⏳ **Running** ({job.elapsed_seconds:.1f}s"
+                + (f", {progress:.0f}%" if progress is not None else "")
+                + ")"
+            )
+        elif job.status == "succeeded":
+            result = job.page(page_number.value - 1)
             mo.vstack([
-                mo.md(f"✅ **Query executed successfully**"),
-                mo.md(f"**Rows returned**: {len(result):,}"),
+                mo.md(
+                    f"✅ **Query executed successfully** in {job.elapsed_seconds:.2f}s"
+                    + (" (cached)" if job.cached else "")
+                ),
+                mo.md(
+                    f"**Rows returned**: {job.row_count:,}"
+                    + (" (truncated at the row cap)" if job.truncated else "")
+                    + f" | page {min(page_number.value, job.page_count)} of {job.page_count}"
+                ),
                 result
             ])
-        except Exception as e:
+        elif job.status in ("cancelled", "timed_out"):
+            mo.callout(
+                mo.md(f"🛑 **Query {job.status.replace('_', ' ')}** after {job.elapsed_seconds:.1f}s"),
+                kind="warn"
+            )
+        else:
             mo.callout(
-                mo.md(f"❌ **Query error**: {str(e)}"),
+                mo.md(f"❌ **Query error**: {job.error}"),
                 kind="danger"
             )
-    return (result,)
+    return progress, result
 
 
 @app.cell
@@ -386,9 +490,10 @@ def __(mo):
 
         **Features:**
         - 🔗 Direct R2 connection via DuckDB
+        - 💤 Lazy loading: schema and row counts from metadata, every cell pushes its own query down
         - 📊 Interactive visualizations with Plotly
         - 🔍 Data quality checks
-        - 💾 SQL query interface
+        - 💾 SQL query interface (background execution, cancel, timeout, paging)
         - ⚡ Reactive updates
 
         **Tech Stack:**
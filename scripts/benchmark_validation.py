@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Validation Benchmark for Cloudflare Data Platform
+
+Generates seeded, Bronze-shaped synthetic data (posts and users, as written
+by the dlt pipeline) with configurable null, duplicate and invalid-value
+rates, then measures how the expectation suites scale:
+
+- the whole suite with the single-pass DuckDB engine
+- every expectation in isolation (wall time, bytes read, peak memory),
+  each in a fresh process so peak memory is attributable
+- optionally the Great Expectations validator on the same data (--with-gx)
+
+Per-expectation numbers are the single-pass engine's metric queries for that
+expectation, not GE's own metric SQL. The GE timing validates a runtime
+query batch through ``r2_bronze``; it does not run the checkpoint (partition
+connector, actions, Data Docs).
+
+Data is written to a local directory or to a local S3 stand-in such as
+MinIO (``--output s3://bucket/prefix`` with ``R2_ENDPOINT`` pointing at it
+and ``R2_USE_SSL=false``).
+
+Usage:
+    python scripts/benchmark_validation.py --sizes 1000000 10000000 100000000
+    python scripts/benchmark_validation.py --sizes 1000000 --null-rate 0.01 --with-gx
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import resource
+import sys
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from validation_engine import (
+    DATASETS,
+    compile_suite,
+    compute_metrics,
+    dataset_source_sql,
+    load_suite,
+    validate_suite,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "great_expectations" / "plugins"))
+
+from r2_connection import R2ConnectionFactory  # noqa: E402
+
+ROWS_PER_FILE = 1_000_000
+EXPECTATION_TIMEOUT_SECONDS = 3600.0
+PARTITION_DAYS = 30
+START_DATE = date(2024, 1, 1)
+DEFAULT_OUTPUT = Path(__file__).parent.parent / "great_expectations" / "uncommitted" / "benchmarks"
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def _text_pool(rng: np.random.Generator, size: int, min_words: int, max_words: int) -> pa.Array:
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "data", "quality", "cloudflare", "edge", "lake"]
+    return pa.array([
+        " ".join(rng.choice(words, rng.integers(min_words, max_words + 1)))
+        for _ in range(size)
+    ])
+
+
+def _sample_pool(rng: np.random.Generator, pool: pa.Array, n: int) -> pa.Array:
+    return pool.take(pa.array(rng.integers(0, len(pool), n)))
+
+
+def _apply_rates(
+    rng: np.random.Generator,
+    values: pa.Array,
+    null_rate: float,
+    invalid_rate: float = 0.0,
+    invalid_value: Any = None,
+) -> pa.Array:
+    n = len(values)
+    if invalid_rate:
+        values = pc.if_else(pa.array(rng.random(n) < invalid_rate), pa.scalar(invalid_value, values.type), values)
+    if null_rate:
+        values = pc.if_else(pa.array(rng.random(n) < null_rate), pa.scalar(None, values.type), values)
+    return values
+
+
+def _ids(rng: np.random.Generator, offset: int, n: int, duplicate_rate: float) -> np.ndarray:
+    ids = np.arange(offset + 1, offset + n + 1, dtype=np.int64)
+    if duplicate_rate:
+        duplicates = rng.random(n) < duplicate_rate
+        ids[duplicates] = rng.integers(1, offset + n + 1, int(duplicates.sum()))
+    return ids
+
+
+def generate_posts(rng: np.random.Generator, offset: int, n: int, rates: dict[str, float], load_id: str) -> pa.Table:
+    title_pool = _text_pool(rng, 1000, 3, 12)
+    body_pool = _text_pool(rng, 1000, 20, 80)
+    return pa.table({
+        "id": pa.array(_ids(rng, offset, n, rates["duplicate"])),
+        "userId": pa.array(rng.integers(1, max(1, (offset + n) // 10) + 1, n)),
+        # Invalid: empty strings violate the length expectations
+        "title": _apply_rates(rng, _sample_pool(rng, title_pool, n), rates["null"], rates["invalid"], ""),
+        "body": _apply_rates(rng, _sample_pool(rng, body_pool, n), rates["null"], rates["invalid"], ""),
+        "_dlt_load_id": pa.array([load_id] * n),
+        "_dlt_id": pc.cast(pa.array(np.arange(offset, offset + n)), pa.string()),
+    })
+
+
+def generate_users(rng: np.random.Generator, offset: int, n: int, rates: dict[str, float], load_id: str) -> pa.Table:
+    ids = _ids(rng, offset, n, rates["duplicate"])
+    id_strings = pc.cast(pa.array(ids), pa.string())
+    usernames = pc.binary_join_element_wise("user_", id_strings, "")
+    emails = pc.binary_join_element_wise(usernames, "@example.com", "")
+    city_pool = pa.array(["Tokyo", "Osaka", "Kyoto", "Sapporo", "Fukuoka"])
+    return pa.table({
+        "id": pa.array(ids),
+        "name": pc.binary_join_element_wise("User ", id_strings, ""),
+        "username": _apply_rates(rng, usernames, rates["null"]),
+        # Invalid: malformed addresses violate the regex expectation
+        "email": _apply_rates(rng, emails, rates["null"], rates["invalid"], "not-an-email"),
+        "phone": pa.array(["03-0000-0000"] * n),
+        "website": pc.binary_join_element_wise(usernames, ".example.com", ""),
+        "address": pa.StructArray.from_arrays(
+            [_sample_pool(rng, city_pool, n), pa.array(["100-0001"] * n)], names=["city", "zipcode"]
+        ),
+        "company": pa.StructArray.from_arrays(
+            [pc.binary_join_element_wise("Company ", id_strings, "")], names=["name"]
+        ),
+        "_dlt_load_id": pa.array([load_id] * n),
+        "_dlt_id": pc.cast(pa.array(np.arange(offset, offset + n)), pa.string()),
+    })
+
+
+GENERATORS = {"api_posts": generate_posts, "api_users": generate_users}
+
+
+def _filesystem(output: str):
+    if output.startswith("s3://"):
+        factory = R2ConnectionFactory()
+        endpoint = factory.endpoint or ""
+        return pafs.S3FileSystem(
+            access_key=factory.access_key_id,
+            secret_key=factory.secret_access_key,
+            endpoint_override=endpoint.split("://", 1)[-1] or None,
+            scheme="https" if factory.use_ssl else "http",
+            region="auto",
+        ), output[len("s3://"):]
+    return pafs.LocalFileSystem(), str(Path(output).resolve())
+
+
+def generate_dataset(
+    dataset: str,
+    rows: int,
+    output: str,
+    seed: int,
+    rates: dict[str, float],
+    rows_per_file: int = ROWS_PER_FILE,
+) -> list[str]:
+    """
+    Write a Bronze-shaped dataset with hive year=/month=/day= partitions
+
+    Files are written in chunks of ``rows_per_file`` rows, so generation
+    memory does not grow with ``rows``. Existing data for the same size and
+    seed is reused.
+
+    Returns:
+        URIs/paths of the written Parquet files
+    """
+    filesystem, root = _filesystem(output)
+    base = f"{root}/rows={rows}/seed={seed}/{DATASETS[dataset]['prefix']}"
+    uri_prefix = "s3://" if output.startswith("s3://") else ""
+
+    existing = [
+        info.path for info in filesystem.get_file_info(pafs.FileSelector(base, recursive=True, allow_not_found=True))
+        if info.path.endswith(".parquet")
+    ]
+    if existing:
+        return sorted(uri_prefix + path for path in existing)
+
+    rng = np.random.default_rng(seed)
+    paths = []
+    for index, offset in enumerate(range(0, rows, rows_per_file)):
+        day = START_DATE + timedelta(days=index % PARTITION_DAYS)
+        load_id = f"{datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp():.6f}"
+        table = GENERATORS[dataset](rng, offset, min(rows_per_file, rows - offset), rates, load_id)
+
+        directory = f"{base}/year={day.year}/month={day.month:02d}/day={day.day:02d}"
+        filesystem.create_dir(directory, recursive=True)
+        path = f"{directory}/{load_id}.{index:05d}.parquet"
+        pq.write_table(table, path, filesystem=filesystem, compression="zstd")
+        paths.append(uri_prefix + path)
+
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _read_bytes() -> int | None:
+    """Bytes read by this process (Linux /proc/self/io), including page-cache hits"""
+    try:
+        with open("/proc/self/io") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("rchar:"))
+    except (OSError, StopIteration):
+        return None
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _profile_metrics(conn, metrics: dict[str, Any], source_sql: str, profile_path: str) -> dict[str, Any]:
+    conn.execute("PRAGMA enable_profiling = 'json'")
+    conn.execute(f"SET profiling_output = '{profile_path}'")
+    read_before = _read_bytes()
+    started = time.perf_counter()
+    compute_metrics(conn, metrics, source_sql)
+    wall = time.perf_counter() - started
+    read_after = _read_bytes()
+    conn.execute("PRAGMA disable_profiling")
+
+    profile = json.loads(Path(profile_path).read_text()) if Path(profile_path).exists() else {}
+    return {
+        "wall_seconds": wall,
+        # httpfs/S3 reads are reported by DuckDB; local reads are measured from /proc
+        "bytes_read": profile.get("total_bytes_read")
+        or (read_after - read_before if read_before is not None and read_after is not None else None),
+        "rows_scanned": profile.get("cumulative_rows_scanned"),
+    }
+
+
+def _expectation_worker(
+    dataset: str, paths: list[str], position: int, profile_path: str, results
+) -> None:
+    suite = load_suite(DATASETS[dataset]["suite"])
+    expectation = suite["expectations"][position]
+    metrics = compile_suite({"expectations": [expectation]})
+    conn = R2ConnectionFactory(allow_extension_install=True).connect()
+
+    measurement = {"wall_seconds": 0.0, "bytes_read": 0, "rows_scanned": 0}
+    if metrics:
+        measurement = _profile_metrics(conn, metrics, dataset_source_sql(dataset, paths=paths), profile_path)
+    measurement["peak_memory_bytes"] = _peak_rss_bytes()
+    conn.close()
+    results.put(measurement)
+
+
+def _wait_for_measurement(process, results, timeout: float) -> dict[str, Any]:
+    """Result of a worker; fails instead of blocking when it dies or hangs"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if process.exitcode is not None:
+            # A worker that exited after its put still has the result in the pipe
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                raise RuntimeError(
+                    f"Expectation worker exited with code {process.exitcode} without a measurement"
+                ) from None
+        if time.monotonic() > deadline:
+            process.terminate()
+            process.join()
+            raise TimeoutError(f"Expectation worker did not finish within {timeout:.0f}s")
+
+
+def profile_expectations(
+    dataset: str,
+    paths: list[str],
+    work_dir: Path,
+    timeout: float = EXPECTATION_TIMEOUT_SECONDS,
+) -> list[dict[str, Any]]:
+    """
+    Run each expectation alone in a fresh process and measure it
+
+    Raises:
+        RuntimeError: A worker crashed (its exit code is in the message)
+        TimeoutError: A worker ran longer than ``timeout`` seconds
+    """
+    suite = load_suite(DATASETS[dataset]["suite"])
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    for position, expectation in enumerate(suite["expectations"]):
+        measurements = context.Queue()
+        profile_path = str(work_dir / f"profile-{dataset}-{position}.json")
+        process = context.Process(
+            target=_expectation_worker, args=(dataset, paths, position, profile_path, measurements)
+        )
+        process.start()
+        measurement = _wait_for_measurement(process, measurements, timeout)
+        process.join()
+        results.append({
+            "position": position,
+            "expectation_type": expectation["expectation_type"],
+            "column": expectation["kwargs"].get("column"),
+            **measurement,
+        })
+
+    return results
+
+
+def benchmark_suite(dataset: str, paths: list[str]) -> dict[str, Any]:
+    """Whole suite with the single-pass engine"""
+    conn = R2ConnectionFactory(allow_extension_install=True).connect()
+    read_before = _read_bytes()
+    started = time.perf_counter()
+    result = validate_suite(conn, load_suite(DATASETS[dataset]["suite"]), dataset_source_sql(dataset, paths=paths))
+    wall = time.perf_counter() - started
+    read_after = _read_bytes()
+    conn.close()
+
+    return {
+        "wall_seconds": wall,
+        "bytes_read": read_after - read_before if read_before is not None and read_after is not None else None,
+        "success": result["success"],
+        "successful_expectations": result["statistics"]["successful_expectations"],
+    }
+
+
+def benchmark_gx(dataset: str, paths: list[str]) -> dict[str, Any]:
+    """Whole suite with the Great Expectations validator (SqlAlchemy + DuckDB)"""
+    import great_expectations as gx
+    from great_expectations.core.batch import RuntimeBatchRequest
+
+    context = gx.get_context(context_root_dir=str(Path(__file__).parent.parent / "great_expectations"))
+    batch_request = RuntimeBatchRequest(
+        datasource_name="r2_bronze",
+        data_connector_name="default_runtime_data_connector",
+        data_asset_name=dataset,
+        runtime_parameters={"query": f"SELECT * FROM {dataset_source_sql(dataset, paths=paths)}"},
+        batch_identifiers={"batch_id": f"benchmark-{dataset}"},
+    )
+    started = time.perf_counter()
+    validator = context.get_validator(
+        batch_request=batch_request, expectation_suite_name=DATASETS[dataset]["suite"]
+    )
+    result = validator.validate()
+
+    return {"wall_seconds": time.perf_counter() - started, "success": result.success}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the expectation suites on synthetic data")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000],
+        help="Post row counts (users are generated at 1/10 of each size)"
+    )
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT / "data"), help="Local directory or s3:// URI")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--null-rate", type=float, default=0.001)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0005)
+    parser.add_argument("--invalid-rate", type=float, default=0.001)
+    parser.add_argument("--with-gx", action="store_true", help="Also time the Great Expectations validator")
+    parser.add_argument("--skip-per-expectation", action="store_true", help="Only time whole suites")
+    parser.add_argument(
+        "--expectation-timeout", type=float, default=EXPECTATION_TIMEOUT_SECONDS,
+        help="Seconds before a per-expectation worker is killed"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    rates = {"null": args.null_rate, "duplicate": args.duplicate_rate, "invalid": args.invalid_rate}
+    results_dir = DEFAULT_OUTPUT / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    report: dict[str, Any] = {
+        "started_at": datetime.now(UTC).isoformat(),
+        "seed": args.seed,
+        "rates": rates,
+        "runs": [],
+    }
+
+    for size in args.sizes:
+        for dataset in args.datasets:
+            rows = size if dataset == "api_posts" else max(1, size // 10)
+            print(f"🧪 {dataset} @ {rows:,} rows")
+
+            started = time.perf_counter()
+            paths = generate_dataset(dataset, rows, args.output, args.seed, rates)
+            print(f"   data: {len(paths)} file(s) ready in {time.perf_counter() - started:.1f}s")
+
+            run: dict[str, Any] = {"dataset": dataset, "rows": rows, "files": len(paths)}
+            run["single_pass"] = benchmark_suite(dataset, paths)
+            print(f"   single-pass suite: {run['single_pass']['wall_seconds']:.2f}s")
+
+            if args.with_gx:
+                run["great_expectations"] = benchmark_gx(dataset, paths)
+                print(f"   great_expectations suite: {run['great_expectations']['wall_seconds']:.2f}s")
+
+            if not args.skip_per_expectation:
+                run["expectations"] = profile_expectations(
+                    dataset, paths, results_dir, timeout=args.expectation_timeout
+                )
+                hottest = sorted(run["expectations"], key=lambda e: e["wall_seconds"], reverse=True)[:3]
+                for expectation in hottest:
+                    print(
+                        f"   🔥 {expectation['expectation_type']}({expectation['column'] or ''}): "
+                        f"{expectation['wall_seconds']:.2f}s, "
+                        f"{(expectation['peak_memory_bytes'] or 0) / 2**20:.0f} MiB peak"
+                    )
+
+            report["runs"].append(run)
+
+    report_path = results_dir / f"benchmark-{datetime.now(UTC):%Y%m%dT%H%M%S}.json"
+    report_path.write_text(json.dumps(report, indent=2, default=str))
+    print(f"📄 Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
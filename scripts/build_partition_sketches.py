@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Partition Sketch Builder for Cloudflare Data Platform
+
+Computes statistical sketches (HyperLogLog, t-digest, min/max, null counts)
+for every newly landed partition and stores them as Parquet sidecars.
+
+Usage:
+    python scripts/build_partition_sketches.py --dataset api_posts \
+        --source-prefix sources/api_jsonplaceholder/posts
+    python scripts/build_partition_sketches.py --dataset api_posts \
+        --iceberg-table analytics.api_jsonplaceholder.posts
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "great_expectations" / "plugins"))
+
+from partition_sketches import SketchStore  # noqa: E402
+from r2_connection import get_r2_connection  # noqa: E402
+
+HIVE_PARTITION_PATTERN = re.compile(r"(year=\d+/month=\d+/day=\d+)/")
+
+
+def discover_bronze_partitions(conn, bucket: str, prefix: str) -> dict[str, list[str]]:
+    """List Bronze Parquet files grouped by year=/month=/day= partition"""
+    files = conn.execute(
+        "SELECT file FROM glob(?)", [f"s3://{bucket}/{prefix.strip('/')}/**/*.parquet"]
+    ).fetchall()
+
+    partitions: dict[str, list[str]] = defaultdict(list)
+    for (file,) in files:
+        match = HIVE_PARTITION_PATTERN.search(file)
+        if match:
+            partitions[match.group(1)].append(file)
+
+    return dict(partitions)
+
+
+def discover_iceberg_partitions(table_identifier: str) -> dict[str, list[str]]:
+    """List data files of the current Iceberg snapshot grouped by partition"""
+    from pyiceberg.catalog import load_catalog
+
+    catalog = load_catalog(
+        "r2_catalog",
+        **{
+            "type": "rest",
+            "uri": os.environ["R2_CATALOG_URI"],
+            "credential": os.environ["CLOUDFLARE_API_TOKEN"],
+            "warehouse": os.environ["R2_CATALOG_WAREHOUSE"],
+        },
+    )
+    table = catalog.load_table(table_identifier)
+    spec = table.spec()
+    schema = table.schema()
+
+    partitions: dict[str, list[str]] = defaultdict(list)
+    for task in table.scan().plan_files():
+        labels = []
+        for position, field in enumerate(spec.fields):
+            source_type = schema.find_field(field.source_id).field_type
+            value = field.transform.to_human_string(source_type, task.file.partition[position])
+            labels.append(f"{field.name}={value}")
+        partitions["/".join(labels) or "unpartitioned"].append(task.file.file_path)
+
+    return dict(partitions)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build partition sketch sidecars")
+    parser.add_argument("--dataset", required=True, help="Dataset name used in the sketch store")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source-prefix", help="Bronze prefix within the bucket")
+    source.add_argument("--iceberg-table", help="Iceberg table identifier")
+    parser.add_argument(
+        "--bucket", default=os.getenv("R2_BUCKET_NAME", "data-lake-raw"), help="Bronze bucket"
+    )
+    parser.add_argument(
+        "--sketch-root",
+        default=os.getenv("SKETCH_STORE_ROOT"),
+        help="Sidecar root (local directory or s3:// URI, default: s3://<bucket>/_sketches)",
+    )
+    parser.add_argument("--columns", nargs="*", help="Columns to sketch (default: all)")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute existing sidecars")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+
+    conn = get_r2_connection()
+    store = SketchStore(conn, args.sketch_root or f"s3://{args.bucket}/_sketches")
+
+    if args.iceberg_table:
+        partitions = discover_iceberg_partitions(args.iceberg_table)
+    else:
+        partitions = discover_bronze_partitions(conn, args.bucket, args.source_prefix)
+
+    existing = set() if args.rebuild else set(store.list_partitions(args.dataset))
+    pending = sorted(partition for partition in partitions if partition not in existing)
+
+    print(f"📦 {len(partitions)} partitions found, {len(pending)} without sketches")
+
+    for partition in pending:
+        files = ", ".join(f"'{file}'" for file in partitions[partition])
+        path = store.sketch_partition(
+            args.dataset,
+            partition,
+            f"read_parquet([{files}], union_by_name=true)",
+            columns=args.columns,
+        )
+        print(f"✅ {partition} → {path}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Footer-Statistics Validation Tier for Cloudflare Data Platform
+
+Many expectations can be decided from Parquet footers alone: row counts from
+``num_rows``, not-null checks from per-column ``null_count``, value ranges from
+row-group min/max. This module fetches only the footer of each file with
+ranged GETs, caches it locally keyed by the object ETag, and derives the
+single-pass engine's metrics (see ``validation_engine``) from it. Only the
+metrics the statistics cannot answer are computed with a data scan, and that
+scan reads just the columns those metrics need.
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from incremental_validation import list_parquet_objects
+from validation_engine import (
+    DATASETS,
+    build_validation_result,
+    compile_suite,
+    compute_metrics,
+    dataset_source_sql,
+    describe_source,
+)
+
+PARQUET_MAGIC = b"PAR1"
+# Large enough for the footer of a typical Bronze file, so one GET usually suffices
+FOOTER_TAIL_BYTES = 64 * 1024
+
+# Functions and types that may wrap a column without changing its nullness
+NULL_PRESERVING_TOKENS = {
+    "CAST", "AS", "TO_TIMESTAMP", "INTEGER", "BIGINT", "DOUBLE", "VARCHAR",
+    "TIMESTAMP", "JSON", "BOOLEAN", "DATE",
+}
+ORDER_PRESERVING_CAST = re.compile(
+    r'^CAST\(\s*(?:"([^"]+)"|([A-Za-z_]\w*))\s+AS\s+(INTEGER|BIGINT|DOUBLE)\s*\)$', re.IGNORECASE
+)
+
+
+def fetch_footer(s3_client, bucket: str, key: str, tail_bytes: int = FOOTER_TAIL_BYTES) -> bytes:
+    """
+    Fetch the footer of a Parquet object with suffix-range GETs
+
+    Returns:
+        Footer bytes (Thrift metadata, 4-byte length and trailing magic)
+    """
+    response = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{tail_bytes}")
+    tail = response["Body"].read()
+    if len(tail) < 8 or tail[-4:] != PARQUET_MAGIC:
+        raise ValueError(f"s3://{bucket}/{key} is not a Parquet file")
+
+    needed = int.from_bytes(tail[-8:-4], "little") + 8
+    if needed > len(tail):
+        size = int(response["ContentRange"].rsplit("/", 1)[1])
+        head = s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={size - needed}-{size - len(tail) - 1}"
+        )["Body"].read()
+        tail = head + tail
+
+    return tail[-needed:]
+
+
+class FooterCache:
+    """
+    Local cache of Parquet footers keyed by ETag
+
+    Bronze objects are immutable, so a cached footer never has to be
+    revalidated; a rewritten object gets a new ETag and a new cache entry.
+    """
+
+    def __init__(self, s3_client, bucket: str, cache_dir: Path):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.cache_dir = Path(cache_dir)
+        self.fetched = 0
+        self.cached = 0
+
+    def metadata(self, key: str, etag: str) -> pq.FileMetaData:
+        path = self.cache_dir / f"{etag}.footer"
+        if path.exists():
+            footer = path.read_bytes()
+            self.cached += 1
+        else:
+            footer = fetch_footer(self.s3_client, self.bucket, key)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(footer)
+            self.fetched += 1
+
+        # The reader only looks at the end of the buffer; the leading magic keeps it a valid file
+        return pq.read_metadata(pa.BufferReader(PARQUET_MAGIC + footer))
+
+
+def aggregate_footer_statistics(metadatas: list[pq.FileMetaData]) -> dict[str, Any]:
+    """
+    Combine row counts, null counts and min/max of top-level columns
+
+    A column missing from a file counts as all-null for that file (as with
+    ``union_by_name``). ``null_count``/``min``/``max`` become None as soon as
+    one row group lacks the statistic.
+    """
+    row_count = sum(metadata.num_rows for metadata in metadatas)
+    columns: dict[str, dict[str, Any]] = {}
+
+    for metadata in metadatas:
+        names = [metadata.schema.column(i).path for i in range(metadata.num_columns)]
+        for name in names:
+            columns.setdefault(name, {"null_count": 0, "min": None, "max": None, "has_min_max": True})
+
+    for metadata in metadatas:
+        present: set[str] = set()
+        for rg in range(metadata.num_row_groups):
+            row_group = metadata.row_group(rg)
+            for i in range(row_group.num_columns):
+                chunk = row_group.column(i)
+                name = chunk.path_in_schema
+                present.add(name)
+                stats = columns[name]
+                statistics = chunk.statistics if chunk.is_stats_set else None
+
+                if statistics is None or not statistics.has_null_count:
+                    stats["null_count"] = None
+                elif stats["null_count"] is not None:
+                    stats["null_count"] += statistics.null_count
+
+                if statistics is None or not statistics.has_min_max:
+                    # All-null chunks legitimately have no min/max
+                    if statistics is None or statistics.null_count != row_group.num_rows:
+                        stats["has_min_max"] = False
+                    continue
+                stats["min"] = statistics.min if stats["min"] is None else min(stats["min"], statistics.min)
+                stats["max"] = statistics.max if stats["max"] is None else max(stats["max"], statistics.max)
+
+        for name, stats in columns.items():
+            if name not in present and stats["null_count"] is not None:
+                stats["null_count"] += metadata.num_rows
+
+    for stats in columns.values():
+        if not stats.pop("has_min_max"):
+            stats["min"] = stats["max"] = None
+
+    return {"row_count": row_count, "columns": columns}
+
+
+def _null_source(expression: str) -> str | None:
+    """Source column of an expression whose nullness equals that column's, if any"""
+    tokens = [
+        quoted or bare
+        for quoted, bare in re.findall(r'"([^"]+)"|([A-Za-z_]\w*)', expression)
+    ]
+    sources = [token for token in tokens if token.upper() not in NULL_PRESERVING_TOKENS]
+    return sources[0] if len(sources) == 1 else None
+
+
+def _order_source(expression: str) -> str | None:
+    """Source column of a numeric CAST that preserves min/max, if any"""
+    match = ORDER_PRESERVING_CAST.match(expression.strip())
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def footer_metrics(
+    suite: dict[str, Any], columns: dict[str, str], statistics: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Derive single-pass engine metrics that the footer statistics decide
+
+    Args:
+        suite: Expectation suite
+        columns: Staging column name -> SQL expression (``DATASETS[...]["columns"]``)
+        statistics: Output of ``aggregate_footer_statistics``
+
+    Returns:
+        Metric name -> value, only for conclusive metrics
+    """
+    row_count = statistics["row_count"]
+    column_stats = statistics["columns"]
+    metrics: dict[str, Any] = {"row_count": row_count}
+
+    for column, expression in columns.items():
+        source = _null_source(expression)
+        null_count = column_stats.get(source, {}).get("null_count") if source else None
+        if null_count is not None:
+            metrics[f"nonnull:{column}"] = row_count - null_count
+
+    for position, expectation in enumerate(suite["expectations"]):
+        if expectation["expectation_type"] != "expect_column_values_to_be_between":
+            continue
+        kwargs = expectation["kwargs"]
+        source = _order_source(columns.get(kwargs["column"], ""))
+        stats = column_stats.get(source) if source else None
+        if not stats or stats["min"] is None or not isinstance(stats["min"], (int, float)):
+            continue
+
+        # Only "no value out of range" is conclusive; otherwise the count needs a scan
+        above_min = kwargs.get("min_value") is None or (
+            stats["min"] > kwargs["min_value"] if kwargs.get("strict_min") else stats["min"] >= kwargs["min_value"]
+        )
+        below_max = kwargs.get("max_value") is None or (
+            stats["max"] < kwargs["max_value"] if kwargs.get("strict_max") else stats["max"] <= kwargs["max_value"]
+        )
+        if above_min and below_max:
+            metrics[f"unexpected:{position}"] = 0
+
+    return metrics
+
+
+def validate_suite_with_footers(
+    conn: duckdb.DuckDBPyConnection,
+    footer_cache: FooterCache,
+    suite: dict[str, Any],
+    dataset: str,
+    run_name: str | None = None,
+) -> dict[str, Any]:
+    """
+    Validate a suite from footer statistics, scanning only for inconclusive metrics
+
+    Args:
+        conn: DuckDB connection (configured for R2)
+        footer_cache: Footer cache for the dataset's bucket
+        suite: Expectation suite
+        dataset: Dataset name in ``DATASETS``
+        run_name: Optional run name for the result metadata
+
+    Returns:
+        GE-compatible validation result; ``meta["footer_statistics"]`` lists
+        which metrics came from footers and which needed a scan
+    """
+    started = time.perf_counter()
+    spec = DATASETS[dataset]
+    bucket = footer_cache.bucket
+
+    objects = list_parquet_objects(footer_cache.s3_client, bucket, spec["prefix"])
+    statistics = aggregate_footer_statistics(
+        [footer_cache.metadata(key, etag) for key, etag in sorted(objects.items())]
+    )
+
+    required = compile_suite(suite)
+    decided = {
+        name: value
+        for name, value in footer_metrics(suite, spec["columns"], statistics).items()
+        if name in required
+    }
+    remaining = {name: metric for name, metric in required.items() if name not in decided}
+
+    paths = [f"s3://{bucket}/{key}" for key in sorted(objects)]
+    metrics = dict(decided)
+    if remaining and paths:
+        metrics.update(compute_metrics(conn, remaining, dataset_source_sql(dataset, paths=paths)))
+
+    # Schema expectations only need one footer (DESCRIBE reads metadata, not data)
+    column_types = describe_source(conn, dataset_source_sql(dataset, paths=paths[:1])) if paths else {}
+
+    result = build_validation_result(
+        suite,
+        metrics,
+        column_types,
+        batch_spec={"bucket": bucket, "prefix": spec["prefix"], "files": len(objects)},
+        run_name=run_name,
+        duration_seconds=time.perf_counter() - started,
+    )
+    result["meta"]["engine"] = "duckdb_footer_statistics"
+    result["meta"]["footer_statistics"] = {
+        "footer_metrics": sorted(decided),
+        "scanned_metrics": sorted(remaining),
+        "footers_fetched": footer_cache.fetched,
+        "footers_cached": footer_cache.cached,
+    }
+
+    return result
@@ -0,0 +1,369 @@
+"""
+Incremental Validation for Cloudflare Data Platform
+
+Validates only the Bronze files that landed since the last successful run.
+Per-file partial metrics are cached locally, keyed by the object ETag, and
+table-level metrics are produced by merging the cached partials. Daily
+validation cost therefore depends on the amount of new data, not on the
+size of the lake.
+
+Uniqueness cannot be merged from counts, so unique columns are tracked with
+per-file HyperLogLog sketches (see ``partition_sketches``). The merged sketch
+only passes a column when its distinct estimate reaches the non-null count;
+otherwise the duplicates are counted exactly with one scan over all files.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import boto3
+import duckdb
+
+from validation_engine import (
+    DATASETS,
+    MetricSpec,
+    build_validation_result,
+    compile_suite,
+    compute_metrics,
+    dataset_source_sql,
+    describe_source,
+    evaluate_expectation,
+    expectation_metrics,
+    quote_identifier,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "great_expectations" / "plugins"))
+
+from partition_sketches import HyperLogLog  # noqa: E402
+
+PARTITION_PATTERN = re.compile(r"(year=\d+/month=\d+/day=\d+)/")
+HLL_PRECISION = 14
+
+
+def get_s3_client():
+    """boto3 S3 client for R2"""
+    endpoint = os.getenv("R2_ENDPOINT", "")
+    if endpoint and not endpoint.startswith("http"):
+        endpoint = f"https://{endpoint}"
+
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        aws_access_key_id=os.getenv("R2_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("R2_SECRET_ACCESS_KEY"),
+        region_name="auto",
+    )
+
+
+def list_parquet_objects(
+    s3_client, bucket: str, prefix: str, start_after_partition: str | None = None
+) -> dict[str, str]:
+    """
+    List Parquet objects under a prefix with their ETags
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket name
+        prefix: Dataset prefix
+        start_after_partition: Skip partitions before this one (``year=YYYY/month=MM/day=DD``).
+            The partition itself is listed again because it may still be receiving files.
+
+    Returns:
+        Mapping of object key to ETag
+    """
+    kwargs = {"Bucket": bucket, "Prefix": f"{prefix.strip('/')}/"}
+    if start_after_partition:
+        # "<prefix>/year=.../day=DD" sorts before every key inside that partition
+        kwargs["StartAfter"] = f"{prefix.strip('/')}/{start_after_partition}"
+
+    objects = {}
+    for page in s3_client.get_paginator("list_objects_v2").paginate(**kwargs):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith(".parquet"):
+                objects[obj["Key"]] = obj["ETag"].strip('"')
+
+    return objects
+
+
+def partition_of(key: str) -> str | None:
+    """Extract ``year=/month=/day=`` from an object key"""
+    match = PARTITION_PATTERN.search(key)
+    return match.group(1) if match else None
+
+
+def reconcile_files(
+    known: dict[str, str], listed: dict[str, str], prefix: str, start_after_partition: str | None
+) -> dict[str, str]:
+    """
+    Known files updated with a fresh listing
+
+    Keys inside the listed range that are missing from the listing were
+    deleted and are dropped; keys before the watermark partition were not
+    listed and are kept (``full_refresh`` re-lists them).
+    """
+    listed_from = f"{prefix.strip('/')}/{start_after_partition}" if start_after_partition else ""
+    files = {key: etag for key, etag in known.items() if key < listed_from}
+    files.update(listed)
+    return files
+
+
+def suite_fingerprint(suite: dict[str, Any], columns: dict[str, str]) -> str:
+    """Cached partials are only valid for the suite and projection they were computed with"""
+    payload = json.dumps([suite["expectations"], columns], sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def _unique_columns(suite: dict[str, Any]) -> list[str]:
+    return sorted({
+        expectation["kwargs"]["column"]
+        for expectation in suite["expectations"]
+        if expectation["expectation_type"] == "expect_column_values_to_be_unique"
+    })
+
+
+class IncrementalValidator:
+    """
+    Incremental single-pass validation of one Bronze dataset
+
+    State and cache live under ``state_dir/<dataset>/``:
+    ``state.json`` (watermark partition and known files) and
+    ``cache/<etag>-<suite fingerprint>.json`` (per-file partial metrics).
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        s3_client,
+        bucket: str,
+        dataset: str,
+        suite: dict[str, Any],
+        state_dir: Path,
+    ):
+        self.conn = conn
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.dataset = dataset
+        self.suite = suite
+        self.spec = DATASETS[dataset]
+        self.dataset_dir = Path(state_dir) / dataset
+        self.cache_dir = self.dataset_dir / "cache"
+        self.state_path = self.dataset_dir / "state.json"
+        self.fingerprint = suite_fingerprint(suite, self.spec["columns"])
+        self.metrics = compile_suite(suite, mergeable_only=True)
+        self.unique_columns = _unique_columns(suite)
+        # Keys scanned by the last run (used to scope unexpected-row capture)
+        self.new_files: list[str] = []
+
+    def load_state(self) -> dict[str, Any]:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text())
+        return {"last_success_partition": None, "files": {}}
+
+    def save_state(self, state: dict[str, Any]) -> None:
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(state, indent=2))
+
+    def _cache_path(self, etag: str) -> Path:
+        return self.cache_dir / f"{etag}-{self.fingerprint}.json"
+
+    def _load_partial(self, etag: str) -> dict[str, Any] | None:
+        path = self._cache_path(etag)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def _save_partial(self, etag: str, partial: dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_path(etag).write_text(json.dumps(partial))
+
+    def compute_partials(self, keys: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Compute partial metrics for new files: one grouped aggregate scan,
+        plus one streamed hash pass over the unique columns only
+
+        Returns:
+            Mapping of object key to partial (``metrics`` and base64 ``hll`` registers)
+        """
+        uris = [f"s3://{self.bucket}/{key}" for key in keys]
+        source = dataset_source_sql(self.dataset, paths=uris, include_filename=True)
+
+        grouped = compute_metrics(self.conn, self.metrics, source, group_by="filename")
+        # Empty files produce no group but still need a (zero) partial so they are not rescanned
+        empty = dict.fromkeys(self.metrics, 0)
+        partials = {
+            key: {"metrics": grouped.get(uri, empty), "hll": {}}
+            for key, uri in zip(keys, uris, strict=True)
+        }
+
+        if self.unique_columns:
+            hlls = self._unique_column_sketches(source)
+            for uri, column_sketches in hlls.items():
+                key = uri[len(f"s3://{self.bucket}/"):]
+                partials[key]["hll"] = {
+                    column: base64.b64encode(sketch.to_bytes()).decode()
+                    for column, sketch in column_sketches.items()
+                }
+
+        return partials
+
+    def _unique_column_sketches(self, source: str) -> dict[str, dict[str, HyperLogLog]]:
+        hashes = ", ".join(
+            f"CASE WHEN {quote_identifier(column)} IS NULL THEN NULL "
+            f"ELSE hash({quote_identifier(column)}) END"
+            for column in self.unique_columns
+        )
+        reader = self.conn.execute(f"SELECT filename, {hashes} FROM {source}").fetch_record_batch()
+
+        sketches: dict[str, dict[str, HyperLogLog]] = defaultdict(
+            lambda: {column: HyperLogLog(HLL_PRECISION) for column in self.unique_columns}
+        )
+        for batch in reader:
+            filenames = batch.column(0).dictionary_encode()
+            for code, filename in enumerate(filenames.dictionary.to_pylist()):
+                mask = filenames.indices.to_numpy(zero_copy_only=False) == code
+                for position, column in enumerate(self.unique_columns):
+                    values = batch.column(position + 1).filter(mask).drop_null()
+                    sketches[filename][column].add_hashes(values.to_numpy(zero_copy_only=False))
+
+        return sketches
+
+    def merge_partials(self, partials: list[dict[str, Any]]) -> tuple[dict[str, Any], dict[str, HyperLogLog]]:
+        """Sum partial metrics and union HLL sketches"""
+        merged = dict.fromkeys(self.metrics, 0)
+        sketches = {column: HyperLogLog(HLL_PRECISION) for column in self.unique_columns}
+
+        for partial in partials:
+            for name in self.metrics:
+                merged[name] += partial["metrics"].get(name) or 0
+            for column, encoded in partial["hll"].items():
+                sketch = HyperLogLog.from_bytes(base64.b64decode(encoded), HLL_PRECISION)
+                sketches[column] = sketches[column].merge(sketch)
+
+        return merged, sketches
+
+    def run(self, run_name: str | None = None, full_refresh: bool = False) -> dict[str, Any]:
+        """
+        Validate new files and produce a table-level result from merged partials
+
+        Args:
+            run_name: Optional run name for the result metadata
+            full_refresh: Re-list the whole prefix instead of starting at the watermark
+
+        Returns:
+            GE-compatible validation result with incremental details in ``meta``
+        """
+        started = time.perf_counter()
+        state = {"last_success_partition": None, "files": {}} if full_refresh else self.load_state()
+
+        listed = list_parquet_objects(
+            self.s3_client, self.bucket, self.spec["prefix"], state["last_success_partition"]
+        )
+        files = reconcile_files(
+            state["files"], listed, self.spec["prefix"], state["last_success_partition"]
+        )
+        removed = len(set(state["files"]) - set(files))
+
+        pending = [key for key, etag in files.items() if self._load_partial(etag) is None]
+        if pending:
+            for key, partial in self.compute_partials(pending).items():
+                self._save_partial(files[key], partial)
+
+        partials = [self._load_partial(etag) for etag in files.values()]
+        metrics, sketches = self.merge_partials([partial for partial in partials if partial])
+        full_source = dataset_source_sql(
+            self.dataset, paths=[f"s3://{self.bucket}/{key}" for key in files]
+        ) if files else None
+
+        def evaluate(expectation, position, metrics, column_types):
+            if expectation["expectation_type"] == "expect_column_values_to_be_unique":
+                return _evaluate_unique_from_sketch(
+                    expectation,
+                    position,
+                    metrics,
+                    sketches,
+                    lambda specs: compute_metrics(self.conn, specs, full_source),
+                )
+            return evaluate_expectation(expectation, position, metrics, column_types)
+
+        column_types = describe_source(
+            self.conn, dataset_source_sql(self.dataset, paths=[f"s3://{self.bucket}/{next(iter(files))}"])
+        ) if files else {}
+
+        result = build_validation_result(
+            self.suite,
+            metrics,
+            column_types,
+            batch_spec={"bucket": self.bucket, "prefix": self.spec["prefix"], "files": len(files)},
+            run_name=run_name,
+            duration_seconds=time.perf_counter() - started,
+            evaluate=evaluate,
+        )
+        result["meta"]["incremental"] = {
+            "watermark_partition": state["last_success_partition"],
+            "listed_files": len(listed),
+            "new_files": len(pending),
+            "cached_files": len(files) - len(pending),
+            "removed_files": removed,
+            "new_partitions": sorted({partition_of(key) for key in pending} - {None}),
+        }
+
+        self.new_files = pending
+        state["files"] = files
+        if result["success"]:
+            partitions = [partition_of(key) for key in files]
+            state["last_success_partition"] = max(
+                (partition for partition in partitions if partition), key=_partition_sort_key, default=None
+            )
+            state["last_success_at"] = datetime.now(UTC).isoformat()
+        self.save_state(state)
+
+        return result
+
+
+def _partition_sort_key(partition: str) -> tuple[int, ...]:
+    return tuple(int(value) for value in re.findall(r"=(\d+)", partition))
+
+
+def _evaluate_unique_from_sketch(
+    expectation: dict[str, Any],
+    position: int,
+    metrics: dict[str, Any],
+    sketches: dict[str, HyperLogLog],
+    exact_metrics: Callable[[dict[str, MetricSpec]], dict[str, Any]],
+) -> tuple[bool, dict[str, Any]]:
+    """
+    Uniqueness from the merged HLL sketch, or from an exact scan
+
+    An estimate at or above the non-null count passes without reading data.
+    A lower estimate may be HLL error as well as real duplicates, so the
+    exact duplicate count is computed over all files and evaluated as in the
+    single-pass engine.
+    """
+    column = expectation["kwargs"]["column"]
+    element_count = metrics["row_count"]
+    nonnull = metrics[f"nonnull:{column}"]
+    distinct = sketches[column].count()
+
+    if distinct >= nonnull:
+        return True, {
+            "element_count": element_count,
+            "missing_count": element_count - nonnull,
+            "unexpected_count": 0,
+            "unexpected_percent": 0.0 if nonnull else None,
+            "details": {"approximate": True, "distinct_estimate": distinct},
+        }
+
+    exact = exact_metrics(expectation_metrics(expectation, position))
+    success, result = evaluate_expectation(expectation, position, exact, {})
+    result["details"] = {"approximate": False, "distinct_estimate": distinct}
+    return success, result
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Per-model dbt Run Profiling for Cloudflare Data Platform
+
+Runs dbt in-process with the profiling plugin (``dbt/plugins/profiling_plugin.py``)
+enabled and appends one row per model to a local DuckDB profiling table:
+execution time and rows affected from dbt, plus DuckDB profile metrics of the
+model's statements (query latency, CPU time, rows scanned/produced, bytes
+read from R2 and time per operator type).
+
+The report compares the latest run with the median of the previous runs and
+flags models that got slower or read more data.
+
+Usage:
+    python scripts/profile_dbt_run.py run -- --select staging --target dev
+    python scripts/profile_dbt_run.py report --baseline-runs 5 --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+DBT_DIR = Path(__file__).parent.parent / "dbt"
+DEFAULT_PROFILING_DB = DBT_DIR / "dbt_profiling.duckdb"
+TABLE_NAME = "dbt_model_profiles"
+
+
+def _sum(values: list[float | None]) -> float | None:
+    present = [value for value in values if value is not None]
+    return sum(present) if present else None
+
+
+def _max(values: list[float | None]) -> float | None:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def _target(dbt_args: list[str]) -> str | None:
+    for index, arg in enumerate(dbt_args):
+        if arg == "--target" and index + 1 < len(dbt_args):
+            return dbt_args[index + 1]
+        if arg.startswith("--target="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def run_dbt_with_profiling(dbt_args: list[str]) -> dict[str, Any]:
+    """
+    Invoke ``dbt run`` in-process with statement profiling enabled
+
+    Returns:
+        ``{"run_id", "run_started_at", "success", "rows"}`` with one row per model
+    """
+    from dbt.cli.main import dbtRunner
+
+    os.environ["DBT_PROFILE_MODELS"] = "1"
+    os.chdir(DBT_DIR)
+    # Same module object as the one dbt-duckdb loads through module_paths
+    sys.path.insert(0, str(DBT_DIR / "plugins"))
+    import profiling_plugin
+
+    profiling_plugin.PROFILES.clear()
+    run_started_at = datetime.now(UTC)
+    outcome = dbtRunner().invoke(["run", "--profiles-dir", str(DBT_DIR), *dbt_args])
+    if outcome.result is None:
+        raise RuntimeError(f"dbt run failed: {outcome.exception}")
+
+    metadata = getattr(outcome.result, "metadata", None)
+    run_id = getattr(metadata, "invocation_id", None) or uuid.uuid4().hex
+    target = _target(dbt_args) or "default"
+
+    rows = []
+    for result in outcome.result.results:
+        node = result.node
+        statements = profiling_plugin.PROFILES.get(node.unique_id, [])
+        operator_seconds: dict[str, float] = {}
+        for statement in statements:
+            for operator, seconds in statement["operator_seconds"].items():
+                operator_seconds[operator] = operator_seconds.get(operator, 0.0) + seconds
+        produced = [s["rows_produced"] for s in statements if s["rows_produced"] is not None]
+
+        rows.append({
+            "run_id": run_id,
+            "run_started_at": run_started_at,
+            "target": target,
+            "node_id": node.unique_id,
+            "model": node.name,
+            "materialized": node.config.materialized,
+            "status": str(result.status),
+            "execution_seconds": result.execution_time,
+            "rows_affected": (result.adapter_response or {}).get("rows_affected"),
+            "statements": len(statements),
+            "query_seconds": _sum([s["latency_seconds"] for s in statements]),
+            "cpu_seconds": _sum([s["cpu_seconds"] for s in statements]),
+            "rows_scanned": _sum([s["rows_scanned"] for s in statements]),
+            "rows_produced": max(produced) if produced else None,
+            "bytes_read": _sum([s["bytes_read"] for s in statements]),
+            "bytes_written": _sum([s["bytes_written"] for s in statements]),
+            "peak_memory_bytes": _max([s["peak_memory_bytes"] for s in statements]),
+            "operator_seconds": json.dumps(
+                dict(sorted(operator_seconds.items(), key=lambda item: -item[1]))
+            ),
+        })
+
+    return {
+        "run_id": run_id,
+        "run_started_at": run_started_at,
+        "success": outcome.success,
+        "rows": rows,
+    }
+
+
+def append_profiles(conn: duckdb.DuckDBPyConnection, rows: list[dict[str, Any]]) -> None:
+    """Append per-model rows to the profiling table"""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            run_id VARCHAR,
+            run_started_at TIMESTAMPTZ,
+            target VARCHAR,
+            node_id VARCHAR,
+            model VARCHAR,
+            materialized VARCHAR,
+            status VARCHAR,
+            execution_seconds DOUBLE,
+            rows_affected BIGINT,
+            statements INTEGER,
+            query_seconds DOUBLE,
+            cpu_seconds DOUBLE,
+            rows_scanned BIGINT,
+            rows_produced BIGINT,
+            bytes_read BIGINT,
+            bytes_written BIGINT,
+            peak_memory_bytes BIGINT,
+            operator_seconds JSON
+        )
+        """
+    )
+    if not rows:
+        return
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE_NAME} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        [[row[column] for column in columns] for row in rows],
+    )
+
+
+def regression_report(
+    conn: duckdb.DuckDBPyConnection,
+    baseline_runs: int = 5,
+    threshold: float = 0.25,
+    min_seconds: float = 1.0,
+    target: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Compare the latest run with the median of the previous runs per model
+
+    A model is flagged when its execution time exceeds the baseline median by
+    more than ``threshold`` (and by at least ``min_seconds``), or when it read
+    more than ``threshold`` more bytes.
+    """
+    target_filter = "WHERE target = ?" if target else ""
+    parameters: list[Any] = [target] if target else []
+
+    rows = conn.execute(
+        f"""
+        WITH runs AS (
+            SELECT run_id, MIN(run_started_at) AS run_started_at,
+                   ROW_NUMBER() OVER (ORDER BY MIN(run_started_at) DESC) AS run_rank
+            FROM {TABLE_NAME}
+            {target_filter}
+            GROUP BY run_id
+        ),
+        latest AS (
+            SELECT p.* FROM {TABLE_NAME} p JOIN runs USING (run_id) WHERE run_rank = 1
+        ),
+        baseline AS (
+            SELECT
+                node_id,
+                COUNT(*) AS baseline_runs,
+                MEDIAN(execution_seconds) AS baseline_seconds,
+                MEDIAN(bytes_read) AS baseline_bytes_read
+            FROM {TABLE_NAME} p JOIN runs USING (run_id)
+            WHERE run_rank BETWEEN 2 AND {int(baseline_runs) + 1}
+            GROUP BY node_id
+        )
+        SELECT
+            latest.model,
+            latest.status,
+            latest.execution_seconds,
+            baseline.baseline_seconds,
+            latest.execution_seconds / NULLIF(baseline.baseline_seconds, 0) - 1 AS time_change,
+            latest.bytes_read,
+            baseline.baseline_bytes_read,
+            latest.bytes_read / NULLIF(baseline.baseline_bytes_read, 0) - 1 AS bytes_change,
+            latest.rows_produced,
+            latest.operator_seconds,
+            COALESCE(baseline.baseline_runs, 0) AS baseline_runs
+        FROM latest LEFT JOIN baseline USING (node_id)
+        ORDER BY latest.execution_seconds DESC
+        """,
+        parameters,
+    ).fetchall()
+
+    columns = [
+        "model", "status", "execution_seconds", "baseline_seconds", "time_change",
+        "bytes_read", "baseline_bytes_read", "bytes_change", "rows_produced",
+        "operator_seconds", "baseline_runs",
+    ]
+    report = []
+    for values in rows:
+        entry = dict(zip(columns, values, strict=True))
+        slower = (
+            entry["time_change"] is not None
+            and entry["time_change"] > threshold
+            and entry["execution_seconds"] - entry["baseline_seconds"] >= min_seconds
+        )
+        more_bytes = entry["bytes_change"] is not None and entry["bytes_change"] > threshold
+        entry["regression"] = slower or more_bytes
+        report.append(entry)
+    return report
+
+
+def _format_bytes(value: float | None) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TiB"
+
+
+def _format_change(value: float | None) -> str:
+    return "-" if value is None else f"{value:+.0%}"
+
+
+def print_report(report: list[dict[str, Any]]) -> None:
+    print(f"{'model':<32} {'time':>8} {'median':>8} {'Δtime':>7} {'read':>10} {'Δread':>7} {'rows':>10}  top operator")
+    for entry in report:
+        operators = json.loads(entry["operator_seconds"] or "{}")
+        top_operator = next(iter(operators.items()), None)
+        flag = "⚠️ " if entry["regression"] else "  "
+        baseline = entry["baseline_seconds"]
+        print(
+            f"{flag}{entry['model']:<30} "
+            f"{entry['execution_seconds']:>7.2f}s "
+            f"{(f'{baseline:.2f}s' if baseline is not None else '-'):>8} "
+            f"{_format_change(entry['time_change']):>7} "
+            f"{_format_bytes(entry['bytes_read']):>10} "
+            f"{_format_change(entry['bytes_change']):>7} "
+            f"{(entry['rows_produced'] if entry['rows_produced'] is not None else '-'):>10}  "
+            f"{f'{top_operator[0]} {top_operator[1]:.2f}s' if top_operator else '-'}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile dbt runs per model")
+    parser.add_argument("--db", default=os.getenv("DBT_PROFILING_DB", str(DEFAULT_PROFILING_DB)),
+                        help="Local DuckDB file holding the profiling table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run dbt with profiling and append the results")
+    run_parser.add_argument("dbt_args", nargs=argparse.REMAINDER, help="Arguments passed to dbt run (after --)")
+
+    report_parser = subparsers.add_parser("report", help="Compare the latest run with previous runs")
+    for subparser in (run_parser, report_parser):
+        subparser.add_argument("--baseline-runs", type=int, default=5, help="Previous runs in the baseline median")
+        subparser.add_argument("--threshold", type=float, default=0.25, help="Relative increase flagged as regression")
+        subparser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum absolute slowdown to flag")
+        subparser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if a model regressed")
+    args = parser.parse_args()
+
+    db_path = str(Path(args.db).resolve())
+    success = True
+    target = None
+
+    if args.command == "run":
+        dbt_args = args.dbt_args[1:] if args.dbt_args[:1] == ["--"] else args.dbt_args
+        run = run_dbt_with_profiling(dbt_args)
+        success = run["success"]
+        target = _target(dbt_args) or "default"
+        with duckdb.connect(db_path) as conn:
+            append_profiles(conn, run["rows"])
+        print(f"📈 Recorded {len(run['rows'])} model(s) of run {run['run_id']} → {db_path}")
+
+    with duckdb.connect(db_path) as conn:
+        append_profiles(conn, [])
+        report = regression_report(
+            conn, args.baseline_runs, args.threshold, args.min_seconds, target=target
+        )
+    print_report(report)
+
+    regressions = [entry["model"] for entry in report if entry["regression"]]
+    if regressions:
+        print(f"\n⚠️ Regressions: {', '.join(regressions)}")
+    if not success or (regressions and args.fail_on_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
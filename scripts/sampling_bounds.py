@@ -0,0 +1,101 @@
+"""
+Sampling Bounds for Cloudflare Data Platform
+
+Sampled validations (``run_great_expectations.py --sample-method``) only see
+part of the data. This module turns the failure counts observed in a sample
+into Wilson confidence intervals and a pass / fail / inconclusive verdict
+against the failure rate each expectation allows.
+"""
+
+from statistics import NormalDist
+from typing import Any
+
+from validation_engine import raised_exception
+
+# file: random subset of files, row_group: block (vector) sampling, bernoulli: per-row sampling
+SAMPLE_METHODS = ("file", "row_group", "bernoulli")
+
+
+def wilson_interval(failures: int, n: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a failure rate observed in a sample"""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = failures / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * ((p * (1 - p) / n + z * z / (4 * n * n)) ** 0.5) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def annotate_sampling_bounds(results, sampling: dict[str, Any], confidence: float = 0.95) -> list[str]:
+    """
+    Attach failure-rate confidence intervals to sampled expectation results
+
+    Each row-level result gets ``result["sampling"]`` with the observed
+    failure rate, its Wilson interval and a verdict against the allowed
+    failure rate (``1 - mostly``): ``pass`` / ``fail`` when the whole interval
+    is on one side, ``inconclusive`` otherwise. Without observed failures the
+    verdict is ``pass``; with ``mostly=1`` any observed failure is a ``fail``.
+    Expectations that raised get ``error`` and other expectations keep the
+    verdict of their evaluation on the sample. File and block sampling are
+    cluster samples, so their intervals are optimistic when failures
+    concentrate in a few files.
+
+    Returns:
+        Expectation types whose verdict is ``fail`` or ``error``
+    """
+    failed = []
+    rate = (
+        sampling["files_sampled"] / sampling["files_total"]
+        if sampling["method"] == "file" else sampling["rate"]
+    )
+    for expectation_result in results.results:
+        expectation_type = expectation_result.expectation_config.expectation_type
+        if expectation_result.result is None:
+            expectation_result.result = {}
+        observed = expectation_result.result
+
+        error = raised_exception(expectation_result.exception_info)
+        if error:
+            observed["sampling"] = {"verdict": "error", "error": error}
+            failed.append(expectation_type)
+            continue
+        if expectation_type == "expect_table_row_count_to_be_between":
+            # Row counts of a sample are not comparable to the bounds; report the scaled estimate
+            observed["sampling"] = {"estimated_row_count": round((observed.get("observed_value") or 0) / rate)}
+            continue
+        if "unexpected_count" not in observed or observed.get("element_count") is None:
+            verdict = "pass" if expectation_result.success else "fail"
+            observed["sampling"] = {"verdict": verdict}
+            if verdict == "fail":
+                failed.append(expectation_type)
+            continue
+
+        n = observed["element_count"] - (observed.get("missing_count") or 0)
+        failures = observed["unexpected_count"] or 0
+        lower, upper = wilson_interval(failures, n, confidence)
+        allowed = 1 - expectation_result.expectation_config.kwargs.get("mostly", 1)
+
+        if failures == 0:
+            verdict = "pass"
+        elif allowed <= 0 or lower > allowed:
+            verdict = "fail"
+        elif upper <= allowed:
+            verdict = "pass"
+        else:
+            verdict = "inconclusive"
+        if verdict == "fail":
+            failed.append(expectation_type)
+
+        observed["sampling"] = {
+            "sampled_rows": n,
+            "failure_rate": failures / n if n else None,
+            "failure_rate_ci": [lower, upper],
+            "confidence": confidence,
+            "allowed_failure_rate": allowed,
+            "verdict": verdict,
+        }
+
+    results.meta["sampling"] = {**sampling, "confidence": confidence}
+    return failed
@@ -0,0 +1,156 @@
+"""
+Bounded Unexpected-Row Capture for Cloudflare Data Platform
+
+Instead of pulling every failing row into Python (``result_format: COMPLETE``
+with ``include_unexpected_rows``), failing rows are written by DuckDB
+into one Parquet file per expectation, capped at a configurable
+number of rows. Validation results keep only the counts, a small sample and
+a pointer to the file, so memory and result size stay bounded however bad
+the data is.
+"""
+
+import json
+import os
+import re
+import uuid
+from typing import Any
+
+import duckdb
+
+from validation_engine import (
+    quote_identifier,
+    quote_literal,
+    raised_exception,
+    unexpected_condition,
+)
+
+DEFAULT_ROW_CAP = 10_000
+DEFAULT_SAMPLE_SIZE = 20
+
+
+def default_output_root(gx_root_directory: str) -> str:
+    """``UNEXPECTED_ROWS_ROOT`` or ``uncommitted/unexpected_rows`` under the GE root"""
+    return os.getenv("UNEXPECTED_ROWS_ROOT") or os.path.join(
+        gx_root_directory, "uncommitted", "unexpected_rows"
+    )
+
+
+def failing_rows_condition(expectation: dict[str, Any], source_sql: str) -> str | None:
+    """Predicate selecting the rows behind a failed expectation (None if not row-level)"""
+    if expectation["expectation_type"] == "expect_column_values_to_be_unique":
+        column = quote_identifier(expectation["kwargs"]["column"])
+        # Semi-join on duplicated keys: memory is bounded by the number of distinct keys
+        return (
+            f"{column} IN (SELECT {column} FROM {source_sql} "
+            f"WHERE {column} IS NOT NULL GROUP BY 1 HAVING COUNT(*) > 1)"
+        )
+    return unexpected_condition(expectation)
+
+
+def capture_path(root: str, suite_name: str, run_name: str, position: int, expectation: dict[str, Any]) -> str:
+    """``{root}/{suite}/{run}/{position}-{expectation}[-{column}].parquet``"""
+    parts = [f"{position:03d}", expectation["expectation_type"].removeprefix("expect_")]
+    column = expectation["kwargs"].get("column")
+    if column:
+        parts.append(re.sub(r"[^A-Za-z0-9_.-]", "_", column))
+    return f"{root.rstrip('/')}/{suite_name}/{run_name}/{'-'.join(parts)}.parquet"
+
+
+def capture_expectation_rows(
+    conn: duckdb.DuckDBPyConnection,
+    expectation: dict[str, Any],
+    source_sql: str,
+    path: str,
+    row_cap: int = DEFAULT_ROW_CAP,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> dict[str, Any] | None:
+    """
+    Stream the failing rows of one expectation into a Parquet file
+
+    Args:
+        conn: DuckDB connection (configured for R2 when ``path`` is ``s3://``)
+        expectation: Expectation config (``expectation_type`` and ``kwargs``)
+        source_sql: FROM-clause source the expectation was validated against
+        path: Output Parquet path (local or ``s3://``)
+        row_cap: Maximum number of rows written
+        sample_size: Number of rows returned inline as a sample
+
+    Returns:
+        ``{"path", "captured_rows", "row_cap", "truncated", "sample"}`` or None
+        if the expectation is not row-level
+    """
+    condition = failing_rows_condition(expectation, source_sql)
+    if condition is None:
+        return None
+
+    if "://" not in path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # One scan keeps at most row_cap + 1 failing rows in a DuckDB temp table
+    # (nothing is materialized in Python); the extra row only tells whether
+    # the cap truncated the capture
+    table = f"_unexpected_rows_{uuid.uuid4().hex}"
+    conn.execute(
+        f"CREATE TEMP TABLE {table} AS "
+        f"SELECT * FROM {source_sql} WHERE {condition} LIMIT {int(row_cap) + 1}"
+    )
+    try:
+        matched = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        captured = conn.execute(
+            f"COPY (SELECT * FROM {table} ORDER BY rowid LIMIT {int(row_cap)}) "
+            f"TO {quote_literal(path)} (FORMAT PARQUET, COMPRESSION ZSTD)"
+        ).fetchone()[0]
+        sample = conn.execute(
+            f"SELECT * FROM {table} ORDER BY rowid LIMIT {int(min(sample_size, row_cap))}"
+        ).fetch_arrow_table().to_pylist()
+    finally:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    return {
+        "path": path,
+        "captured_rows": captured,
+        "row_cap": row_cap,
+        "truncated": matched > row_cap,
+        "sample": json.loads(json.dumps(sample, default=str)),
+    }
+
+
+def capture_unexpected_rows(
+    conn: duckdb.DuckDBPyConnection,
+    result: dict[str, Any],
+    source_sql: str,
+    output_root: str,
+    row_cap: int = DEFAULT_ROW_CAP,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> list[str]:
+    """
+    Capture failing rows for every failed row-level expectation of a result
+
+    The capture is attached to each failed entry as ``result["unexpected_rows"]``.
+
+    Args:
+        conn: DuckDB connection
+        result: GE-compatible validation result dict (modified in place)
+        source_sql: FROM-clause source the suite was validated against
+        output_root: Root directory or ``s3://`` URI for the Parquet files
+        row_cap: Maximum rows per expectation
+        sample_size: Rows kept inline per expectation
+
+    Returns:
+        Paths of the written files
+    """
+    suite_name = result["meta"]["expectation_suite_name"]
+    run_name = result["meta"]["run_id"]["run_name"]
+    paths = []
+
+    for position, entry in enumerate(result["results"]):
+        if entry["success"] or raised_exception(entry["exception_info"]):
+            continue
+        expectation = entry["expectation_config"]
+        path = capture_path(output_root, suite_name, run_name, position, expectation)
+        capture = capture_expectation_rows(conn, expectation, source_sql, path, row_cap, sample_size)
+        if capture is not None:
+            entry["result"]["unexpected_rows"] = capture
+            paths.append(path)
+
+    return paths
@@ -0,0 +1,502 @@
+"""
+Single-pass Validation Engine for Cloudflare Data Platform
+
+Compiles the table- and column-level expectations of a Great Expectations
+suite into one DuckDB aggregate query, so the Parquet files in R2 are scanned
+once per suite instead of once per expectation. Schema expectations (column
+lists, types) are answered from DESCRIBE without touching the data.
+
+The output follows the Great Expectations validation result JSON layout.
+"""
+
+import json
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+EXPECTATIONS_DIR = Path(__file__).parent.parent / "great_expectations" / "expectations"
+
+# Bronze datasets validated by the suites. Column expressions mirror the dbt
+# staging models so the suites see the same column names and types.
+DATASETS: dict[str, dict[str, Any]] = {
+    "api_posts": {
+        "suite": "api_posts_suite",
+        "prefix": "sources/api_jsonplaceholder/posts",
+        "columns": {
+            "post_id": "CAST(id AS INTEGER)",
+            "user_id": 'CAST("userId" AS INTEGER)',
+            "title": "CAST(title AS VARCHAR)",
+            "body": "CAST(body AS VARCHAR)",
+            "loaded_at": "CAST(to_timestamp(CAST(_dlt_load_id AS DOUBLE)) AS TIMESTAMP)",
+        },
+    },
+    "api_users": {
+        "suite": "api_users_suite",
+        "prefix": "sources/api_jsonplaceholder/users",
+        "columns": {
+            "user_id": "CAST(id AS INTEGER)",
+            "user_name": "CAST(name AS VARCHAR)",
+            "username": "CAST(username AS VARCHAR)",
+            "email": "CAST(email AS VARCHAR)",
+            "phone": "CAST(phone AS VARCHAR)",
+            "website": "CAST(website AS VARCHAR)",
+            "address_json": "CAST(address AS JSON)",
+            "company_json": "CAST(company AS JSON)",
+            "loaded_at": "CAST(to_timestamp(CAST(_dlt_load_id AS DOUBLE)) AS TIMESTAMP)",
+        },
+    },
+}
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a SQL identifier for DuckDB"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: Any) -> str:
+    """Render a Python value as a DuckDB SQL literal"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def load_suite(suite_name: str) -> dict[str, Any]:
+    """Load an expectation suite JSON from great_expectations/expectations/"""
+    with open(EXPECTATIONS_DIR / f"{suite_name}.json") as f:
+        return json.load(f)
+
+
+def parquet_source(paths: list[str], include_filename: bool = False) -> str:
+    """FROM-clause reading Parquet files with hive partition columns"""
+    files = ", ".join(quote_literal(path) for path in paths)
+    options = "hive_partitioning=true, union_by_name=true"
+    if include_filename:
+        options += ", filename=true"
+    return f"read_parquet([{files}], {options})"
+
+
+def dataset_source_sql(
+    dataset: str,
+    paths: list[str] | None = None,
+    bucket: str = "data-lake-raw",
+    include_filename: bool = False,
+    sample: str | None = None,
+) -> str:
+    """
+    FROM-clause for a Bronze dataset projected to its staging columns
+
+    Args:
+        dataset: Dataset name in ``DATASETS``
+        paths: Explicit Parquet files or globs (default: the whole dataset prefix)
+        bucket: R2 bucket holding the Bronze layer
+        include_filename: Also expose the source file as a ``filename`` column
+        sample: ``TABLESAMPLE`` clause applied to the Parquet scan
+
+    Returns:
+        A parenthesised subquery usable in ``SELECT ... FROM <source>``
+    """
+    spec = DATASETS[dataset]
+    paths = paths or [f"s3://{bucket}/{spec['prefix']}/**/*.parquet"]
+    columns = [
+        f"{expression} AS {quote_identifier(name)}" for name, expression in spec["columns"].items()
+    ]
+    if include_filename:
+        columns.append("filename")
+    projection = ",\n    ".join(columns)
+    source = parquet_source(paths, include_filename)
+    if sample:
+        source = f"{source} {sample}"
+    return f"(SELECT\n    {projection}\n  FROM {source}) AS src"
+
+
+# ---------------------------------------------------------------------------
+# Metric compilation
+#
+# Every row-level expectation is expressed as aggregate metrics. Apart from
+# the duplicate counts of uniqueness checks, metrics are plain sums so partial
+# results from several files can be merged.
+# ---------------------------------------------------------------------------
+
+# metric name -> (SQL aggregate, merge function)
+MetricSpec = tuple[str, str]
+
+
+def _length_condition(column: str, min_value: Any, max_value: Any) -> str:
+    length = f"LENGTH({quote_identifier(column)})"
+    bounds = []
+    if min_value is not None:
+        bounds.append(f"{length} < {quote_literal(min_value)}")
+    if max_value is not None:
+        bounds.append(f"{length} > {quote_literal(max_value)}")
+    return " OR ".join(bounds) or "FALSE"
+
+
+def _between_condition(column: str, kwargs: dict[str, Any]) -> str:
+    ident = quote_identifier(column)
+    strict_min = kwargs.get("strict_min", False)
+    strict_max = kwargs.get("strict_max", False)
+    bounds = []
+    if kwargs.get("min_value") is not None:
+        bounds.append(f"{ident} {'<=' if strict_min else '<'} {quote_literal(kwargs['min_value'])}")
+    if kwargs.get("max_value") is not None:
+        bounds.append(f"{ident} {'>=' if strict_max else '>'} {quote_literal(kwargs['max_value'])}")
+    return " OR ".join(bounds) or "FALSE"
+
+
+def unexpected_condition(expectation: dict[str, Any]) -> str | None:
+    """
+    SQL predicate selecting the rows that violate a row-level expectation
+
+    Returns None for expectations that are not row-level (table/schema/unique).
+    """
+    expectation_type = expectation["expectation_type"]
+    kwargs = expectation["kwargs"]
+    column = kwargs.get("column")
+
+    if expectation_type == "expect_column_values_to_not_be_null":
+        return f"{quote_identifier(column)} IS NULL"
+
+    if expectation_type == "expect_column_value_lengths_to_be_between":
+        condition = _length_condition(column, kwargs.get("min_value"), kwargs.get("max_value"))
+        return f"{quote_identifier(column)} IS NOT NULL AND ({condition})"
+
+    if expectation_type == "expect_column_values_to_match_regex":
+        return (
+            f"{quote_identifier(column)} IS NOT NULL AND "
+            f"NOT regexp_matches(CAST({quote_identifier(column)} AS VARCHAR), {quote_literal(kwargs['regex'])})"
+        )
+
+    if expectation_type == "expect_column_values_to_be_between":
+        return f"{quote_identifier(column)} IS NOT NULL AND ({_between_condition(column, kwargs)})"
+
+    return None
+
+
+def expectation_metrics(expectation: dict[str, Any], position: int) -> dict[str, MetricSpec]:
+    """Aggregate metrics needed to evaluate one expectation"""
+    expectation_type = expectation["expectation_type"]
+    kwargs = expectation["kwargs"]
+    column = kwargs.get("column")
+    metrics: dict[str, MetricSpec] = {"row_count": ("COUNT(*)", "sum")}
+
+    if column is not None:
+        metrics[f"nonnull:{column}"] = (f"COUNT({quote_identifier(column)})", "sum")
+
+    if expectation_type == "expect_column_values_to_be_unique":
+        # Like GE, every row of a duplicated value is unexpected, not just the
+        # repeats; histogram() counts per value within the same scan
+        histogram = f"histogram({quote_identifier(column)})"
+        metrics[f"duplicated:{column}"] = (
+            f"COALESCE(list_sum(list_filter(map_values({histogram}), n -> n > 1)), 0)",
+            "exact",
+        )
+
+    condition = unexpected_condition(expectation)
+    if condition is not None and expectation_type != "expect_column_values_to_not_be_null":
+        metrics[f"unexpected:{position}"] = (f"COUNT(*) FILTER (WHERE {condition})", "sum")
+
+    return metrics
+
+
+def _type_matches(actual: str, expected: str) -> bool:
+    actual = actual.upper()
+    expected = expected.upper()
+    return actual == expected or actual.startswith(expected + "(")
+
+
+def _mostly_success(considered: int, unexpected: int, mostly: float) -> bool:
+    """GE's ``mostly`` rule: the share of expected rows among those considered"""
+    return considered == 0 or (considered - unexpected) / considered >= mostly
+
+
+def _column_result(metrics: dict[str, Any], column: str, unexpected: int) -> dict[str, Any]:
+    element_count = metrics["row_count"]
+    nonnull = metrics[f"nonnull:{column}"]
+    missing = element_count - nonnull
+    return {
+        "element_count": element_count,
+        "missing_count": missing,
+        "missing_percent": 100.0 * missing / element_count if element_count else None,
+        "unexpected_count": unexpected,
+        "unexpected_percent": 100.0 * unexpected / nonnull if nonnull else None,
+        "unexpected_percent_total": 100.0 * unexpected / element_count if element_count else None,
+        "unexpected_percent_nonmissing": 100.0 * unexpected / nonnull if nonnull else None,
+    }
+
+
+def evaluate_expectation(
+    expectation: dict[str, Any],
+    position: int,
+    metrics: dict[str, Any],
+    column_types: dict[str, str],
+) -> tuple[bool, dict[str, Any]]:
+    """
+    Decide one expectation from precomputed metrics and the table schema
+
+    Returns:
+        (success, GE-style ``result`` dict)
+    """
+    expectation_type = expectation["expectation_type"]
+    kwargs = expectation["kwargs"]
+    column = kwargs.get("column")
+    mostly = kwargs.get("mostly", 1.0)
+
+    if expectation_type == "expect_table_row_count_to_be_between":
+        observed = metrics["row_count"]
+        success = (kwargs.get("min_value") is None or observed >= kwargs["min_value"]) and (
+            kwargs.get("max_value") is None or observed <= kwargs["max_value"]
+        )
+        return success, {"observed_value": observed}
+
+    if expectation_type == "expect_table_columns_to_match_ordered_list":
+        observed = list(column_types.keys())
+        return observed == list(kwargs["column_list"]), {"observed_value": observed}
+
+    if expectation_type == "expect_table_columns_to_match_set":
+        observed = list(column_types.keys())
+        expected = set(kwargs["column_set"])
+        if kwargs.get("exact_match", True):
+            success = set(observed) == expected
+        else:
+            success = expected.issubset(observed)
+        return success, {
+            "observed_value": observed,
+            "details": {
+                "mismatched": {
+                    "unexpected": sorted(set(observed) - expected),
+                    "missing": sorted(expected - set(observed)),
+                }
+            },
+        }
+
+    if expectation_type == "expect_column_values_to_be_in_type_list":
+        observed = column_types[column]
+        success = any(_type_matches(observed, expected) for expected in kwargs["type_list"])
+        return success, {"observed_value": observed}
+
+    if expectation_type == "expect_column_values_to_be_of_type":
+        observed = column_types[column]
+        return _type_matches(observed, kwargs["type_"]), {"observed_value": observed}
+
+    if expectation_type == "expect_column_values_to_not_be_null":
+        element_count = metrics["row_count"]
+        missing = element_count - metrics[f"nonnull:{column}"]
+        result = {
+            "element_count": element_count,
+            "unexpected_count": missing,
+            "unexpected_percent": 100.0 * missing / element_count if element_count else None,
+        }
+        return _mostly_success(element_count, missing, mostly), result
+
+    if expectation_type == "expect_column_values_to_be_unique":
+        duplicated = int(metrics[f"duplicated:{column}"])
+        result = _column_result(metrics, column, duplicated)
+        return _mostly_success(metrics[f"nonnull:{column}"], duplicated, mostly), result
+
+    if f"unexpected:{position}" in metrics:
+        unexpected = metrics[f"unexpected:{position}"]
+        result = _column_result(metrics, column, unexpected)
+        return _mostly_success(metrics[f"nonnull:{column}"], unexpected, mostly), result
+
+    raise NotImplementedError(f"Unsupported expectation type: {expectation_type}")
+
+
+SCHEMA_EXPECTATIONS = {
+    "expect_table_columns_to_match_ordered_list",
+    "expect_table_columns_to_match_set",
+    "expect_column_values_to_be_in_type_list",
+    "expect_column_values_to_be_of_type",
+}
+
+SUPPORTED_EXPECTATIONS = SCHEMA_EXPECTATIONS | {
+    "expect_table_row_count_to_be_between",
+    "expect_column_values_to_not_be_null",
+    "expect_column_values_to_be_unique",
+    "expect_column_value_lengths_to_be_between",
+    "expect_column_values_to_match_regex",
+    "expect_column_values_to_be_between",
+}
+
+
+def compile_suite(suite: dict[str, Any], mergeable_only: bool = False) -> dict[str, MetricSpec]:
+    """
+    Collect the aggregate metrics of every supported expectation in a suite
+
+    Args:
+        suite: Expectation suite (as loaded from JSON)
+        mergeable_only: Skip metrics that cannot be merged across files (duplicate counts)
+
+    Returns:
+        Ordered mapping of metric name to (SQL aggregate, merge function)
+    """
+    metrics: dict[str, MetricSpec] = {}
+    for position, expectation in enumerate(suite["expectations"]):
+        if expectation["expectation_type"] not in SUPPORTED_EXPECTATIONS:
+            continue
+        for name, spec in expectation_metrics(expectation, position).items():
+            if mergeable_only and spec[1] == "exact":
+                continue
+            metrics.setdefault(name, spec)
+    return metrics
+
+
+def describe_source(conn: duckdb.DuckDBPyConnection, source_sql: str) -> dict[str, str]:
+    """Column names and DuckDB types of a source, without scanning data"""
+    return {row[0]: row[1] for row in conn.execute(f"DESCRIBE SELECT * FROM {source_sql}").fetchall()}
+
+
+def compute_metrics(
+    conn: duckdb.DuckDBPyConnection,
+    metrics: dict[str, MetricSpec],
+    source_sql: str,
+    group_by: str | None = None,
+) -> Any:
+    """
+    Run all metric aggregates in a single scan
+
+    Args:
+        conn: DuckDB connection
+        metrics: Metrics from ``compile_suite``
+        source_sql: FROM-clause source
+        group_by: Optional grouping expression (e.g. ``filename``) to get partials per group
+
+    Returns:
+        A metrics dict, or a dict of group value -> metrics dict when ``group_by`` is set
+    """
+    names = list(metrics.keys())
+    if not names:
+        return {}
+    aggregates = ",\n  ".join(metrics[name][0] for name in names)
+
+    if group_by is None:
+        row = conn.execute(f"SELECT\n  {aggregates}\nFROM {source_sql}").fetchone()
+        return dict(zip(names, row, strict=True))
+
+    rows = conn.execute(
+        f"SELECT {group_by} AS _group,\n  {aggregates}\nFROM {source_sql}\nGROUP BY 1"
+    ).fetchall()
+    return {row[0]: dict(zip(names, row[1:], strict=True)) for row in rows}
+
+
+def raised_exception(exception_info: dict[str, Any] | None) -> str | None:
+    """
+    Exception message of an expectation that errored (None if it was evaluated)
+
+    GE reports either one ``exception_info`` dict or one per metric
+    configuration; both layouts are accepted.
+    """
+    info = exception_info or {}
+    candidates = [info] if "raised_exception" in info else [
+        value for value in info.values() if isinstance(value, dict)
+    ]
+    for candidate in candidates:
+        if candidate.get("raised_exception"):
+            return candidate.get("exception_message") or "raised an exception"
+    return None
+
+
+def build_validation_result(
+    suite: dict[str, Any],
+    metrics: dict[str, Any],
+    column_types: dict[str, str],
+    batch_spec: dict[str, Any],
+    run_name: str | None = None,
+    duration_seconds: float | None = None,
+    evaluate: Callable[..., tuple[bool, dict[str, Any]]] | None = None,
+) -> dict[str, Any]:
+    """Assemble a GE-compatible validation result from computed metrics"""
+    evaluate = evaluate or evaluate_expectation
+    results = []
+
+    for position, expectation in enumerate(suite["expectations"]):
+        entry: dict[str, Any] = {
+            "expectation_config": {
+                "expectation_type": expectation["expectation_type"],
+                "kwargs": expectation["kwargs"],
+                "meta": expectation.get("meta", {}),
+            },
+            "meta": {},
+            "exception_info": {
+                "raised_exception": False,
+                "exception_message": None,
+                "exception_traceback": None,
+            },
+        }
+        try:
+            success, result = evaluate(expectation, position, metrics, column_types)
+            entry["success"] = success
+            entry["result"] = result
+        except (KeyError, NotImplementedError) as e:
+            entry["success"] = False
+            entry["result"] = {}
+            entry["exception_info"] = {
+                "raised_exception": True,
+                "exception_message": f"{type(e).__name__}: {e}",
+                "exception_traceback": None,
+            }
+        results.append(entry)
+
+    successful = sum(1 for entry in results if entry["success"])
+    now = datetime.now(UTC)
+
+    return {
+        "success": successful == len(results),
+        "results": results,
+        "evaluation_parameters": {},
+        "statistics": {
+            "evaluated_expectations": len(results),
+            "successful_expectations": successful,
+            "unsuccessful_expectations": len(results) - successful,
+            "success_percent": 100.0 * successful / len(results) if results else None,
+        },
+        "meta": {
+            "expectation_suite_name": suite["expectation_suite_name"],
+            "great_expectations_version": suite.get("meta", {}).get("great_expectations_version"),
+            "run_id": {"run_name": run_name or uuid.uuid4().hex, "run_time": now.isoformat()},
+            "batch_spec": batch_spec,
+            "validation_time": now.strftime("%Y%m%dT%H%M%S.%fZ"),
+            "engine": "duckdb_single_pass",
+            "duration_seconds": duration_seconds,
+        },
+    }
+
+
+def validate_suite(
+    conn: duckdb.DuckDBPyConnection,
+    suite: dict[str, Any],
+    source_sql: str,
+    run_name: str | None = None,
+) -> dict[str, Any]:
+    """
+    Validate a suite against a source with one aggregate scan
+
+    Args:
+        conn: DuckDB connection (configured for R2)
+        suite: Expectation suite
+        source_sql: FROM-clause source (see ``dataset_source_sql``)
+        run_name: Optional run name for the result metadata
+
+    Returns:
+        GE-compatible validation result dict
+    """
+    started = time.perf_counter()
+    column_types = describe_source(conn, source_sql)
+    metrics = compute_metrics(conn, compile_suite(suite), source_sql)
+
+    return build_validation_result(
+        suite,
+        metrics,
+        column_types,
+        batch_spec={"query": f"SELECT * FROM {source_sql}"},
+        run_name=run_name,
+        duration_seconds=time.perf_counter() - started,
+    )
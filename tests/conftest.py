@@ -0,0 +1,19 @@
+"""
+テスト共通設定
+
+プラグイン・スクリプト・Workerのモジュールは各実行環境で `sys.path` に追加して
+インポートされるため、テストでも同じディレクトリをパスに追加します。
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for directory in (
+    "great_expectations/plugins",
+    "scripts",
+    "workers/ingestion",
+    "workers/transformation",
+):
+    sys.path.insert(0, str(ROOT / directory))
@@ -0,0 +1,123 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from footer_statistics import (
+    FooterCache,
+    aggregate_footer_statistics,
+    fetch_footer,
+    footer_metrics,
+)
+from validation_engine import DATASETS
+
+
+class RangeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class FakeS3:
+    """Serves objects from memory and honours ``Range: bytes=-N`` / ``bytes=a-b``"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.requests = []
+
+    def get_object(self, Bucket, Key, Range):
+        self.requests.append(Range)
+        data = self.objects[Key]
+        start, end = Range.removeprefix("bytes=").split("-")
+        if start == "":
+            first = max(0, len(data) - int(end))
+            last = len(data) - 1
+        else:
+            first, last = int(start), int(end)
+        return {
+            "Body": RangeBody(data[first:last + 1]),
+            "ContentRange": f"bytes {first}-{last}/{len(data)}",
+        }
+
+
+def parquet_bytes(table, row_group_size=None):
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=row_group_size)
+    return buffer.getvalue()
+
+
+def metadata_of(table, row_group_size=None):
+    return pq.read_metadata(pa.BufferReader(parquet_bytes(table, row_group_size)))
+
+
+def test_aggregates_counts_nulls_and_ranges_across_files_and_row_groups():
+    first = pa.table({"id": [3, 1, None, 7], "title": ["a", None, "b", "c"]})
+    second = pa.table({"id": [10, 2]})
+
+    statistics = aggregate_footer_statistics([metadata_of(first, row_group_size=2), metadata_of(second)])
+
+    assert statistics["row_count"] == 6
+    assert statistics["columns"]["id"] == {"null_count": 1, "min": 1, "max": 10}
+    # Missing from the second file: its rows count as nulls
+    assert statistics["columns"]["title"]["null_count"] == 3
+
+
+def test_all_null_row_group_keeps_the_range_of_the_others():
+    table = pa.table({"id": pa.array([None, None, 4, 9], type=pa.int64())})
+
+    statistics = aggregate_footer_statistics([metadata_of(table, row_group_size=2)])
+
+    assert statistics["columns"]["id"] == {"null_count": 2, "min": 4, "max": 9}
+
+
+def test_footer_metrics_decide_nullness_and_in_range_checks_only():
+    columns = DATASETS["api_posts"]["columns"]
+    statistics = {
+        "row_count": 100,
+        "columns": {
+            "id": {"null_count": 0, "min": 1, "max": 100},
+            "userId": {"null_count": 5, "min": 1, "max": 10},
+            "title": {"null_count": None, "min": None, "max": None},
+        },
+    }
+    suite = {"expectations": [
+        {"expectation_type": "expect_column_values_to_be_between",
+         "kwargs": {"column": "post_id", "min_value": 1, "max_value": 100}},
+        {"expectation_type": "expect_column_values_to_be_between",
+         "kwargs": {"column": "user_id", "min_value": 1, "max_value": 10, "strict_max": True}},
+    ]}
+
+    metrics = footer_metrics(suite, columns, statistics)
+
+    assert metrics["row_count"] == 100
+    assert metrics["nonnull:post_id"] == 100
+    assert metrics["nonnull:user_id"] == 95
+    # Unknown null counts and derived columns stay undecided
+    assert "nonnull:title" not in metrics
+    assert "nonnull:loaded_at" not in metrics
+    assert metrics["unexpected:0"] == 0
+    # max == 10 may violate strict_max: needs a scan
+    assert "unexpected:1" not in metrics
+
+
+@pytest.mark.parametrize("tail_bytes", [64 * 1024, 64])
+def test_footer_fetch_and_cache(tmp_path, tail_bytes):
+    data = parquet_bytes(pa.table({"id": list(range(1000)), "title": [f"t{i}" for i in range(1000)]}))
+    s3 = FakeS3({"posts/a.parquet": data})
+
+    footer = fetch_footer(s3, "bucket", "posts/a.parquet", tail_bytes=tail_bytes)
+    assert footer.endswith(b"PAR1")
+    assert len(s3.requests) == (1 if tail_bytes > len(footer) else 2)
+
+    cache = FooterCache(s3, "bucket", tmp_path)
+    assert cache.metadata("posts/a.parquet", "etag-1").num_rows == 1000
+    assert cache.metadata("posts/a.parquet", "etag-1").num_rows == 1000
+    assert (cache.fetched, cache.cached) == (1, 1)
+
+
+def test_non_parquet_objects_are_rejected():
+    with pytest.raises(ValueError, match="not a Parquet file"):
+        fetch_footer(FakeS3({"k": b"not parquet at all"}), "bucket", "k")
@@ -0,0 +1,114 @@
+import pyarrow as pa
+import pytest
+from pyiceberg.exceptions import CommitFailedException
+
+from iceberg_commit import IcebergCommitCoordinator
+
+
+class FakeSnapshot:
+    def __init__(self, snapshot_id):
+        self.snapshot_id = snapshot_id
+        self.parent_snapshot_id = None
+
+
+class FakeTable:
+    """append() が指定回数だけCommitFailedExceptionを投げるテーブル"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.appended = []
+        self.refreshes = 0
+        self.snapshot = None
+
+    def current_snapshot(self):
+        return self.snapshot
+
+    def append(self, data):
+        if self.failures:
+            self.failures -= 1
+            raise CommitFailedException("concurrent commit")
+        self.appended.append(data)
+        self.snapshot = FakeSnapshot(len(self.appended))
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+class FakeCatalog:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def load_table(self, identifier):
+        return self.tables[identifier]
+
+
+def batch(*values):
+    return pa.table({"id": list(values)})
+
+
+def coordinator(tables, **kwargs):
+    return IcebergCommitCoordinator(FakeCatalog(tables), sleep=lambda _: None, rng=lambda: 0.5, **kwargs)
+
+
+def test_batches_of_one_table_are_committed_as_one_snapshot():
+    table = FakeTable()
+    commits = coordinator({"db.posts": table})
+    commits.append("db.posts", batch(1, 2))
+    commits.append("db.posts", batch(3))
+    commits.append("db.posts", batch())
+
+    results = commits.commit()
+
+    assert len(table.appended) == 1
+    assert table.appended[0].column("id").to_pylist() == [1, 2, 3]
+    assert results == [{
+        "table_identifier": "db.posts",
+        "rows": 3,
+        "batches": 2,
+        "retries": 0,
+        "snapshot_id": 1,
+    }]
+    assert commits.pending_tables() == []
+
+
+def test_commit_failures_are_retried_after_refresh():
+    table = FakeTable(failures=2)
+    commits = coordinator({"db.posts": table})
+    commits.append("db.posts", batch(1))
+
+    [result] = commits.commit()
+
+    assert result["retries"] == 2
+    assert table.refreshes == 2
+    assert len(table.appended) == 1
+
+
+def test_failed_commit_keeps_the_failed_and_remaining_tables_pending():
+    posts = FakeTable()
+    users = FakeTable(failures=10)
+    comments = FakeTable()
+    commits = coordinator({"db.posts": posts, "db.users": users, "db.comments": comments}, max_retries=1)
+    commits.append("db.posts", batch(1))
+    commits.append("db.users", batch(2))
+    commits.append("db.comments", batch(3))
+
+    with pytest.raises(CommitFailedException):
+        commits.commit()
+
+    assert len(posts.appended) == 1
+    assert commits.pending_tables() == ["db.users", "db.comments"]
+
+    users.failures = 0
+    results = commits.commit()
+
+    assert [result["table_identifier"] for result in results] == ["db.users", "db.comments"]
+    assert users.appended[0].column("id").to_pylist() == [2]
+    assert commits.pending_tables() == []
+
+
+def test_backoff_is_capped():
+    commits = IcebergCommitCoordinator(
+        FakeCatalog({}), base_delay_seconds=1.0, max_delay_seconds=4.0, rng=lambda: 1.0
+    )
+
+    assert [commits._backoff_delay(attempt) for attempt in range(5)] == [1.0, 2.0, 4.0, 4.0, 4.0]
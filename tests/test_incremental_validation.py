@@ -0,0 +1,121 @@
+import duckdb
+import numpy as np
+import pytest
+
+from incremental_validation import (
+    HLL_PRECISION,
+    _evaluate_unique_from_sketch,
+    list_parquet_objects,
+    partition_of,
+    reconcile_files,
+)
+from partition_sketches import HyperLogLog
+from validation_engine import compute_metrics
+
+PREFIX = "sources/api/posts"
+UNIQUE = {"expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "id"}}
+
+
+class FakePaginator:
+    def __init__(self, keys):
+        self.keys = keys
+        self.kwargs = None
+
+    def paginate(self, **kwargs):
+        self.kwargs = kwargs
+        keys = [key for key in sorted(self.keys) if key > kwargs.get("StartAfter", "")]
+        yield {"Contents": [{"Key": key, "ETag": f'"{key[-9:]}"'} for key in keys[:2]]}
+        yield {"Contents": [{"Key": key, "ETag": f'"{key[-9:]}"'} for key in keys[2:]]}
+
+
+class FakeS3:
+    def __init__(self, keys):
+        self.paginator = FakePaginator(keys)
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return self.paginator
+
+
+def key(day, name):
+    return f"{PREFIX}/year=2026/month=10/day={day:02d}/{name}.parquet"
+
+
+def sketch_of(values):
+    sketch = HyperLogLog(HLL_PRECISION)
+    hashes = duckdb.sql(f"SELECT hash(v) FROM (VALUES {', '.join(f'({v})' for v in values)}) AS t(v)")
+    sketch.add_hashes(np.array([row[0] for row in hashes.fetchall()], dtype=np.uint64))
+    return sketch
+
+
+def test_listing_starts_at_the_watermark_partition_and_skips_other_files():
+    s3 = FakeS3([key(1, "a"), key(2, "b"), key(2, "c"), key(3, "d"), f"{PREFIX}/_manifest.json"])
+
+    listed = list_parquet_objects(s3, "bucket", PREFIX, "year=2026/month=10/day=02")
+
+    assert s3.paginator.kwargs["StartAfter"] == f"{PREFIX}/year=2026/month=10/day=02"
+    assert sorted(listed) == [key(2, "b"), key(2, "c"), key(3, "d")]
+    assert partition_of(key(3, "d")) == "year=2026/month=10/day=03"
+    assert partition_of(f"{PREFIX}/_manifest.json") is None
+
+
+def test_reconcile_drops_files_deleted_inside_the_listed_range():
+    known = {key(1, "a"): "e1", key(2, "b"): "e2", key(2, "c"): "e3"}
+    listed = {key(2, "c"): "e3-new", key(3, "d"): "e4"}
+
+    files = reconcile_files(known, listed, PREFIX, "year=2026/month=10/day=02")
+
+    assert files == {key(1, "a"): "e1", key(2, "c"): "e3-new", key(3, "d"): "e4"}
+    assert reconcile_files(known, listed, PREFIX, None) == listed
+
+
+def test_unique_passes_from_the_sketch_without_a_scan():
+    def exact_metrics(specs):
+        raise AssertionError("no scan expected")
+
+    metrics = {"row_count": 5, "nonnull:id": 4}
+    success, result = _evaluate_unique_from_sketch(
+        UNIQUE, 0, metrics, {"id": sketch_of([1, 2, 3, 4])}, exact_metrics
+    )
+
+    assert success is True
+    assert result["unexpected_count"] == 0
+    assert result["details"]["approximate"] is True
+
+
+def test_unique_falls_back_to_exact_duplicates_below_the_row_count():
+    source = "(SELECT * FROM (VALUES (1), (2), (2), (3), (NULL)) AS t(id)) AS src"
+    conn = duckdb.connect()
+    scanned = []
+
+    def exact_metrics(specs):
+        scanned.append(specs)
+        return compute_metrics(conn, specs, source)
+
+    metrics = {"row_count": 5, "nonnull:id": 4}
+    success, result = _evaluate_unique_from_sketch(
+        UNIQUE, 0, metrics, {"id": sketch_of([1, 2, 3])}, exact_metrics
+    )
+
+    assert len(scanned) == 1
+    assert success is False
+    assert result["unexpected_count"] == 2
+    assert result["missing_count"] == 1
+    assert result["details"]["approximate"] is False
+
+
+@pytest.mark.parametrize("mostly, expected", [(0.5, True), (0.9, False)])
+def test_exact_fallback_honours_mostly(mostly, expected):
+    source = "(SELECT * FROM (VALUES (1), (2), (2), (3)) AS t(id)) AS src"
+    conn = duckdb.connect()
+    expectation = {**UNIQUE, "kwargs": {"column": "id", "mostly": mostly}}
+
+    success, _ = _evaluate_unique_from_sketch(
+        expectation,
+        0,
+        {"row_count": 4, "nonnull:id": 4},
+        {"id": sketch_of([1, 2, 3])},
+        lambda specs: compute_metrics(conn, specs, source),
+    )
+
+    assert success is expected
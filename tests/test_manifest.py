@@ -0,0 +1,106 @@
+import json
+from datetime import UTC, datetime
+
+import duckdb
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+
+from manifest import (
+    MANIFEST_NAME,
+    build_manifest_entries,
+    load_id_of,
+    update_manifest_for_load,
+)
+from r2_manifest import create_manifest_macros
+
+SOURCE = "api_jsonplaceholder"
+TABLE = "posts"
+LOAD_ID = "1705305600.123"  # 2024-01-15 08:00:00 UTC
+OLD_LOAD_ID = "1705219200.5"  # 2024-01-14 08:00:00 UTC
+
+
+@pytest.fixture
+def fs():
+    return LocalFileSystem(auto_mkdir=True)
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    return str(tmp_path / "data-lake-raw")
+
+
+def write_file(fs, bucket, load_id, name, data=b"parquet"):
+    day = datetime.fromtimestamp(float(load_id), UTC)
+    key = (
+        f"sources/{SOURCE}/{TABLE}/year={day.year}/month={day.month:02d}/day={day.day:02d}/"
+        f"{load_id}.{name}.parquet"
+    )
+    fs.pipe_file(f"{bucket}/{key}", data)
+    return key
+
+
+def read_manifest(fs, bucket):
+    text = fs.cat_file(f"{bucket}/sources/{SOURCE}/{TABLE}/{MANIFEST_NAME}").decode()
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_load_id_of_file_names():
+    assert load_id_of("sources/a/posts/year=2024/month=01/day=15/1705305600.123.abc.parquet") == LOAD_ID
+    assert load_id_of("1705305600.123.abc.0.parquet") == LOAD_ID
+
+
+def test_entries_carry_partition_values_and_single_file_row_counts():
+    files = [{"name": "bucket/sources/a/posts/year=2024/month=01/day=15/x.parquet", "size": 10, "ETag": '"e"'}]
+
+    [entry] = build_manifest_entries("bucket", "posts", LOAD_ID, files, row_count=100)
+
+    assert entry["key"] == "sources/a/posts/year=2024/month=01/day=15/x.parquet"
+    assert (entry["year"], entry["month"], entry["day"]) == (2024, 1, 15)
+    assert entry["etag"] == "e"
+    assert entry["rows"] == 100
+
+    two = build_manifest_entries("bucket", "posts", LOAD_ID, files * 2, row_count=100)
+    assert [entry["rows"] for entry in two] == [None, None]
+
+
+def test_first_append_bootstraps_existing_files(fs, bucket):
+    old_key = write_file(fs, bucket, OLD_LOAD_ID, "old")
+    new_key = write_file(fs, bucket, LOAD_ID, "new")
+
+    summary = update_manifest_for_load(fs, bucket, SOURCE, TABLE, LOAD_ID, row_count=7)
+
+    assert summary["files"] == 1
+    entries = {entry["key"]: entry for entry in read_manifest(fs, bucket)}
+    assert set(entries) == {old_key, new_key}
+    assert entries[old_key]["rows"] is None
+    assert entries[new_key]["rows"] == 7
+    assert entries[new_key]["load_id"] == LOAD_ID
+
+
+def test_replace_rewrites_the_manifest_with_the_load_only(fs, bucket):
+    write_file(fs, bucket, OLD_LOAD_ID, "old")
+    update_manifest_for_load(fs, bucket, SOURCE, TABLE, OLD_LOAD_ID)
+    new_key = write_file(fs, bucket, LOAD_ID, "new")
+
+    update_manifest_for_load(fs, bucket, SOURCE, TABLE, LOAD_ID, row_count=3, write_disposition="replace")
+
+    assert [entry["key"] for entry in read_manifest(fs, bucket)] == [new_key]
+
+
+def test_load_without_files_leaves_the_manifest_alone(fs, bucket):
+    assert update_manifest_for_load(fs, bucket, SOURCE, TABLE, LOAD_ID) == {"uri": None, "files": 0}
+    assert not fs.exists(f"{bucket}/sources/{SOURCE}/{TABLE}/{MANIFEST_NAME}")
+
+
+def test_duckdb_macro_reads_the_worker_manifest(fs, bucket):
+    key = write_file(fs, bucket, LOAD_ID, "new")
+    update_manifest_for_load(fs, bucket, SOURCE, TABLE, LOAD_ID, row_count=5)
+    conn = duckdb.connect()
+    create_manifest_macros(conn)
+
+    rows = conn.execute(
+        "SELECT key, rows, year, month, day, load_id FROM bronze_manifest(?)",
+        [f"{bucket}/sources/{SOURCE}/{TABLE}/{MANIFEST_NAME}"],
+    ).fetchall()
+
+    assert rows == [(key, 5, 2024, 1, 15, LOAD_ID)]
@@ -0,0 +1,160 @@
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from partition_sketches import (
+    HyperLogLog,
+    SketchStore,
+    TDigest,
+    compute_partition_sketches,
+    merge_sketches,
+)
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def store(conn, tmp_path):
+    return SketchStore(conn, str(tmp_path / "_sketches"))
+
+
+def ids_source(start, stop, extra=()):
+    values = ", ".join(f"({value})" for value in [*range(start, stop), *extra])
+    return f"(SELECT CAST(id AS BIGINT) AS id, 'post ' || id AS title FROM (VALUES {values}) AS t(id))"
+
+
+def test_hll_estimates_distinct_count_and_merges():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**63, size=50_000, dtype=np.uint64) * np.uint64(2)
+
+    left, right = HyperLogLog(14), HyperLogLog(14)
+    left.add_hashes(hashes[:30_000])
+    right.add_hashes(hashes[20_000:])
+    merged = left.merge(right)
+
+    assert merged.count() == pytest.approx(50_000, rel=4 * merged.relative_error)
+    restored = HyperLogLog.from_bytes(merged.to_bytes(), 14)
+    assert restored.count() == merged.count()
+
+
+def test_hll_rejects_different_precisions():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_tdigest_quantiles_and_merge():
+    values = np.arange(1, 10_001, dtype=np.float64)
+    digest = TDigest.from_values(values[:5000]).merge(TDigest.from_values(values[5000:]))
+
+    assert digest.total_weight == 10_000
+    assert digest.quantile(0.5) == pytest.approx(5000, rel=0.01)
+    assert digest.quantile(0.99) == pytest.approx(9900, rel=0.01)
+    assert digest.cdf(2500) == pytest.approx(0.25, abs=0.01)
+    assert TDigest().quantile(0.5) is None
+
+
+def test_partition_sketches_have_exact_counts_and_bounds(conn):
+    sketches = compute_partition_sketches(
+        conn,
+        "(SELECT * FROM (VALUES (1, 'a'), (2, 'bbb'), (2, NULL), (NULL, 'cc')) AS t(id, title))",
+        "day=1",
+    )
+    rows = {row["column_name"]: row for row in sketches.to_pylist()}
+
+    assert rows["id"]["row_count"] == 4
+    assert rows["id"]["null_count"] == 1
+    assert rows["id"]["distinct_count"] == 2
+    assert (rows["id"]["min_numeric"], rows["id"]["max_numeric"]) == (1.0, 2.0)
+    assert rows["title"]["digest_of"] == "length"
+    assert (rows["title"]["min_value"], rows["title"]["max_value"]) == ("a", "cc")
+
+
+def test_merge_keeps_numeric_order_of_min_max(conn):
+    first = compute_partition_sketches(conn, ids_source(9, 10), "day=1", ["id"])
+    second = compute_partition_sketches(conn, ids_source(10, 12), "day=2", ["id"])
+    merged = merge_sketches(pa.concat_tables([first, second]))["id"]
+
+    assert merged["partitions"] == 2
+    assert merged["row_count"] == 3
+    assert (merged["min_value"], merged["max_value"]) == ("9", "11")
+
+
+def test_summary_reads_sidecars_back(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 100))
+    store.sketch_partition("api_posts", "day=2", ids_source(100, 200))
+
+    summary = store.summary("api_posts")
+
+    assert store.list_partitions("api_posts") == ["day=1", "day=2"]
+    assert summary["id"]["row_count"] == 200
+    assert summary["id"]["partitions"] == 2
+    assert summary["id"]["distinct_estimate"] == pytest.approx(200, rel=0.05)
+
+
+def test_unique_passes_only_when_sketches_prove_it(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 50), ["id"])
+    store.sketch_partition("api_posts", "day=2", ids_source(50, 101), ["id"])
+
+    result = store.check_unique("api_posts", "id")
+
+    assert result["success"] is True
+    assert result["verdict"] == "pass"
+    assert result["duplicates"] == 0
+
+
+def test_unique_fails_on_a_single_duplicate_within_a_partition(store):
+    # 101 rows, one duplicated id: within the HLL tolerance, but not unique
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 100, extra=[42]), ["id"])
+
+    result = store.check_unique("api_posts", "id")
+
+    assert result["success"] is False
+    assert result["verdict"] == "fail"
+
+
+def test_unique_across_overlapping_partitions_is_inconclusive_without_a_source(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 60), ["id"])
+    store.sketch_partition("api_posts", "day=2", ids_source(59, 101), ["id"])
+
+    result = store.check_unique("api_posts", "id")
+
+    assert result["success"] is None
+    assert result["verdict"] == "inconclusive"
+
+
+def test_unique_falls_back_to_an_exact_scan(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 60), ["id"])
+    store.sketch_partition("api_posts", "day=2", ids_source(59, 101), ["id"])
+
+    duplicated = store.check_unique(
+        "api_posts", "id", source_sql=f"(SELECT * FROM {ids_source(0, 60)} UNION ALL SELECT * FROM {ids_source(59, 101)})"
+    )
+    unique = store.check_unique("api_posts", "id", source_sql=ids_source(0, 101))
+
+    assert (duplicated["method"], duplicated["success"], duplicated["duplicates"]) == ("exact", False, 1)
+    assert (unique["method"], unique["success"], unique["duplicates"]) == ("exact", True, 0)
+
+
+def test_drift_without_a_baseline(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 100), ["id"])
+
+    result = store.drift("api_posts", "id", "day=1")
+
+    assert result["ks_distance"] is None
+    assert result["has_baseline"] is False
+    assert result["current_weight"] == 100
+
+
+def test_drift_detects_a_shifted_distribution(store):
+    store.sketch_partition("api_posts", "day=1", ids_source(0, 1000), ["id"])
+    store.sketch_partition("api_posts", "day=2", ids_source(0, 1000), ["id"])
+    store.sketch_partition("api_posts", "day=3", ids_source(5000, 6000), ["id"])
+
+    assert store.drift("api_posts", "id", "day=2")["ks_distance"] < 0.6
+    assert store.drift("api_posts", "id", "day=3")["ks_distance"] > 0.9
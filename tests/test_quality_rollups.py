@@ -0,0 +1,137 @@
+from datetime import UTC, date, datetime, timedelta
+
+import duckdb
+import pytest
+
+from quality_rollups import QualityRollups
+from validation_result_store import ValidationResultStore
+
+TODAY = date.today()
+
+
+def result(run_name, day, outcomes, asset="api_posts"):
+    """Validation result dict with ``outcomes = [(expectation_type, column, success, unexpected)]``"""
+    return {
+        "meta": {
+            "expectation_suite_name": f"{asset}_suite",
+            "run_id": {"run_name": run_name, "run_time": datetime(day.year, day.month, day.day, 6, tzinfo=UTC)},
+            "active_batch_definition": {"data_asset_name": asset},
+            "duration_seconds": 2.0,
+        },
+        "results": [
+            {
+                "expectation_config": {"expectation_type": expectation_type, "kwargs": {"column": column}},
+                "success": success,
+                "result": {"element_count": 100, "missing_count": 5, "unexpected_count": unexpected},
+                "exception_info": {"raised_exception": False},
+            }
+            for expectation_type, column, success, unexpected in outcomes
+        ],
+    }
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def rollups(conn, tmp_path):
+    store_root = str(tmp_path / "results")
+    store = ValidationResultStore(conn, store_root)
+    store.write(result("r1", TODAY - timedelta(days=1), [("expect_column_values_to_not_be_null", "id", True, 0)]))
+    store.write(result("r2", TODAY, [
+        ("expect_column_values_to_not_be_null", "id", False, 5),
+        ("expect_column_values_to_be_unique", "id", True, 0),
+    ]))
+    return QualityRollups(conn, rollup_db=str(tmp_path / "rollups.duckdb"), result_store_root=store_root, datasets={})
+
+
+def test_expectation_rollup_aggregates_per_day_and_expectation(rollups):
+    assert rollups.refresh() == {"expectations": 3, "ingestion": 0}
+
+    summary = rollups.summary(TODAY - timedelta(days=7))
+    assert (summary["evaluations"], summary["passed"], summary["failed"]) == (3, 2, 1)
+    assert summary["success_rate"] == pytest.approx(2 / 3)
+    assert rollups.dataset_names() == ["api_posts"]
+
+    trend = rollups.trend(TODAY - timedelta(days=7))
+    assert trend[["passed", "failed"]].values.tolist() == [[1, 0], [1, 1]]
+
+    [failure] = rollups.failures(TODAY - timedelta(days=7)).to_dict("records")
+    assert (failure["Column"], failure["Failed Runs"], failure["Unexpected Values"]) == ("id", 1, 5)
+
+
+def test_incremental_refresh_replaces_only_recent_days(rollups, conn, tmp_path):
+    rollups.refresh()
+    ValidationResultStore(conn, str(tmp_path / "results")).write(
+        result("r3", TODAY, [("expect_column_values_to_not_be_null", "id", True, 0)])
+    )
+
+    rollups.refresh(lookback_days=0)
+
+    assert rollups.summary(TODAY - timedelta(days=7))["evaluations"] == 4
+    # A full rebuild gives the same rollup
+    rollups.refresh(full=True)
+    assert rollups.summary(TODAY - timedelta(days=7))["evaluations"] == 4
+
+
+def test_rollup_file_is_detached_between_operations(rollups, tmp_path):
+    rollups.refresh()
+    rollups.summary(TODAY)
+
+    assert rollups.conn.execute(
+        "SELECT COUNT(*) FROM duckdb_databases() WHERE database_name = 'quality_rollups'"
+    ).fetchone()[0] == 0
+    # Another writer (e.g. the CLI refresh) can open the file while the dashboard is open
+    with duckdb.connect(str(tmp_path / "rollups.duckdb")) as writer:
+        assert writer.execute("SELECT COUNT(*) FROM daily_expectation_rollup").fetchone()[0] == 3
+
+
+def test_queries_attach_read_only(rollups):
+    rollups.refresh()
+
+    with rollups.attached(), pytest.raises(duckdb.Error, match="read-only"):
+        rollups.conn.execute("DELETE FROM quality_rollups.daily_expectation_rollup")
+
+
+def test_dashboard_queries_before_the_first_refresh(conn, tmp_path):
+    rollups = QualityRollups(conn, rollup_db=str(tmp_path / "new" / "rollups.duckdb"), datasets={})
+
+    assert rollups.dataset_names() == []
+    assert rollups.summary(TODAY)["success_rate"] is None
+
+
+def test_schema_changes_rows_anomalies_and_scores(rollups):
+    days = [TODAY - timedelta(days=offset) for offset in range(6, -1, -1)]
+    with rollups.attached(read_only=False):
+        rollups.conn.executemany(
+            "INSERT INTO quality_rollups.daily_ingestion_rollup VALUES (?, 'api_posts', 1, ?, 1000, 1, NULL)",
+            [(day, 10_000 if day == TODAY else 100 + index) for index, day in enumerate(days)],
+        )
+        schema = [(day, "api_posts", "id", "BIGINT") for day in days[-3:]]
+        schema += [(days[-1], "api_posts", "title", "VARCHAR"), (days[-2], "api_posts", "body", "VARCHAR")]
+        rollups.conn.executemany("INSERT INTO quality_rollups.daily_schema VALUES (?, ?, ?, ?)", schema)
+    rollups.refresh_expectations()
+
+    changes = rollups.schema_changes(TODAY - timedelta(days=7))
+    assert sorted(zip(changes["Change Type"], changes["Column"], strict=True)) == [
+        ("Column Added", "body"),
+        ("Column Added", "title"),
+        ("Column Removed", "body"),
+    ]
+
+    rows = rollups.daily_rows(TODAY - timedelta(days=7))
+    assert len(rows) == 7
+    assert rows["upper_bound"].notna().all()
+
+    [score] = rollups.scores(TODAY - timedelta(days=6)).to_dict("records")
+    assert score["Timeliness"] == pytest.approx(100.0)
+    assert score["Validity"] == pytest.approx(100 * 2 / 3)
+    assert score["Completeness"] == pytest.approx(95.0)
+    assert score["Consistency"] == pytest.approx(100 * (1 - 2 / 3))
+
+    severities = [item[0] for item in rollups.recommendations(TODAY - timedelta(days=7))]
+    assert severities.count("🟢 Info") == 3
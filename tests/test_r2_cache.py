@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+import r2_cache
+from r2_cache import CachedR2FileSystem, RangeCache
+
+
+class EtagMemoryFileSystem(MemoryFileSystem):
+    """In-memory stand-in for s3fs that reports an ETag and counts range reads"""
+
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = {}
+        self.pseudo_dirs = [""]
+        self.range_reads = 0
+
+    def info(self, path, **kwargs):
+        return {**super().info(path, **kwargs), "ETag": '"etag-1"'}
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        self.range_reads += 1
+        return super().cat_file(path, start=start, end=end, **kwargs)
+
+
+def index_rows(cache, sql):
+    with sqlite3.connect(f"{cache.directory}/index.sqlite3") as db:
+        return db.execute(sql).fetchall()
+
+
+def total_matches_blocks(cache):
+    [(running,)] = index_rows(cache, "SELECT bytes FROM usage")
+    [(summed,)] = index_rows(cache, "SELECT COALESCE(SUM(size), 0) FROM blocks")
+    return running == summed
+
+
+def test_hits_are_buffered_until_flush(tmp_path):
+    cache = RangeCache(str(tmp_path), block_size=4)
+    cache.put("b", "k", "e", 0, b"abcd")
+    [(written_at,)] = index_rows(cache, "SELECT last_access FROM blocks")
+
+    assert cache.get("b", "k", "e", 0) == b"abcd"
+    assert cache.get("b", "k", "e", 1) is None
+
+    assert index_rows(cache, "SELECT last_access FROM blocks") == [(written_at,)]
+    assert ("hits", 1) not in index_rows(cache, "SELECT name, value FROM stats")
+
+    cache.flush()
+
+    [(accessed_at,)] = index_rows(cache, "SELECT last_access FROM blocks")
+    assert accessed_at > written_at
+    assert {"hits": 1, "misses": 1}.items() <= dict(index_rows(cache, "SELECT name, value FROM stats")).items()
+
+
+def test_flush_after_batch_of_hits(tmp_path, monkeypatch):
+    monkeypatch.setattr(r2_cache, "ACCESS_FLUSH_BLOCKS", 3)
+    cache = RangeCache(str(tmp_path), block_size=4)
+    cache.put("b", "k", "e", 0, b"abcd")
+
+    for _ in range(3):
+        cache.get("b", "k", "e", 0)
+
+    assert dict(index_rows(cache, "SELECT name, value FROM stats"))["hits"] == 3
+
+
+def test_running_total_tracks_puts_replacements_and_eviction(tmp_path):
+    cache = RangeCache(str(tmp_path), max_bytes=9, block_size=4)
+    for block in range(2):
+        cache.put("b", "k", "e", block, b"abcd")
+    cache.put("b", "k", "e", 1, b"ab")
+    assert total_matches_blocks(cache)
+    assert cache.stats()["disk_bytes"] == 6
+
+    # Block 0 was read after block 1 was written: block 1 is evicted first
+    cache.get("b", "k", "e", 0)
+    cache.put("b", "k", "e", 2, b"abcd")
+
+    assert [path.rsplit(".", 1)[1] for (path,) in index_rows(cache, "SELECT path FROM blocks ORDER BY block")] == [
+        "0",
+        "2",
+    ]
+    assert total_matches_blocks(cache)
+    assert cache.stats()["process"]["evictions"] == 1
+
+    cache.clear()
+    assert cache.stats()["disk_bytes"] == 0
+
+
+def test_running_total_is_seeded_for_existing_indexes(tmp_path):
+    cache = RangeCache(str(tmp_path), block_size=4)
+    cache.put("b", "k", "e", 0, b"abcd")
+    with sqlite3.connect(tmp_path / "index.sqlite3") as db:
+        db.execute("DROP TABLE usage")
+
+    assert RangeCache(str(tmp_path), block_size=4).stats()["disk_bytes"] == 4
+
+
+@pytest.mark.parametrize("start, end", [(0, 10), (3, 9), (5, 6)])
+def test_filesystem_reads_ranges_through_the_cache(tmp_path, start, end):
+    remote = EtagMemoryFileSystem()
+    remote.pipe_file("bucket/key.parquet", b"0123456789")
+    filesystem = CachedR2FileSystem(RangeCache(str(tmp_path), block_size=4), remote)
+
+    assert filesystem.cat_file("s3://bucket/key.parquet", start=start, end=end) == b"0123456789"[start:end]
+    reads = remote.range_reads
+    assert filesystem.cat_file("s3://bucket/key.parquet", start=start, end=end) == b"0123456789"[start:end]
+    assert remote.range_reads == reads
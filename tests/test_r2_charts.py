@@ -0,0 +1,104 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2_charts import MAX_POINTS, downsample_series, histogram_bins, lttb, top_values
+from r2_dataset import R2Dataset
+
+
+class LocalDataset(R2Dataset):
+    @property
+    def uri(self) -> str:
+        return f"{self.bucket}/{self.path}"
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    conn = duckdb.connect()
+    conn.execute(
+        f"""
+        COPY (
+            SELECT
+                range AS id,
+                TIMESTAMP '2024-01-01' + to_seconds(range) AS ts,
+                sin(range / 100.0) + CASE WHEN range = 5000 THEN 10 ELSE 0 END AS value,
+                CASE WHEN range % 10 = 0 THEN NULL ELSE 'v' || (range % 4) END AS label
+            FROM range(10000)
+        ) TO '{tmp_path}/part-0.parquet' (FORMAT PARQUET)
+        """
+    )
+    yield LocalDataset(conn, str(tmp_path), "*.parquet", hive_partitioning=False)
+    conn.close()
+
+
+def test_lttb_keeps_endpoints_and_the_outlier():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[437] = 50.0
+
+    indices = lttb(x, y, 20)
+
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 437 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_returns_everything_below_the_threshold():
+    x = np.arange(5, dtype=float)
+    assert list(lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb(x, x, 2)) == [0, 1, 2, 3, 4]
+
+
+def test_histogram_bins_cover_every_value(dataset):
+    result = histogram_bins(dataset, "id", bins=10)
+
+    assert len(result) == 10
+    assert result["count"].sum() == 10000
+    assert result["count"].tolist() == [1000] * 10
+    assert result["bin_start"].iloc[0] == 0
+    # The maximum falls into the last bin, not an extra one
+    assert result["bin_end"].iloc[-1] == 9999
+
+
+def test_histogram_with_known_bounds_and_temporal_edges(dataset):
+    assert histogram_bins(dataset, "id", bins=4, bounds=(0, 9999))["count"].sum() == 10000
+
+    temporal = histogram_bins(dataset, "ts", bins=5)
+    assert temporal["bin_start"].iloc[0] == pd.Timestamp("2024-01-01", tz="UTC")
+    assert temporal["count"].sum() == 10000
+
+
+def test_constant_column_lands_in_a_single_bin(tmp_path):
+    conn = duckdb.connect()
+    conn.execute(f"COPY (SELECT 7 AS v FROM range(3)) TO '{tmp_path}/c.parquet' (FORMAT PARQUET)")
+
+    result = histogram_bins(LocalDataset(conn, str(tmp_path), "c.parquet"), "v", bins=10)
+
+    assert result["count"].tolist() == [3]
+
+
+def test_top_values_with_other_and_null_buckets(dataset):
+    result = top_values(dataset, "label", k=2)
+
+    assert result["value"].tolist()[-1] == "(other)"
+    assert result["count"].sum() == 10000
+    assert len(result) == 3
+
+    assert "(null)" in top_values(dataset, "label", k=10)["value"].tolist()
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsampled_series_is_bounded_and_keeps_the_spike(dataset, method):
+    result = downsample_series(dataset, "ts", "value", points=100, method=method)
+
+    assert len(result) <= 100
+    assert result["ts"].is_monotonic_increasing
+    assert result["value"].max() == pytest.approx(10 + np.sin(50.0))
+    assert str(result["ts"].dtype).startswith("datetime64")
+
+
+def test_unknown_downsampling_method(dataset):
+    with pytest.raises(ValueError, match="Unknown downsampling method"):
+        downsample_series(dataset, "ts", "value", points=MAX_POINTS, method="mean")
@@ -0,0 +1,66 @@
+import duckdb
+import pandas as pd
+import pytest
+
+import r2_profile
+from r2_dataset import R2Dataset
+from r2_profile import profile_dataset
+
+
+class LocalDataset(R2Dataset):
+    """R2Dataset over a local directory (same code path once the URI is resolved)"""
+
+    @property
+    def uri(self) -> str:
+        return f"{self.bucket}/{self.path}"
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    conn = duckdb.connect()
+    conn.execute(
+        f"""
+        COPY (
+            SELECT * FROM (VALUES
+                (1, 'a', [1, 2]), (2, NULL, [3]), (3, 'c', NULL), (3, 'c', NULL), (NULL, 'e', [4])
+            ) AS t(id, title, tags)
+        ) TO '{tmp_path}/part-0.parquet' (FORMAT PARQUET)
+        """
+    )
+    r2_profile.clear_cache()
+    yield LocalDataset(conn, str(tmp_path), "*.parquet", hive_partitioning=False)
+    conn.close()
+
+
+def test_one_scan_computes_every_column_statistic(dataset):
+    profile = profile_dataset(dataset)
+
+    assert profile.row_count == 5
+    assert profile.duplicate_rows == 1
+    assert profile.null_counts == {"id": 1, "title": 1, "tags": 2}
+
+    id_stats = profile.column("id")
+    assert (id_stats["Min"], id_stats["Max"]) == ("1", "3")
+    assert id_stats["Distinct (approx.)"] == 3
+    assert id_stats["Mean"] == pytest.approx(2.25)
+    assert id_stats["Null %"] == pytest.approx(20.0)
+
+    # Lists get distinct counts but no ordering or numeric statistics
+    tags = profile.column("tags")
+    assert tags["Distinct (approx.)"] == 3
+    assert pd.isna(tags["Min"]) and pd.isna(tags["Mean"])
+
+    metrics = dict(profile.quality_metrics().itertuples(index=False))
+    assert metrics["Total Missing Values"] == 4
+    assert metrics["Columns with Missing Values"] == 3
+
+
+def test_profiles_are_cached_per_file_list(dataset, tmp_path):
+    first = profile_dataset(dataset)
+    assert profile_dataset(dataset) is first
+
+    dataset.conn.execute(f"COPY (SELECT 9 AS id, 'z' AS title, [9] AS tags) TO '{tmp_path}/part-1.parquet'")
+    dataset.refresh()
+
+    assert profile_dataset(dataset).row_count == 6
+    assert profile_dataset(dataset, refresh=True) is not first
@@ -0,0 +1,101 @@
+import duckdb
+import pytest
+
+from r2_dataset import R2Dataset
+from r2_query_cache import QueryCache, list_versions, normalize_sql
+
+
+class LocalDataset(R2Dataset):
+    @property
+    def uri(self) -> str:
+        return f"{self.bucket}/{self.path}"
+
+
+class FakeS3:
+    """``list_objects_v2`` paginator over a mutable ``{key: etag}`` listing"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.lists = 0
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        self.lists += 1
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        for start in range(0, len(keys), 2):
+            yield {"Contents": [{"Key": key, "ETag": f'"{self.objects[key]}"'} for key in keys[start:start + 2]]}
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        ("SELECT  *\n\tFROM t;", "SELECT * FROM t"),
+        ("SELECT 1 -- comment\n, 2 /* block\ncomment */ FROM t ;;", "SELECT 1 , 2 FROM t"),
+        ("SELECT 'a  -- not a comment' AS \"x  y\"", "SELECT 'a  -- not a comment' AS \"x  y\""),
+        ("SELECT 'it''s   here'", "SELECT 'it''s   here'"),
+    ],
+)
+def test_normalize_sql(sql, expected):
+    assert normalize_sql(sql) == expected
+
+
+def test_equivalent_queries_share_a_key():
+    assert normalize_sql("SELECT *  FROM t") == normalize_sql("SELECT * FROM t -- again\n")
+    assert normalize_sql("SELECT 'a b'") != normalize_sql("SELECT 'a  b'")
+
+
+def test_list_versions_filters_the_prefix_by_the_glob():
+    s3 = FakeS3({"posts/a.parquet": "1", "posts/b.json": "2", "posts/x/c.parquet": "3", "users/a.parquet": "4"})
+    dataset = R2Dataset(None, "bucket", "posts/*.parquet")
+
+    assert list_versions(dataset, s3) == {"s3://bucket/posts/a.parquet": "1", "s3://bucket/posts/x/c.parquet": "3"}
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def dataset(conn, tmp_path):
+    conn.execute(f"COPY (SELECT range AS id FROM range(100)) TO '{tmp_path}/part-0.parquet' (FORMAT PARQUET)")
+    return LocalDataset(conn, str(tmp_path), "*.parquet", hive_partitioning=False)
+
+
+def test_results_are_cached_until_the_file_versions_change(conn, dataset, tmp_path):
+    s3 = FakeS3({"part-0.parquet": "v1"})
+    cache = QueryCache(s3_client=s3, version_ttl=0)
+    sql = "SELECT COUNT(*) AS n FROM data"
+
+    assert cache.run(conn, sql, dataset, view="data").column("n")[0].as_py() == 100
+    assert cache.run(conn, sql + "  ;", dataset, view="data").column("n")[0].as_py() == 100
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    conn.execute(f"COPY (SELECT range AS id FROM range(5)) TO '{tmp_path}/part-1.parquet' (FORMAT PARQUET)")
+    s3.objects["part-1.parquet"] = "v1"
+
+    assert cache.run(conn, sql, dataset, view="data").column("n")[0].as_py() == 105
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicted_results_spill_and_are_promoted_back(conn, dataset, tmp_path):
+    cache = QueryCache(
+        max_bytes=1,
+        spill_dir=str(tmp_path / "spill"),
+        s3_client=FakeS3({"part-0.parquet": "v1"}),
+        version_ttl=60,
+    )
+
+    first = cache.run(conn, "SELECT * FROM data", dataset, view="data")
+    again = cache.run(conn, "SELECT * FROM data", dataset, view="data")
+
+    assert again.equals(first)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate(dataset.uri)
+    assert list((tmp_path / "spill").iterdir()) == []
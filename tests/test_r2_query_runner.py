@@ -0,0 +1,120 @@
+import duckdb
+import pytest
+
+from r2_dataset import R2Dataset
+from r2_query_cache import QueryCache
+from r2_query_runner import (
+    CANCELLED,
+    FAILED,
+    SUCCEEDED,
+    TIMED_OUT,
+    QueryRunner,
+    capped_sql,
+)
+
+SLOW_SQL = "SELECT COUNT(*) FROM range(1000000000000) AS a(x) WHERE x % 7 = 3"
+
+
+class LocalDataset(R2Dataset):
+    @property
+    def uri(self) -> str:
+        return f"{self.bucket}/{self.path}"
+
+
+class FakeS3:
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {"Contents": [{"Key": "part-0.parquet", "ETag": '"v1"'}]}
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        ("SELECT * FROM df;", "SELECT * FROM (SELECT * FROM df) AS capped LIMIT 11"),
+        ("with t as (select 1) select * from t", "SELECT * FROM (with t as (select 1) select * from t) AS capped LIMIT 11"),
+        ("FROM df -- all", "SELECT * FROM (FROM df) AS capped LIMIT 11"),
+        ("(SELECT 1)", "SELECT * FROM ((SELECT 1)) AS capped LIMIT 11"),
+        ("DESCRIBE df", "DESCRIBE df"),
+        ("SET threads = 2;", "SET threads = 2"),
+    ],
+)
+def test_capped_sql_wraps_row_queries_only(sql, expected):
+    assert capped_sql(sql, 10) == expected
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def dataset(conn, tmp_path):
+    conn.execute(f"COPY (SELECT range AS id FROM range(250)) TO '{tmp_path}/part-0.parquet' (FORMAT PARQUET)")
+    return LocalDataset(conn, str(tmp_path), "*.parquet", hive_partitioning=False)
+
+
+def run(runner, sql, timeout=30):
+    job = runner.submit(sql)
+    assert job.wait(timeout)
+    return job
+
+
+def test_result_is_capped_and_paged(conn, dataset):
+    runner = QueryRunner(conn, dataset, row_cap=120, page_size=50)
+
+    job = run(runner, "SELECT id FROM df ORDER BY id")
+
+    assert job.status == SUCCEEDED
+    assert job.truncated
+    assert job.row_count == 120
+    assert job.page_count == 3
+    assert job.page(2)["id"].tolist() == list(range(100, 120))
+    # Out-of-range page numbers are clamped
+    assert job.page(99)["id"].tolist() == list(range(100, 120))
+    assert job.progress() == 100.0
+
+
+def test_uncapped_result_is_not_truncated(conn, dataset):
+    job = run(QueryRunner(conn, dataset, row_cap=250), "SELECT * FROM df")
+
+    assert (job.status, job.truncated, job.row_count) == (SUCCEEDED, False, 250)
+
+
+def test_errors_are_reported(conn, dataset):
+    job = run(QueryRunner(conn, dataset), "SELECT missing FROM df")
+
+    assert job.status == FAILED
+    assert "missing" in job.error
+    assert job.page().empty
+
+
+def test_results_come_from_the_cache_on_rerun(conn, dataset):
+    runner = QueryRunner(conn, dataset, cache=QueryCache(s3_client=FakeS3()))
+
+    first = run(runner, "SELECT COUNT(*) AS n FROM df")
+    second = run(runner, "SELECT COUNT(*) AS n  FROM df;")
+
+    assert (first.cached, second.cached) == (False, True)
+    assert second.table.equals(first.table)
+
+
+def test_timeout_interrupts_the_query(conn, dataset):
+    job = run(QueryRunner(conn, dataset, timeout=0.2), SLOW_SQL)
+
+    assert job.status == TIMED_OUT
+    assert job.table is None
+
+
+def test_cancel_and_resubmit(conn, dataset):
+    runner = QueryRunner(conn, dataset, timeout=None)
+    slow = runner.submit(SLOW_SQL)
+
+    quick = run(runner, "SELECT 1 AS one")
+
+    assert slow.wait(30)
+    assert slow.status == CANCELLED, slow.error
+    assert quick.status == SUCCEEDED
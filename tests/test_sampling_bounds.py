@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sampling_bounds import annotate_sampling_bounds, wilson_interval
+from validation_engine import raised_exception
+
+
+def expectation_result(expectation_type, result, success=True, mostly=None, exception_info=None):
+    kwargs = {"column": "id"} if mostly is None else {"column": "id", "mostly": mostly}
+    return SimpleNamespace(
+        expectation_config=SimpleNamespace(expectation_type=expectation_type, kwargs=kwargs),
+        result=result,
+        success=success,
+        exception_info=exception_info or {"raised_exception": False},
+    )
+
+
+def validation(*results):
+    return SimpleNamespace(results=list(results), meta={})
+
+
+def test_wilson_interval_matches_reference_values():
+    lower, upper = wilson_interval(10, 100)
+    assert lower == pytest.approx(0.0552, abs=1e-4)
+    assert upper == pytest.approx(0.1744, abs=1e-4)
+
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    lower, upper = wilson_interval(0, 50)
+    assert lower == 0.0
+    assert upper == pytest.approx(0.0713, abs=1e-4)
+
+
+def test_wilson_interval_narrows_with_sample_size():
+    small = wilson_interval(5, 100)
+    large = wilson_interval(500, 10_000)
+    assert large[1] - large[0] < small[1] - small[0]
+    assert large[0] < 0.05 < large[1]
+
+
+def test_verdicts_against_the_allowed_failure_rate():
+    row_level = "expect_column_values_to_match_regex"
+    clean = expectation_result(row_level, {"element_count": 1000, "unexpected_count": 0})
+    strict = expectation_result(row_level, {"element_count": 1000, "unexpected_count": 1}, success=False)
+    clearly_ok = expectation_result(row_level, {"element_count": 10_000, "unexpected_count": 100}, mostly=0.95)
+    borderline = expectation_result(row_level, {"element_count": 100, "unexpected_count": 5}, mostly=0.95)
+    clearly_bad = expectation_result(
+        row_level, {"element_count": 10_000, "unexpected_count": 1_000}, success=False, mostly=0.95
+    )
+    results = validation(clean, strict, clearly_ok, borderline, clearly_bad)
+
+    failed = annotate_sampling_bounds(results, {"method": "bernoulli", "rate": 0.1})
+
+    verdicts = [entry.result["sampling"]["verdict"] for entry in results.results]
+    assert verdicts == ["pass", "fail", "pass", "inconclusive", "fail"]
+    assert failed == [row_level, row_level]
+    assert results.meta["sampling"] == {"method": "bernoulli", "rate": 0.1, "confidence": 0.95}
+
+
+def test_missing_values_are_excluded_from_the_sample_size():
+    entry = expectation_result(
+        "expect_column_values_to_be_between",
+        {"element_count": 120, "missing_count": 20, "unexpected_count": 10},
+        success=False,
+        mostly=0.5,
+    )
+    annotate_sampling_bounds(validation(entry), {"method": "bernoulli", "rate": 0.5})
+
+    assert entry.result["sampling"]["sampled_rows"] == 100
+    assert entry.result["sampling"]["failure_rate"] == 0.1
+
+
+def test_row_count_is_scaled_and_errors_are_reported():
+    row_count = expectation_result("expect_table_row_count_to_be_between", {"observed_value": 30})
+    errored = expectation_result(
+        "expect_column_values_to_be_unique",
+        None,
+        success=False,
+        exception_info={"metric-id": {"raised_exception": True, "exception_message": "boom"}},
+    )
+    results = validation(row_count, errored)
+
+    failed = annotate_sampling_bounds(
+        results, {"method": "file", "files_total": 10, "files_sampled": 3, "rate": 0.3}
+    )
+
+    assert row_count.result["sampling"] == {"estimated_row_count": 100}
+    assert errored.result["sampling"] == {"verdict": "error", "error": "boom"}
+    assert failed == ["expect_column_values_to_be_unique"]
+
+
+def test_raised_exception_reads_flat_and_nested_layouts():
+    assert raised_exception(None) is None
+    assert raised_exception({"raised_exception": False, "exception_message": None}) is None
+    assert raised_exception({"raised_exception": True, "exception_message": "flat"}) == "flat"
+    assert raised_exception({
+        "a": {"raised_exception": False},
+        "b": {"raised_exception": True, "exception_message": None},
+    }) == "raised an exception"
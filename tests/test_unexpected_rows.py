@@ -0,0 +1,70 @@
+import duckdb
+import pyarrow.parquet as pq
+import pytest
+
+from unexpected_rows import capture_expectation_rows, capture_path, capture_unexpected_rows
+
+SOURCE = "(SELECT * FROM range(10) AS t(id)) AS src"
+ABOVE_FIVE = {
+    "expectation_type": "expect_column_values_to_be_between",
+    "kwargs": {"column": "id", "min_value": 0, "max_value": 5},
+}
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("row_cap, captured, truncated", [(2, 2, True), (4, 4, False), (10, 4, False)])
+def test_capture_is_capped_and_reports_truncation(conn, tmp_path, row_cap, captured, truncated):
+    path = str(tmp_path / "rows" / "between.parquet")
+
+    capture = capture_expectation_rows(conn, ABOVE_FIVE, SOURCE, path, row_cap=row_cap, sample_size=3)
+
+    assert capture["captured_rows"] == captured
+    assert capture["truncated"] is truncated
+    assert pq.read_table(path).num_rows == captured
+    assert len(capture["sample"]) == min(3, captured)
+    assert all(row["id"] > 5 for row in capture["sample"])
+    # The temp table is dropped again
+    assert conn.execute("SELECT COUNT(*) FROM duckdb_tables() WHERE temporary").fetchone()[0] == 0
+
+
+def test_unique_capture_returns_every_row_of_duplicated_values(conn, tmp_path):
+    source = "(SELECT * FROM (VALUES (1, 'a'), (2, 'b'), (2, 'c'), (NULL, 'd'), (NULL, 'e')) AS t(id, v)) AS src"
+    expectation = {"expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "id"}}
+
+    capture = capture_expectation_rows(conn, expectation, source, str(tmp_path / "u.parquet"))
+
+    assert sorted(row["v"] for row in capture["sample"]) == ["b", "c"]
+
+
+def test_capture_for_a_result_skips_passed_errored_and_table_level_entries(conn, tmp_path):
+    def entry(expectation, success, exception_info=None):
+        return {
+            "expectation_config": expectation,
+            "success": success,
+            "result": {},
+            "exception_info": exception_info or {"raised_exception": False},
+        }
+
+    row_count = {"expectation_type": "expect_table_row_count_to_be_between", "kwargs": {"min_value": 100}}
+    result = {
+        "meta": {"expectation_suite_name": "suite", "run_id": {"run_name": "run"}},
+        "results": [
+            entry(ABOVE_FIVE, True),
+            entry(ABOVE_FIVE, False),
+            entry(ABOVE_FIVE, False, {"metric": {"raised_exception": True, "exception_message": "x"}}),
+            entry(row_count, False),
+        ],
+    }
+
+    paths = capture_unexpected_rows(conn, result, SOURCE, str(tmp_path))
+
+    assert paths == [capture_path(str(tmp_path), "suite", "run", 1, ABOVE_FIVE)]
+    assert paths[0].endswith("suite/run/001-column_values_to_be_between-id.parquet")
+    assert result["results"][1]["result"]["unexpected_rows"]["captured_rows"] == 4
+    assert "unexpected_rows" not in result["results"][2]["result"]
@@ -0,0 +1,137 @@
+import duckdb
+import pytest
+
+from validation_engine import compile_suite, compute_metrics, validate_suite
+
+SOURCE = "(SELECT * FROM (VALUES {rows}) AS t(id, title)) AS src"
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    yield connection
+    connection.close()
+
+
+def source(rows):
+    return SOURCE.format(rows=", ".join(f"({id_}, {title})" for id_, title in rows))
+
+
+def suite(*expectations):
+    return {
+        "expectation_suite_name": "test_suite",
+        "expectations": [
+            {"expectation_type": expectation_type, "kwargs": kwargs}
+            for expectation_type, kwargs in expectations
+        ],
+    }
+
+
+def results(conn, rows, *expectations):
+    return validate_suite(conn, suite(*expectations), source(rows))["results"]
+
+
+def test_unique_counts_every_row_of_a_duplicated_value(conn):
+    rows = [(1, "'a'"), (2, "'b'"), (2, "'c'"), (3, "'d'"), (3, "'e'"), (3, "'f'"), ("NULL", "'g'")]
+    [result] = results(conn, rows, ("expect_column_values_to_be_unique", {"column": "id"}))
+
+    assert result["success"] is False
+    assert result["result"]["element_count"] == 7
+    assert result["result"]["missing_count"] == 1
+    assert result["result"]["unexpected_count"] == 5
+    assert result["result"]["unexpected_percent"] == pytest.approx(100 * 5 / 6)
+
+
+def test_unique_passes_without_duplicates_and_on_empty_input(conn):
+    [result] = results(conn, [(1, "'a'"), (2, "'b'")], ("expect_column_values_to_be_unique", {"column": "id"}))
+    assert result["success"] is True
+    assert result["result"]["unexpected_count"] == 0
+
+    empty = "(SELECT 1 AS id WHERE FALSE) AS src"
+    validation = validate_suite(conn, suite(("expect_column_values_to_be_unique", {"column": "id"})), empty)
+    assert validation["success"] is True
+
+
+def test_unique_honours_mostly(conn):
+    rows = [(i, "'x'") for i in range(1, 9)] + [(9, "'y'"), (9, "'z'")]
+    lenient, strict = results(
+        conn,
+        rows,
+        ("expect_column_values_to_be_unique", {"column": "id", "mostly": 0.8}),
+        ("expect_column_values_to_be_unique", {"column": "id", "mostly": 0.81}),
+    )
+
+    assert lenient["result"]["unexpected_count"] == 2
+    assert lenient["success"] is True
+    assert strict["success"] is False
+
+
+def test_not_null_honours_mostly_over_all_rows(conn):
+    rows = [(1, "'a'"), (2, "NULL"), (3, "'c'"), (4, "'d'")]
+    lenient, strict, exact = results(
+        conn,
+        rows,
+        ("expect_column_values_to_not_be_null", {"column": "title", "mostly": 0.75}),
+        ("expect_column_values_to_not_be_null", {"column": "title", "mostly": 0.9}),
+        ("expect_column_values_to_not_be_null", {"column": "title"}),
+    )
+
+    assert lenient["result"] == {"element_count": 4, "unexpected_count": 1, "unexpected_percent": 25.0}
+    assert lenient["success"] is True
+    assert strict["success"] is False
+    assert exact["success"] is False
+
+
+def test_row_level_expectations_ignore_nulls_and_honour_mostly(conn):
+    rows = [(1, "'ab'"), (2, "'abcdef'"), (3, "NULL"), (4, "'abc'")]
+    lengths, regex, between = results(
+        conn,
+        rows,
+        ("expect_column_value_lengths_to_be_between", {"column": "title", "min_value": 1, "max_value": 3}),
+        ("expect_column_values_to_match_regex", {"column": "title", "regex": "^ab", "mostly": 0.5}),
+        ("expect_column_values_to_be_between", {"column": "id", "min_value": 1, "max_value": 4, "strict_max": True}),
+    )
+
+    assert lengths["success"] is False
+    assert lengths["result"]["unexpected_count"] == 1
+    assert lengths["result"]["missing_count"] == 1
+    assert regex["success"] is True
+    assert between["result"]["unexpected_count"] == 1
+
+
+def test_schema_and_row_count_expectations(conn):
+    rows = [(1, "'a'"), (2, "'b'")]
+    row_count, ordered, type_list = results(
+        conn,
+        rows,
+        ("expect_table_row_count_to_be_between", {"min_value": 3}),
+        ("expect_table_columns_to_match_ordered_list", {"column_list": ["id", "title"]}),
+        ("expect_column_values_to_be_in_type_list", {"column": "id", "type_list": ["INTEGER", "BIGINT"]}),
+    )
+
+    assert row_count["success"] is False
+    assert row_count["result"]["observed_value"] == 2
+    assert ordered["success"] is True
+    assert type_list["success"] is True
+
+
+def test_mergeable_metrics_exclude_duplicate_counts_and_group_by_file(conn):
+    metrics = compile_suite(
+        suite(
+            ("expect_column_values_to_be_unique", {"column": "id"}),
+            ("expect_column_values_to_not_be_null", {"column": "title"}),
+        ),
+        mergeable_only=True,
+    )
+    assert "duplicated:id" not in metrics
+
+    grouped = compute_metrics(
+        conn,
+        metrics,
+        "(SELECT * FROM (VALUES ('a', 1, 'x'), ('a', 1, NULL), ('b', 2, 'y')) AS t(filename, id, title)) AS src",
+        group_by="filename",
+    )
+    assert grouped == {
+        "a": {"row_count": 2, "nonnull:id": 2, "nonnull:title": 1},
+        "b": {"row_count": 1, "nonnull:id": 1, "nonnull:title": 1},
+    }
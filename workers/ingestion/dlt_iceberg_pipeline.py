@@ -13,6 +13,8 @@ import json
 from typing import Iterator, Dict, Any
 from datetime import datetime
 
+from manifest import get_filesystem, update_manifest_for_load
+
 
 # データソース定義（dlt_pipeline.pyと同じ）
 @dlt.resource(name="posts", write_disposition="append")
@@ -218,6 +220,22 @@ async def on_fetch(request, env):
         else:
             raise ValueError(f"Unknown source type: {source_type}")
 
+        # Rawレイヤーに書き込んだファイルをマニフェストに登録
+        fs = get_filesystem(r2_access_key, r2_secret_key, r2_account_id)
+        row_counts = pipeline.last_trace.last_normalize_info.row_counts
+        manifest = [
+            update_manifest_for_load(
+                fs,
+                r2_bucket_raw,
+                source="api_jsonplaceholder",
+                table=source_type,
+                load_id=load_id,
+                row_count=row_counts.get(source_type),
+                write_disposition=pipeline.default_schema.get_table(source_type).get("write_disposition", "append"),
+            )
+            for load_id in info.loads_ids
+        ]
+
         # ステップ2: IcebergテーブルをCurated Layerに作成
         iceberg_table = await create_iceberg_table(
             env,
@@ -233,7 +251,8 @@ async def on_fetch(request, env):
             "raw_layer": {
                 "bucket": r2_bucket_raw,
                 "path": f"s3://{r2_bucket_raw}/sources/api_jsonplaceholder/{source_type}/year={now.year}/month={now.month:02d}/day={now.day:02d}/",
-                "format": "parquet"
+                "format": "parquet",
+                "manifest": manifest
             },
             "curated_layer": {
                 "bucket": r2_bucket_curated,
@@ -9,6 +9,8 @@ import dlt
 import json
 from typing import Iterator, Dict, Any
 
+from manifest import get_filesystem, update_manifest_for_load
+
 
 # サンプルデータソース: JSONPlaceholder API
 @dlt.resource(name="posts", write_disposition="replace")
@@ -172,6 +174,25 @@ async def on_fetch(request, env):
         else:
             raise ValueError(f"Unknown source type: {source_type}")
 
+        # 書き込んだファイルをテーブルごとのマニフェストに登録
+        # 読み取り側はグロブによる再帰LISTの代わりにマニフェストからファイル一覧を取得する
+        fs = get_filesystem(r2_access_key, r2_secret_key, r2_account_id)
+        row_counts = pipeline.last_trace.last_normalize_info.row_counts
+        manifests = {
+            table: update_manifest_for_load(
+                fs,
+                r2_bucket_name,
+                source="api_jsonplaceholder",
+                table=table,
+                load_id=load_id,
+                row_count=row_count,
+                write_disposition=pipeline.default_schema.get_table(table).get("write_disposition", "append"),
+            )
+            for load_id in info.loads_ids
+            for table, row_count in row_counts.items()
+            if not table.startswith("_dlt")
+        }
+
         # 実行結果を返す
         result = {
             "success": True,
@@ -189,6 +210,7 @@ async def on_fetch(request, env):
                 }
                 for load in (info.loads if hasattr(info, 'loads') else [])
             ],
+            "manifests": manifests,
             "message": f"Successfully loaded data from {source_type} to Bronze Layer (data-lake-raw)",
             "timestamp": str(dlt.common.time.timestamp())
         }
@@ -0,0 +1,246 @@
+"""
+Bronze テーブルのオブジェクトマニフェスト
+
+ロードごとに書き込まれたファイル（キー・サイズ・ETag・行数・パーティション値・ロードID）を
+テーブル直下の `_manifest.jsonl` に追記します。読み取り側（dbt・Great Expectations・marimo）は
+`**/*.parquet` のグロブで再帰LISTする代わりに、このファイルを1回GETするだけでファイル一覧を得られます。
+
+    s3://{bucket}/sources/{source}/{table}/_manifest.jsonl
+
+1行1ファイルのJSON Lines形式:
+
+    {"key": "sources/api_jsonplaceholder/posts/year=2024/month=01/day=15/1705305600.123.abc.parquet",
+     "size": 12345, "etag": "…", "rows": 100, "year": 2024, "month": 1, "day": 15,
+     "load_id": "1705305600.123", "table": "posts", "written_at": "2024-01-15T08:00:00+00:00"}
+
+R2には追記APIがないため読み込み→追記→書き戻しで更新します。
+同じテーブルへのロードは同時に1つだけ実行される前提です（Cron / キュー単位で直列化）。
+
+- マニフェストがまだないテーブルは、最初のロード時にテーブル配下を1回だけ再帰LISTして
+  既存ファイルを登録します（ブートストラップ）。読み取り側はマニフェストがあればそれだけを
+  信頼するため、既存ファイルが欠落しないようにするためです
+- `write_disposition="replace"` のロードではdltが既存ファイルを削除するので、
+  マニフェストも今回のロード分だけに書き換えます
+
+ロード前に既存テーブルのマニフェストを作る場合:
+
+    python workers/ingestion/manifest.py --source api_jsonplaceholder --table posts
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any
+
+MANIFEST_NAME = "_manifest.jsonl"
+PARTITION_PATTERN = re.compile(r"year=(\d+)/month=(\d+)/day=(\d+)/")
+
+
+def manifest_key(table_prefix: str) -> str:
+    """テーブルプレフィックス（例: sources/api_jsonplaceholder/posts）のマニフェストキー"""
+    return f"{table_prefix.strip('/')}/{MANIFEST_NAME}"
+
+
+def get_filesystem(access_key_id: str, secret_access_key: str, account_id: str):
+    """R2用のs3fsファイルシステム（dlt[filesystem] に含まれる）"""
+    import s3fs
+
+    return s3fs.S3FileSystem(
+        key=access_key_id,
+        secret=secret_access_key,
+        client_kwargs={
+            "endpoint_url": f"https://{account_id}.r2.cloudflarestorage.com",
+            "region_name": "auto",
+        },
+    )
+
+
+def list_load_files(fs, bucket: str, table_prefix: str, load_id: str) -> list[dict[str, Any]]:
+    """
+    今回のロードで書き込まれたファイルを取得
+
+    dltのレイアウト `{table}/year=/month=/day=/{load_id}.{file_id}.{ext}` の日付はロードIDの
+    タイムスタンプなので、そのパーティションディレクトリだけを（再帰なしで）LISTします。
+    """
+    loaded_at = datetime.fromtimestamp(float(load_id), UTC)
+    directory = (
+        f"{bucket}/{table_prefix.strip('/')}/"
+        f"year={loaded_at.year}/month={loaded_at.month:02d}/day={loaded_at.day:02d}"
+    )
+    if not fs.exists(directory):
+        return []
+
+    entries = fs.ls(directory, detail=True, refresh=True)
+    return [
+        entry for entry in entries
+        if entry["type"] == "file" and entry["name"].rsplit("/", 1)[-1].startswith(f"{load_id}.")
+    ]
+
+
+def list_table_files(fs, bucket: str, table_prefix: str) -> list[dict[str, Any]]:
+    """
+    テーブル配下の全データファイルを取得（ブートストラップ用の再帰LIST）
+
+    dltのパーティションレイアウトに一致するファイルだけを対象とし、
+    `_manifest.jsonl` などの `_` で始まるファイルは除外します。
+    """
+    entries = fs.find(f"{bucket}/{table_prefix.strip('/')}", detail=True, refresh=True)
+    return [
+        entry for entry in entries.values()
+        if entry["type"] == "file"
+        and not entry["name"].rsplit("/", 1)[-1].startswith("_")
+        and PARTITION_PATTERN.search(entry["name"])
+    ]
+
+
+def load_id_of(key: str) -> str:
+    """ファイル名 `{load_id}.{file_id}.{ext}` からロードID（例: 1705305600.123）を取得"""
+    return ".".join(key.rsplit("/", 1)[-1].split(".")[:2])
+
+
+def build_manifest_entries(
+    bucket: str,
+    table: str,
+    load_id: str,
+    files: list[dict[str, Any]],
+    row_count: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    マニフェストの行を作成
+
+    Args:
+        bucket: バケット名
+        table: テーブル名
+        load_id: dltのロードID
+        files: `list_load_files` の結果
+        row_count: テーブルの行数（dltの正規化結果）。ファイルが1つの場合のみそのファイルの行数として記録
+    """
+    written_at = datetime.now(UTC).isoformat()
+    entries = []
+    for entry in sorted(files, key=lambda item: item["name"]):
+        key = entry["name"][len(bucket) + 1:]
+        match = PARTITION_PATTERN.search(key)
+        entries.append({
+            "key": key,
+            "size": entry.get("size"),
+            "etag": (entry.get("ETag") or entry.get("etag") or "").strip('"') or None,
+            "rows": row_count if len(files) == 1 else None,
+            "year": int(match.group(1)) if match else None,
+            "month": int(match.group(2)) if match else None,
+            "day": int(match.group(3)) if match else None,
+            "load_id": load_id,
+            "table": table,
+            "written_at": written_at,
+        })
+    return entries
+
+
+def append_manifest(fs, bucket: str, table_prefix: str, entries: list[dict[str, Any]]) -> str:
+    """
+    マニフェストに行を追記（既存キーは置き換え）
+
+    Returns:
+        マニフェストのURI
+    """
+    path = f"{bucket}/{manifest_key(table_prefix)}"
+    existing = fs.cat_file(path).decode() if fs.exists(path) else ""
+
+    new_keys = {entry["key"] for entry in entries}
+    kept = [json.loads(line) for line in existing.splitlines() if line.strip()]
+    kept = [entry for entry in kept if entry["key"] not in new_keys]
+
+    return write_manifest(fs, bucket, table_prefix, kept + entries)
+
+
+def write_manifest(fs, bucket: str, table_prefix: str, entries: list[dict[str, Any]]) -> str:
+    """
+    マニフェストを `entries` で置き換え
+
+    Returns:
+        マニフェストのURI
+    """
+    path = f"{bucket}/{manifest_key(table_prefix)}"
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in entries]
+    fs.pipe_file(path, ("\n".join(lines) + "\n").encode())
+    return f"s3://{path}"
+
+
+def bootstrap_manifest(fs, bucket: str, table_prefix: str, table: str) -> dict[str, Any]:
+    """
+    既存ファイルからマニフェストを作成（テーブル配下を1回だけ再帰LIST）
+
+    既にマニフェストがある場合は何もしません。既存ファイルの行数は分からないため
+    `rows` は記録しません（`manifest_row_count` はNoneを返し、読み取り側は従来どおり行数を数えます）。
+
+    Returns:
+        サマリー（URI・登録ファイル数・新規作成したか）
+    """
+    path = f"{bucket}/{manifest_key(table_prefix)}"
+    if fs.exists(path):
+        return {"uri": f"s3://{path}", "files": None, "created": False}
+
+    files_by_load: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for entry in list_table_files(fs, bucket, table_prefix):
+        files_by_load[load_id_of(entry["name"])].append(entry)
+
+    entries = [
+        manifest_entry
+        for load_id in sorted(files_by_load)
+        for manifest_entry in build_manifest_entries(bucket, table, load_id, files_by_load[load_id])
+    ]
+    return {"uri": write_manifest(fs, bucket, table_prefix, entries), "files": len(entries), "created": True}
+
+
+def update_manifest_for_load(
+    fs,
+    bucket: str,
+    source: str,
+    table: str,
+    load_id: str,
+    row_count: int | None = None,
+    write_disposition: str = "append",
+) -> dict[str, Any]:
+    """
+    1回のロード分のファイルをマニフェストに登録
+
+    Args:
+        write_disposition: テーブルのwrite disposition。`replace` の場合dltが既存ファイルを
+            削除しているため、マニフェストを今回のロード分だけに書き換えます。
+            それ以外でマニフェストがまだない場合は、既存ファイルから作成してから追記します
+
+    Returns:
+        レスポンス用のサマリー（URIと登録ファイル数）
+    """
+    table_prefix = f"sources/{source}/{table}"
+    files = list_load_files(fs, bucket, table_prefix, load_id)
+    entries = build_manifest_entries(bucket, table, load_id, files, row_count)
+    if not entries:
+        return {"uri": None, "files": 0}
+
+    if write_disposition == "replace":
+        uri = write_manifest(fs, bucket, table_prefix, entries)
+    else:
+        # 今回のファイルも含めて登録され、下の追記で行数付きの行に置き換わる
+        bootstrap_manifest(fs, bucket, table_prefix, table)
+        uri = append_manifest(fs, bucket, table_prefix, entries)
+
+    return {"uri": uri, "files": len(entries)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="既存のBronzeファイルからテーブルのマニフェストを作成")
+    parser.add_argument("--source", required=True, help="ソース名（例: api_jsonplaceholder）")
+    parser.add_argument("--table", required=True, action="append", help="テーブル名（複数指定可）")
+    parser.add_argument("--bucket", default=os.getenv("R2_BUCKET_NAME", "data-lake-raw"))
+    args = parser.parse_args()
+
+    filesystem = get_filesystem(
+        os.environ["R2_ACCESS_KEY_ID"], os.environ["R2_SECRET_ACCESS_KEY"], os.environ["R2_ACCOUNT_ID"]
+    )
+    for table_name in args.table:
+        summary = bootstrap_manifest(filesystem, args.bucket, f"sources/{args.source}/{table_name}", table_name)
+        status = f"{summary['files']} files" if summary["created"] else "already exists"
+        print(f"{table_name}: {summary['uri']} ({status})")
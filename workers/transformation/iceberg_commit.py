@@ -0,0 +1,251 @@
+"""
+Icebergコミットコーディネーター
+
+取り込みWorker・定期変換・バックフィルが同じIcebergテーブルへ同時にコミットしても
+実行が失敗しないよう、楽観的同時実行制御（OCC）のリトライを行います。
+
+- CommitFailedException発生時にテーブルメタデータをリフレッシュして再コミット
+- ジッター付き指数バックオフ
+- 排他書き込み（バックフィル等）では、競合スナップショットとのパーティション重複を検出
+- 1回の実行内の小さなappendを1スナップショットにまとめる
+"""
+
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pyarrow as pa
+from pyiceberg.exceptions import CommitFailedException
+from pyiceberg.types import DateType, TimestampType, TimestamptzType
+
+
+class CommitConflictError(Exception):
+    """排他書き込み対象のパーティションに、並行スナップショットが書き込んでいた場合のエラー"""
+
+
+class IcebergCommitCoordinator:
+    """
+    複数のappendをテーブル単位でバッファリングし、リトライ付きでコミットする
+
+    使用例:
+        coordinator = IcebergCommitCoordinator(catalog)
+        coordinator.append("analytics.api_jsonplaceholder.posts", batch_1)
+        coordinator.append("analytics.api_jsonplaceholder.posts", batch_2)
+        coordinator.commit()  # 1テーブルにつき1スナップショット
+    """
+
+    def __init__(
+        self,
+        catalog,
+        max_retries: int = 5,
+        base_delay_seconds: float = 0.2,
+        max_delay_seconds: float = 10.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            catalog: PyIcebergカタログ
+            max_retries: CommitFailedException発生時の最大リトライ回数
+            base_delay_seconds: バックオフの初期待機時間（秒）
+            max_delay_seconds: バックオフの上限待機時間（秒）
+            sleep: 待機関数（テスト時に差し替え可能）
+            rng: 0〜1の乱数を返す関数（ジッター用）
+        """
+        self.catalog = catalog
+        self.max_retries = max_retries
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._sleep = sleep
+        self._rng = rng
+        self._pending: dict[str, list[pa.Table]] = {}
+        self._exclusive: dict[str, bool] = {}
+        self._base_snapshot_ids: dict[str, int | None] = {}
+
+    def append(
+        self,
+        table_identifier: str,
+        data: pa.Table,
+        exclusive: bool = False,
+        base_snapshot_id: int | None = None,
+    ) -> None:
+        """
+        appendをバッファに追加（commit()まで書き込まない）
+
+        Args:
+            table_identifier: テーブル識別子（例: analytics.api_jsonplaceholder.posts）
+            data: 追加するArrowテーブル
+            exclusive: Trueの場合、同じパーティションへの並行書き込みを競合として扱う
+                （バックフィルなど、パーティションの内容を所有する書き込み向け）
+            base_snapshot_id: 競合検出の基準スナップショットID
+                （省略時はcommit()開始時点の最新スナップショット）
+        """
+        if data.num_rows == 0:
+            return
+
+        self._pending.setdefault(table_identifier, []).append(data)
+        self._exclusive[table_identifier] = self._exclusive.get(table_identifier, False) or exclusive
+        if base_snapshot_id is not None:
+            self._base_snapshot_ids[table_identifier] = base_snapshot_id
+
+    def pending_tables(self) -> list[str]:
+        """未コミットのappendがあるテーブル一覧"""
+        return list(self._pending.keys())
+
+    def commit(self) -> list[dict[str, Any]]:
+        """
+        バッファ済みのappendをテーブルごとに1スナップショットとしてコミット
+
+        バッファはコミットに成功したテーブルの分だけ削除します。途中のテーブルで失敗した場合、
+        それ以前のテーブルはコミット済みのままですが、失敗したテーブルと未処理のテーブルの
+        appendはバッファに残るため、commit()を再実行できます。
+
+        Returns:
+            テーブルごとのコミット結果のリスト
+        """
+        results = []
+
+        for table_identifier in list(self._pending.keys()):
+            results.append(
+                self._commit_table(
+                    table_identifier,
+                    self._pending[table_identifier],
+                    self._exclusive.get(table_identifier, False),
+                    self._base_snapshot_ids.get(table_identifier),
+                )
+            )
+
+            del self._pending[table_identifier]
+            self._exclusive.pop(table_identifier, None)
+            self._base_snapshot_ids.pop(table_identifier, None)
+
+        return results
+
+    def _commit_table(
+        self,
+        table_identifier: str,
+        batches: list[pa.Table],
+        exclusive: bool,
+        base_snapshot_id: int | None,
+    ) -> dict[str, Any]:
+        """1テーブル分のappendをリトライ付きでコミット"""
+        data = pa.concat_tables(batches) if len(batches) > 1 else batches[0]
+
+        table = self.catalog.load_table(table_identifier)
+        if base_snapshot_id is None:
+            base_snapshot_id = _current_snapshot_id(table)
+
+        write_partitions = _partition_keys(table, data) if exclusive else set()
+
+        attempt = 0
+        while True:
+            if exclusive:
+                self._check_conflicts(table, table_identifier, base_snapshot_id, write_partitions)
+
+            try:
+                table.append(data)
+                break
+            except CommitFailedException:
+                if attempt >= self.max_retries:
+                    raise
+
+                self._sleep(self._backoff_delay(attempt))
+                attempt += 1
+                table.refresh()
+
+        return {
+            "table_identifier": table_identifier,
+            "rows": data.num_rows,
+            "batches": len(batches),
+            "retries": attempt,
+            "snapshot_id": _current_snapshot_id(table),
+        }
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """フルジッター付き指数バックオフの待機時間"""
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt))
+        return self._rng() * ceiling
+
+    def _check_conflicts(
+        self,
+        table,
+        table_identifier: str,
+        base_snapshot_id: int | None,
+        write_partitions: set[tuple[Any, ...]],
+    ) -> None:
+        """基準スナップショット以降のスナップショットが同じパーティションに書き込んでいないか確認"""
+        for snapshot in _snapshots_since(table, base_snapshot_id):
+            overlap = write_partitions & _snapshot_partitions(table, snapshot)
+            if overlap:
+                raise CommitConflictError(
+                    f"Concurrent snapshot {snapshot.snapshot_id} on {table_identifier} "
+                    f"wrote to {len(overlap)} partition(s) owned by this commit: "
+                    f"{sorted(overlap, key=str)[:5]}"
+                )
+
+
+def _current_snapshot_id(table) -> int | None:
+    snapshot = table.current_snapshot()
+    return snapshot.snapshot_id if snapshot is not None else None
+
+
+def _snapshots_since(table, base_snapshot_id: int | None) -> list[Any]:
+    """現在のスナップショットから基準スナップショットまで親を辿る（基準は含まない）"""
+    snapshots = []
+    snapshot = table.current_snapshot()
+
+    while snapshot is not None and snapshot.snapshot_id != base_snapshot_id:
+        snapshots.append(snapshot)
+        if snapshot.parent_snapshot_id is None:
+            break
+        snapshot = table.snapshot_by_id(snapshot.parent_snapshot_id)
+
+    return snapshots
+
+
+def _snapshot_partitions(table, snapshot) -> set[tuple[Any, ...]]:
+    """スナップショットで追加・削除されたデータファイルのパーティション値"""
+    field_count = len(table.spec().fields)
+    partitions = set()
+
+    for manifest in snapshot.manifests(table.io):
+        if manifest.added_snapshot_id != snapshot.snapshot_id:
+            continue
+        for entry in manifest.fetch_manifest_entry(table.io, discard_deleted=False):
+            if entry.snapshot_id != snapshot.snapshot_id:
+                continue
+            partition = entry.data_file.partition
+            partitions.add(tuple(partition[pos] for pos in range(field_count)))
+
+    return partitions
+
+
+def _partition_keys(table, data: pa.Table) -> set[tuple[Any, ...]]:
+    """書き込むデータのパーティション値（Iceberg内部表現）を計算"""
+    schema = table.schema()
+    columns = []
+
+    for field in table.spec().fields:
+        source = schema.find_field(field.source_id)
+        values = _to_iceberg_values(data.column(source.name), source.field_type)
+        transform = field.transform.transform(source.field_type)
+        columns.append([transform(value) if value is not None else None for value in values])
+
+    if not columns:
+        return {()}
+
+    return set(zip(*columns, strict=True))
+
+
+def _to_iceberg_values(column: pa.ChunkedArray, field_type) -> list[Any]:
+    """Arrowの値をIcebergトランスフォームが受け取る内部表現に変換"""
+    if isinstance(field_type, (TimestampType, TimestamptzType)):
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = column.cast(pa.timestamp("us"))
+        return column.cast(pa.timestamp("us")).cast(pa.int64()).to_pylist()
+
+    if isinstance(field_type, DateType):
+        return column.cast(pa.date32()).cast(pa.int32()).to_pylist()
+
+    return column.to_pylist()
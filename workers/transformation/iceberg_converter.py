@@ -20,6 +20,8 @@ async def on_fetch(request, env):
         R2_BUCKET_CURATED: Icebergテーブル用バケット（data-lake-curated）
         CLOUDFLARE_API_TOKEN: R2 Data Catalog APIトークン
         SOURCE_BUCKET: ソースParquetファイルのバケット（data-lake-raw）
+        R2_ACCESS_KEY_ID: R2アクセスキーID（source_files指定時のみ）
+        R2_SECRET_ACCESS_KEY: R2シークレットアクセスキー（source_files指定時のみ）
     """
 
     cors_headers = {
@@ -137,11 +139,34 @@ async def on_fetch(request, env):
             operation = "created_new"
 
         # ソースParquetファイルからデータをロード
-        # R2上のParquetファイルを読み取ってIcebergテーブルに追加
-        # 注: 実際の実装では、PyArrowを使ってParquetを読み、Icebergに書き込む
+        # source_filesが指定された場合、R2上のParquetを読み取ってIcebergテーブルに追加する
+        # 複数ファイルのappendは1スナップショットにまとめ、並行コミットとの競合はリトライで吸収
+        source_files = body.get("source_files", [])
+        commit_results = []
+
+        if source_files:
+            import pyarrow.parquet as pq
+            from pyarrow import fs
+            from iceberg_commit import IcebergCommitCoordinator
+
+            source_fs = fs.S3FileSystem(
+                access_key=env.R2_ACCESS_KEY_ID,
+                secret_key=env.R2_SECRET_ACCESS_KEY,
+                endpoint_override=f"https://{account_id}.r2.cloudflarestorage.com",
+                region="auto"
+            )
 
-        # 簡易実装: メタデータのみ更新（実際のデータロードは別途dbtなどで実行）
-        table.refresh()
+            coordinator = IcebergCommitCoordinator(catalog)
+            for source_file in source_files:
+                coordinator.append(
+                    table_identifier,
+                    pq.read_table(f"{env.SOURCE_BUCKET}/{source_file}", filesystem=source_fs),
+                    exclusive=bool(body.get("exclusive", False))
+                )
+            commit_results = coordinator.commit()
+        else:
+            # ロード対象がない場合はメタデータのみ更新（データロードは別途dbtなどで実行）
+            table.refresh()
 
         # レスポンス
         result = {
@@ -152,6 +177,7 @@ async def on_fetch(request, env):
             "schema_fields": len(schema.fields),
             "partition_spec": str(partition_spec),
             "source_path": source_path,
+            "commits": commit_results,
             "catalog_uri": catalog.properties.get("uri"),
             "message": f"Iceberg table {operation} successfully",
             "timestamp": datetime.utcnow().isoformat()